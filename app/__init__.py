@@ -1,8 +1,11 @@
 # App factory & basic config
+import os
+from typing import Optional
 from flask import Flask
 from markupsafe import Markup, escape
 from .routes import main_bp
 from .core.managers.database_manager import db_manager
+from .core.managers.model_manager import model_manager
 
 from flask_wtf.csrf import CSRFProtect
 
@@ -21,7 +24,7 @@ def nl2br(value: str) -> Markup:
 
 
 # Application factory function.
-def create_app():
+def create_app(preload_models: Optional[bool] = None):
     # Tell Flask where templates and static files live
     app = Flask(
         __name__,
@@ -47,6 +50,16 @@ def create_app():
 
     db_manager.init_db() # Initialize database
 
+    # Opt-in: load + warm up the models in the background right away instead of
+    # on the first request. Readiness is reported on /health/ready.
+    if preload_models is None:
+        preload_models = os.getenv("PRELOAD_MODELS", "0").strip().lower() in ("1", "true", "yes", "on")
+    if preload_models:
+        model_manager.start_preload()
+
+    # Hot-swap models when a new version is activated in saved_models/versions/
+    model_manager.start_registry_watcher()
+
     # Register blueprints (route groups)
     app.register_blueprint(main_bp)
     return app
@@ -1,17 +1,194 @@
+import atexit
+import os
+import queue
 import sqlite3
-from typing import Any, Iterable, Optional
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from app.core.managers.db_migrations import apply_migrations
+from app.core.managers.db_writer import SerializedWriter
 
 class DatabaseManager: # Encapsulation
+    """
+    Every query borrows a connection from a small pool of persistent
+    connections instead of opening (and re-reading the schema of) a new
+    one each time. Controlled by env vars:
+        DB_POOL_SIZE                (default: 8 idle connections kept, 0 = no pooling)
+        DB_POOL_HEALTHCHECK_SECONDS (default: 30, "SELECT 1" on a connection idle longer)
+        DB_BUSY_TIMEOUT_MS          (default: 5000, how long a write waits for another writer's lock)
+    When every pooled connection is busy, an extra one is opened and closed after use.
+
+    Concurrent-write mode (DB_WAL_MODE=1): the database runs in WAL journal
+    mode, so readers never block the writer or each other, and every write
+    (execute / execute_and_get_id / execute_many / init_db) is handed to ONE
+    SerializedWriter thread that group-commits whatever is queued. Writers
+    then never race for the lock, so "database is locked" cannot happen
+    between threads of this process. Tuned by:
+        DB_SYNCHRONOUS      (default: NORMAL, safe with WAL; FULL fsyncs every commit)
+        DB_MMAP_SIZE_MB     (default: 64, memory-mapped reads)
+        DB_WRITER_MAX_BATCH       (default: 64 writes per transaction)
+        DB_WRITER_TIMEOUT_SECONDS (default: 30, longest a caller waits for its write)
+    Between processes (each has its own writer) busy_timeout applies, and a
+    batch that still finds the lock taken is retried with backoff.
+    """
+
     def __init__(self, db_path: str = "instance/app.db") -> None: 
         self.db_path = db_path          # Path to the SQLite database file
+
+        self.pool_size: int = int(os.getenv("DB_POOL_SIZE", "8"))
+        self.healthcheck_seconds: float = float(os.getenv("DB_POOL_HEALTHCHECK_SECONDS", "30"))
+        self._idle: "queue.LifoQueue[Tuple[sqlite3.Connection, float]]" = queue.LifoQueue()
+        self._pid: int = os.getpid()    # pooled connections must not cross fork()
+        self._lock = threading.Lock()
+
+        # Counters
+        self._stats: Dict[str, int] = {"opened": 0, "reused": 0, "overflow": 0, "discarded": 0}
+
+        self.wal_mode: bool = os.getenv("DB_WAL_MODE", "0").strip().lower() in ("1", "true", "yes", "on")
+        self.synchronous: str = os.getenv("DB_SYNCHRONOUS", "NORMAL").strip().upper()
+        self.mmap_size_mb: int = int(os.getenv("DB_MMAP_SIZE_MB", "64"))
+        self.busy_timeout_ms: int = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+        self.writer_max_batch: int = int(os.getenv("DB_WRITER_MAX_BATCH", "64"))
+        self.writer_timeout: float = float(os.getenv("DB_WRITER_TIMEOUT_SECONDS", "30"))
+        self._writer: Optional[SerializedWriter] = self._new_writer() if self.wal_mode else None
+        atexit.register(self.close_all)
         
     def get_connection(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)    # Create and return a new SQLite connection
+        # Create and return a new SQLite connection (not pooled: the caller closes it)
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        self._init_new_file(conn)
+        if self.wal_mode:
+            self._apply_pragmas(conn)
+        return conn
+
+    @staticmethod
+    def _init_new_file(conn: sqlite3.Connection) -> None:
+        # A brand-new (empty) file gets auto_vacuum=INCREMENTAL, so pages freed by deletes can be
+        # handed back to the OS later (LogRetention). It can only be set before the first write,
+        # including journal_mode=WAL; older files are converted by scripts/archive_old_logs.py.
+        if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+    def _apply_pragmas(self, conn: sqlite3.Connection) -> None:
+        # Per-connection settings (journal_mode=WAL itself is stored in the file by the writer)
+        conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_size_mb * 1024 * 1024}")
+
+    def _writer_connection(self) -> sqlite3.Connection:
+        # Autocommit connection: SerializedWriter issues BEGIN / COMMIT itself
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        self._init_new_file(conn)
+        mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        if mode.lower() != "wal":
+            print(f"[WARNING] DatabaseManager: Could not enable WAL mode (journal_mode={mode})")
+        self._apply_pragmas(conn)
         return conn
+
+    def _new_writer(self) -> SerializedWriter:
+        return SerializedWriter(self._writer_connection, max_batch=self.writer_max_batch,
+                                timeout=self.writer_timeout)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a pooled connection for one unit of work. An open transaction
+        is rolled back if the block raised (or forgot to commit), so the next
+        borrower always gets a clean connection.
+        """
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                self._discard(conn)
+            else:
+                self._checkin(conn)
+
+    def _checkout(self) -> sqlite3.Connection:
+        if os.getpid() != self._pid:
+            self._after_fork()
+        while True:
+            try:
+                conn, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if time.monotonic() - idle_since < self.healthcheck_seconds or self._is_healthy(conn):
+                self._count("reused")
+                return conn
+            self._discard(conn)
+
+        self._count("opened")
+        return self.get_connection()
+
+    def _checkin(self, conn: sqlite3.Connection) -> None:
+        if os.getpid() == self._pid and self._idle.qsize() < self.pool_size:
+            self._idle.put((conn, time.monotonic()))
+        else:
+            self._count("overflow")
+            conn.close()
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        self._count("discarded")
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _after_fork(self) -> None:
+        # A child must not share the parent's SQLite handles: forget them (the parent closes its own)
+        with self._lock:
+            self._pid = os.getpid()
+            self._idle = queue.LifoQueue()
+            if self._writer is not None:
+                self._writer = self._new_writer()   # the parent's writer thread does not exist here
+
+    def _write(self, fn: Any) -> Any:
+        # Run fn(conn) on the serialized writer (WAL mode); it commits, fn must not
+        if os.getpid() != self._pid:
+            self._after_fork()
+        assert self._writer is not None
+        return self._writer.submit(fn)
+
+    def close_all(self) -> None:     # App / worker teardown: stop the writer, close every idle pooled connection
+        if self._writer is not None and os.getpid() == self._pid:
+            self._writer.stop()
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        writer = self._writer.get_stats() if self._writer is not None else {"enabled": False}
+        return {"pool_size": self.pool_size, "idle": self._idle.qsize(), **stats, "writer": writer}
     
     def execute(self, query: str, params: Iterable[Any] = ()) -> None:
-        with self.get_connection() as conn:     # Execute an INSERT/UPDATE/DELETE query
+        if self._writer is not None:
+            self._write(lambda conn: conn.execute(query, tuple(params)))
+            return
+        with self.connection() as conn:     # Execute an INSERT/UPDATE/DELETE query
             conn.execute(query, tuple(params))
             conn.commit()
     
@@ -21,67 +198,67 @@ class DatabaseManager: # Encapsulation
         This ensures reliable retrieval of the inserted row ID in SQLite.
         Returns None if the insert fails or no row ID is available.
         """
-        with self.get_connection() as conn:
+        if self._writer is not None:
+            row_id = self._write(lambda conn: conn.execute(query, tuple(params)).lastrowid)
+            return row_id if row_id else None
+        with self.connection() as conn:
             cursor = conn.execute(query, tuple(params))
             row_id = cursor.lastrowid
             conn.commit()
             return row_id if row_id else None
             
+    def execute_many(self, query: str, params_seq: Iterable[Iterable[Any]]) -> int:
+        """
+        Execute the same INSERT/UPDATE for many parameter tuples in ONE transaction
+        (one commit instead of one per row). Returns the number of affected rows.
+        """
+        if self._writer is not None:
+            rows = [tuple(params) for params in params_seq]
+            return self._write(lambda conn: conn.executemany(query, rows).rowcount)
+        with self.connection() as conn:
+            cursor = conn.executemany(query, (tuple(params) for params in params_seq))
+            conn.commit()
+            return cursor.rowcount
+            
+    def run_in_transaction(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Run fn(conn) as ONE write transaction (read-modify-write sequences that
+        must not interleave with other writers) and return its result. fn must
+        not commit; the transaction is rolled back if it raises.
+        """
+        if self._writer is not None:
+            return self._write(fn)
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            result = fn(conn)
+            conn.commit()
+            return result
+
     def fetch_one(self, query: str, params: Iterable[Any] = ()) -> Optional[sqlite3.Row]:
-        with self.get_connection() as conn:     # Execute a SELECT query and return a single row
+        with self.connection() as conn:     # Execute a SELECT query and return a single row
             cur = conn.execute(query, tuple(params))
             row = cur.fetchone()
         return row
     
     def fetch_all(self, query: str, params: Iterable[Any] = ()) -> list[sqlite3.Row]:
-        with self.get_connection() as conn:     # Execute a SELECT query and return all rows as a list
+        with self.connection() as conn:     # Execute a SELECT query and return all rows as a list
             cur = conn.execute(query, tuple(params))
             rows = cur.fetchall()
         return rows
             
-    def init_db(self) -> None:
-        with self.get_connection() as conn:     # Initialize database tables if they do not exist
-            cursor = conn.cursor()
-            
-            cursor.execute(     # USERS TABLE
-            """ 
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL UNIQUE,
-                email TEXT NOT NULL UNIQUE,
-                password_hash TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                updated_at TEXT,
-                is_active INTEGER NOT NULL DEFAULT 1
-            );
-            """
-        )
-            cursor.execute(     # PREDICTION LOGS TABLE
-            """
-            CREATE TABLE IF NOT EXISTS prediction_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                model_type TEXT NOT NULL,
-                input_summary TEXT,
-                prediction_result TEXT NOT NULL,
-                probability REAL,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            );
-            """
-        )     
-            cursor.execute(     # CHAT LOGS TABLE
-            """
-            CREATE TABLE IF NOT EXISTS chat_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                role TEXT NOT NULL,
-                message TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            );
-            """
-        )    
-            conn.commit()    
+    def init_db(self) -> None:     # Bring the schema up to date (see db_migrations.MIGRATIONS)
+        if self._writer is not None:
+            self._write(apply_migrations)
+            return
+        with self.connection() as conn:
+            apply_migrations(conn)
+            conn.commit()
+
+    def get_schema_version(self) -> int:     # Highest applied migration (0 = none yet)
+        try:
+            row = self.fetch_one("SELECT MAX(version) FROM schema_migrations")
+        except sqlite3.OperationalError:
+            return 0
+        return row[0] or 0
             
 db_manager = DatabaseManager()  # global instance rest of the app can use
\ No newline at end of file
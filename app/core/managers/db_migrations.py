@@ -0,0 +1,195 @@
+import json
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List, Set
+from app.core.managers.prediction_summary import (
+    CREATE_SUMMARY_TABLE,
+    CREATE_SUMMARY_TRIGGERS,
+    rebuild_prediction_summary,
+)
+
+
+@dataclass(frozen=True)
+class Migration:    # One schema change, applied once per database file
+    version: int                                # strictly increasing, never reused or edited once shipped
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _initial_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(     # USERS TABLE
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            email TEXT NOT NULL UNIQUE,
+            password_hash TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT,
+            is_active INTEGER NOT NULL DEFAULT 1
+        );
+        """
+    )
+    conn.execute(     # PREDICTION LOGS TABLE
+        """
+        CREATE TABLE IF NOT EXISTS prediction_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            model_type TEXT NOT NULL,
+            input_summary TEXT,
+            prediction_result TEXT NOT NULL,
+            probability REAL,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        );
+        """
+    )
+    conn.execute(     # CHAT LOGS TABLE
+        """
+        CREATE TABLE IF NOT EXISTS chat_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            message TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        );
+        """
+    )
+
+
+def _prediction_logs_model_version(conn: sqlite3.Connection) -> None:
+    # Files created after model versioning (but before migrations) already have the column
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(prediction_logs)")}
+    if "model_version" not in columns:
+        conn.execute("ALTER TABLE prediction_logs ADD COLUMN model_version TEXT")
+
+
+def _prediction_logs_user_model_index(conn: sqlite3.Connection) -> None:
+    # ChatbotService._fetch_latest_prediction: WHERE user_id = ? AND model_type = ?
+    # ORDER BY created_at DESC LIMIT 1 -> one index seek, no scan and no sort.
+    # Also serves per-user filters / deletes (user_id prefix).
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_prediction_logs_user_model_created "
+        "ON prediction_logs (user_id, model_type, created_at)"
+    )
+
+
+def _prediction_logs_user_created_index(conn: sqlite3.Connection) -> None:
+    # HistoryService keyset pages without a model filter: WHERE user_id = ?
+    # AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC. The rowid
+    # is the implicit last index column, so this is (user_id, created_at, id).
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_prediction_logs_user_created "
+        "ON prediction_logs (user_id, created_at)"
+    )
+
+
+def _user_prediction_summary(conn: sqlite3.Connection) -> None:
+    # Per-user latest result + counts, trigger-maintained (see prediction_summary.py),
+    # backfilled from the existing logs
+    conn.execute(CREATE_SUMMARY_TABLE)
+    for trigger in CREATE_SUMMARY_TRIGGERS:
+        conn.execute(trigger)
+    rebuild_prediction_summary(conn)
+
+
+def _prediction_logs_typed_vectors(conn: sqlite3.Connection) -> None:
+    # features: heart input vector as a JSON object {"age": 63.0, ...} (feature order kept);
+    # probabilities: brain class probabilities {"glioma": 0.91, ...}. Existing heart rows
+    # are backfilled from their "age=63.0, sex=1.0, ..." input_summary.
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(prediction_logs)")}
+    for name in ("features", "probabilities"):
+        if name not in columns:
+            conn.execute(f"ALTER TABLE prediction_logs ADD COLUMN {name} TEXT")
+
+    rows = conn.execute(
+        "SELECT id, input_summary FROM prediction_logs "
+        "WHERE model_type = 'heart_disease' AND features IS NULL AND input_summary LIKE '%=%'"
+    ).fetchall()
+    updates = []
+    for log_id, summary in rows:
+        try:
+            features = {key.strip(): float(value) for key, _, value in
+                        (part.partition("=") for part in summary.split(","))}
+        except ValueError:
+            continue    # not a feature summary: leave NULL
+        updates.append((json.dumps(features, separators=(",", ":")), log_id))
+    conn.executemany("UPDATE prediction_logs SET features = ? WHERE id = ?", updates)
+
+
+def _log_tables_created_index(conn: sqlite3.Connection) -> None:
+    # LogRetention: WHERE created_at < cutoff ORDER BY created_at LIMIT n reads the oldest
+    # rows straight off the index instead of scanning the whole table for every batch
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_prediction_logs_created ON prediction_logs (created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_logs_created ON chat_logs (created_at)")
+
+
+def _prediction_history_clears(conn: sqlite3.Connection) -> None:
+    # Tombstone per user for "clear history" / account deletion. Rows created up to cleared_at that
+    # are still queued in some worker's PredictionLogWriter are dropped at insert time instead of
+    # coming back. No foreign key: it has to outlive a deleted account.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS prediction_history_clears (
+            user_id INTEGER PRIMARY KEY,
+            cleared_at TEXT NOT NULL
+        )
+        """
+    )
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "initial_schema", _initial_schema),
+    Migration(2, "prediction_logs_model_version", _prediction_logs_model_version),
+    Migration(3, "prediction_logs_user_model_index", _prediction_logs_user_model_index),
+    Migration(4, "prediction_logs_user_created_index", _prediction_logs_user_created_index),
+    Migration(5, "user_prediction_summary", _user_prediction_summary),
+    Migration(6, "prediction_logs_typed_vectors", _prediction_logs_typed_vectors),
+    Migration(7, "log_tables_created_index", _log_tables_created_index),
+    Migration(8, "prediction_history_clears", _prediction_history_clears),
+]
+
+
+def applied_versions(conn: sqlite3.Connection) -> Set[int]:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        );
+        """
+    )
+    return {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+
+
+def apply_migrations(conn: sqlite3.Connection, migrations: List[Migration] = MIGRATIONS) -> List[int]:
+    """
+    Apply every migration not yet recorded in schema_migrations, in version
+    order. Each one runs inside its own SAVEPOINT together with its
+    schema_migrations row, so a failing migration leaves no trace and is
+    retried on the next start. Works both on a plain connection and inside
+    an outer transaction (the serialized writer). Returns the versions applied.
+    """
+    done = applied_versions(conn)
+    applied: List[int] = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version in done:
+            continue
+        conn.execute("SAVEPOINT migration")
+        try:
+            migration.apply(conn)
+            conn.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+                (migration.version, migration.name, datetime.now(timezone.utc).isoformat()),
+            )
+        except Exception:
+            conn.execute("ROLLBACK TO migration")
+            conn.execute("RELEASE migration")
+            raise
+        conn.execute("RELEASE migration")
+        applied.append(migration.version)
+        print(f"[INFO] DatabaseManager: Applied migration {migration.version} ({migration.name})")
+    return applied
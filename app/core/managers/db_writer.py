@@ -0,0 +1,226 @@
+from __future__ import annotations
+import queue
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+WriteFn = Callable[[sqlite3.Connection], Any]
+
+
+class SerializedWriter:
+    """
+    A single thread that owns the only writing SQLite connection.
+
+    Any thread may submit a write; jobs run in arrival order, so writers
+    never contend for SQLite's write lock and never see "database is
+    locked". Whatever is queued when the thread wakes up is committed as
+    ONE transaction (group commit: one fsync for many inserts), with each
+    job inside its own SAVEPOINT so a failing statement only undoes itself.
+    submit() returns once the job's transaction has committed.
+
+    Other PROCESSES have writers of their own. When one of them holds the
+    lock past busy_timeout, the batch is rolled back and retried with
+    backoff (nothing was committed, so re-running the jobs is safe) for up
+    to timeout seconds, instead of failing with "database is locked".
+
+    If the connection cannot be opened (bad path, read-only or locked file),
+    everything queued fails with that error and the next submit() tries
+    again. A caller waits at most timeout seconds for its job.
+    """
+
+    _STOP = object()
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], max_batch: int = 64,
+                 timeout: float = 30.0) -> None:
+        self._connect = connect     # must return an autocommit connection (isolation_level=None)
+        self.max_batch: int = max(1, max_batch)
+        self.timeout: float = timeout
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.jobs: int = 0
+        self.failed_jobs: int = 0
+        self.timeouts: int = 0
+        self.lock_retries: int = 0
+        self.connect_errors: int = 0
+        self.transactions: int = 0
+        self.max_queue_depth: int = 0
+        self.busy_seconds: float = 0.0
+
+    def start(self) -> None:
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: WriteFn) -> Any:
+        # Queue one write and block until it is committed (re-raises its exception)
+        future: Future = Future()
+        with self._lock:
+            # Under the lock: a thread that failed to connect clears _thread before it drains the queue
+            self._start_locked()
+            self._queue.put((fn, future))
+        depth = self._queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            pass
+        self.timeouts += 1
+        if future.cancel():
+            raise sqlite3.OperationalError(f"Database writer did not reach this write within {self.timeout}s; "
+                                           f"it was not executed")
+        if future.done():
+            return future.result()
+        raise sqlite3.OperationalError(f"Database write still running after {self.timeout}s; it may yet commit")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(self._STOP)
+            thread.join(timeout=timeout)
+
+    def _run(self) -> None:
+        try:
+            conn = self._connect()
+        except Exception as e:
+            self.connect_errors += 1
+            print(f"[ERROR] SerializedWriter: Could not open the write connection: {e}")
+            self._fail_queued(e)
+            return
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._STOP:
+                    return
+                batch: List[Tuple[WriteFn, Future]] = [item]
+                stop_after = False
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is self._STOP:
+                        stop_after = True
+                        break
+                    batch.append(item)
+
+                self._commit_batch(conn, batch)
+                if stop_after:
+                    return
+        except Exception as e:
+            print(f"[ERROR] SerializedWriter: Writer thread failed: {e}")
+            self._fail_queued(e)
+        finally:
+            conn.close()
+
+    def _fail_queued(self, error: BaseException) -> None:
+        # This thread is exiting: fail what is queued; the next submit() starts a fresh thread
+        with self._lock:
+            if self._thread is threading.current_thread():
+                self._thread = None
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+                if item is self._STOP:
+                    continue
+                _, future = item
+                if future.set_running_or_notify_cancel():
+                    self.failed_jobs += 1
+                    future.set_exception(error)
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: List[Tuple[WriteFn, Future]]) -> None:
+        # Jobs whose caller gave up (timeout) are skipped
+        batch = [(fn, future) for fn, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        t0 = time.perf_counter()
+        delay = 0.005
+        while True:
+            try:
+                outcomes = self._transaction(conn, batch)
+                break
+            except Exception as e:
+                try:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+                if self._is_locked(e) and time.perf_counter() - t0 + delay < self.timeout:
+                    # Another process's writer holds the lock: back off (with jitter) and redo the batch
+                    self.lock_retries += 1
+                    time.sleep(delay * random.uniform(0.5, 1.0))
+                    delay = min(delay * 2, 0.5)
+                    continue
+                # The transaction itself failed (disk full, I/O error, ...): nothing was written
+                print(f"[ERROR] SerializedWriter: Write transaction failed: {e}")
+                outcomes = [(future, None, e) for _, future in batch]
+                break
+
+        self.transactions += 1
+        self.jobs += len(batch)
+        self.busy_seconds += time.perf_counter() - t0
+        # Results are handed out only after COMMIT, so callers never see uncommitted rows
+        for future, result, error in outcomes:
+            if error is not None:
+                self.failed_jobs += 1
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    @staticmethod
+    def _transaction(conn: sqlite3.Connection,
+                     batch: List[Tuple[WriteFn, Future]]) -> List[Tuple[Future, Any, Optional[BaseException]]]:
+        # One attempt at the batch: each job in its own savepoint, so a failing job only undoes itself
+        outcomes: List[Tuple[Future, Any, Optional[BaseException]]] = []
+        conn.execute("BEGIN IMMEDIATE")
+        for fn, future in batch:
+            conn.execute("SAVEPOINT job")
+            try:
+                result = fn(conn)
+                conn.execute("RELEASE job")
+                outcomes.append((future, result, None))
+            except Exception as e:
+                conn.execute("ROLLBACK TO job")
+                conn.execute("RELEASE job")
+                outcomes.append((future, None, e))
+        conn.execute("COMMIT")
+        return outcomes
+
+    @staticmethod
+    def _is_locked(error: Exception) -> bool:
+        # SQLITE_BUSY / SQLITE_LOCKED: the write lock is held elsewhere
+        if not isinstance(error, sqlite3.OperationalError):
+            return False
+        message = str(error).lower()
+        return "locked" in message or "busy" in message
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "jobs": self.jobs,
+            "failed_jobs": self.failed_jobs,
+            "timeouts": self.timeouts,
+            "lock_retries": self.lock_retries,
+            "connect_errors": self.connect_errors,
+            "transactions": self.transactions,
+            "avg_jobs_per_transaction": round(self.jobs / self.transactions, 2) if self.transactions else 0.0,
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
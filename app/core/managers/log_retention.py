@@ -0,0 +1,191 @@
+import gzip
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+from app.core.managers.database_manager import DatabaseManager, db_manager
+
+# Tables with a created_at column that are archived and trimmed (see migration 7 for their indexes)
+RETENTION_TABLES = ("prediction_logs", "chat_logs")
+
+
+class LogRetention:
+    """
+    Moves log rows older than a cutoff out of the live database:
+
+      1. read the oldest expired rows, batch_size at a time (created_at index);
+      2. append them as JSON lines to <archive_dir>/<table>/<table>-YYYY-MM.jsonl.gz
+         (one gzip member per batch and month, fsynced before anything is deleted);
+      3. delete that batch by id in its own short write transaction, then pause, so
+         predictions logged meanwhile never wait on one long lock. The
+         user_prediction_summary triggers keep the summary in step.
+
+    Afterwards vacuum() hands the freed pages back to the file system with
+    PRAGMA incremental_vacuum, again in short steps. A crash between 2 and 3
+    can archive a batch twice; it is never lost.
+
+    Defaults come from env vars (the CLI can override each one):
+        LOG_RETENTION_DAYS         (default: 365)
+        LOG_ARCHIVE_DIR            (default: instance/archive)
+        LOG_RETENTION_BATCH_SIZE   (default: 500 rows per delete transaction)
+        LOG_RETENTION_PAUSE_MS     (default: 20, between batches)
+        LOG_RETENTION_VACUUM_PAGES (default: 1024 pages per incremental_vacuum transaction)
+    """
+
+    def __init__(self, db: DatabaseManager) -> None:
+        self.db = db
+        self.retention_days: int = int(os.getenv("LOG_RETENTION_DAYS", "365"))
+        self.archive_dir = Path(os.getenv("LOG_ARCHIVE_DIR", "instance/archive"))
+        self.batch_size: int = max(1, int(os.getenv("LOG_RETENTION_BATCH_SIZE", "500")))
+        self.pause: float = float(os.getenv("LOG_RETENTION_PAUSE_MS", "20")) / 1000.0
+        self.vacuum_pages: int = max(1, int(os.getenv("LOG_RETENTION_VACUUM_PAGES", "1024")))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def cutoff(self, days: Optional[int] = None) -> str:
+        # ISO timestamp rows must be older than; created_at is stored as an ISO string
+        days = self.retention_days if days is None else days
+        return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+    def count_expired(self, table: str, cutoff: str) -> Dict[str, int]:
+        # Dry run: expired rows per month, nothing is written
+        self._check_table(table)
+        rows = self.db.fetch_all(
+            f"SELECT substr(created_at, 1, 7), COUNT(*) FROM {table} WHERE created_at < ? GROUP BY 1",
+            (cutoff,),
+        )
+        return {row[0]: row[1] for row in rows}
+
+    def archive_table(self, table: str, cutoff: str) -> Dict[str, Any]:
+        """
+        Archive and delete every row of table with created_at < cutoff.
+        Returns {"rows", "batches", "archive_bytes", "files"}.
+        """
+        self._check_table(table)
+        stats: Dict[str, Any] = {"rows": 0, "batches": 0, "archive_bytes": 0, "files": set()}
+        while True:
+            rows = self.db.fetch_all(
+                f"SELECT * FROM {table} WHERE created_at < ? ORDER BY created_at, id LIMIT ?",
+                (cutoff, self.batch_size),
+            )
+            if not rows:
+                break
+
+            by_month: Dict[str, List[Dict[str, Any]]] = {}
+            for row in rows:
+                by_month.setdefault(self._month(row["created_at"]), []).append(dict(row))
+            for month, items in by_month.items():
+                path = self.archive_dir / table / f"{table}-{month}.jsonl.gz"
+                stats["archive_bytes"] += self._append(path, items)
+                stats["files"].add(str(path))
+
+            ids = [(row["id"],) for row in rows]
+            self.db.run_in_transaction(lambda conn: conn.executemany(f"DELETE FROM {table} WHERE id = ?", ids))
+            stats["rows"] += len(ids)
+            stats["batches"] += 1
+            if len(rows) < self.batch_size:
+                break
+            if self.pause > 0:
+                time.sleep(self.pause)
+
+        stats["files"] = sorted(stats["files"])
+        return stats
+
+    def vacuum(self) -> Dict[str, Any]:
+        """
+        Release free pages to the file system in steps of vacuum_pages.
+        Only possible with auto_vacuum=INCREMENTAL (new files have it; see
+        enable_incremental_vacuum for older ones). Returns the page counts.
+        """
+        mode = self.db.fetch_one("PRAGMA auto_vacuum")[0]
+        free_before = self.db.fetch_one("PRAGMA freelist_count")[0]
+        result = {"auto_vacuum": {0: "NONE", 1: "FULL", 2: "INCREMENTAL"}.get(mode, str(mode)),
+                  "free_pages_before": free_before, "free_pages_after": free_before, "steps": 0}
+        if mode != 2:
+            return result
+
+        def step(conn: sqlite3.Connection) -> int:
+            # One page per statement: Python's sqlite3 steps a row-less PRAGMA only once
+            for _ in range(self.vacuum_pages):
+                conn.execute("PRAGMA incremental_vacuum(1)")
+            return conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+        left = free_before
+        while left > 0:
+            previous, left = left, self.db.run_in_transaction(step)
+            result["steps"] += 1
+            if left >= previous:
+                break
+            if left > 0 and self.pause > 0:
+                time.sleep(self.pause)
+        result["free_pages_after"] = left
+        return result
+
+    def enable_incremental_vacuum(self) -> None:
+        # One-off for files created before auto_vacuum was set: full VACUUM (rewrites the file, exclusive)
+        conn = sqlite3.connect(self.db.db_path, isolation_level=None)
+        try:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")     # WAL mode: the rewrite went through the WAL
+        finally:
+            conn.close()
+
+    def run(self, tables: Sequence[str] = RETENTION_TABLES, days: Optional[int] = None,
+            vacuum: bool = True) -> Dict[str, Any]:
+        # Archive + delete + vacuum; returns the per-table stats, bytes reclaimed and time taken
+        t0 = time.perf_counter()
+        cutoff = self.cutoff(days)
+        size_before = self.file_bytes()
+        report: Dict[str, Any] = {"cutoff": cutoff, "tables": {}}
+        for table in tables:
+            report["tables"][table] = self.archive_table(table, cutoff)
+        report["vacuum"] = self.vacuum() if vacuum else None
+        if self.db.wal_mode:
+            # The deletes / truncation only reach the main file (and the WAL shrinks) at a checkpoint
+            with self.db.connection() as conn:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        report["file_bytes_before"] = size_before
+        report["file_bytes_after"] = self.file_bytes()
+        report["bytes_reclaimed"] = size_before - report["file_bytes_after"]
+        report["seconds"] = round(time.perf_counter() - t0, 3)
+        return report
+
+    def file_bytes(self) -> int:
+        # Database file plus its WAL, i.e. what the database occupies on disk
+        return sum(os.path.getsize(path) for path in (self.db.db_path, f"{self.db.db_path}-wal")
+                   if os.path.exists(path))
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _check_table(table: str) -> None:
+        # Table names are interpolated into SQL: only the known log tables are allowed
+        if table not in RETENTION_TABLES:
+            raise ValueError(f"Unknown log table '{table}'. Expected one of: {', '.join(RETENTION_TABLES)}")
+
+    @staticmethod
+    def _month(created_at: Any) -> str:
+        value = str(created_at or "")
+        return value[:7] if len(value) >= 7 and value[4] == "-" else "undated"
+
+    @staticmethod
+    def _append(path: Path, items: List[Dict[str, Any]]) -> int:
+        # Append one gzip member (readers such as gzip.open see one continuous stream); returns bytes written
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "ab") as raw:
+            start = raw.tell()
+            with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+                for item in items:
+                    gz.write(json.dumps(item, separators=(",", ":")).encode("utf-8") + b"\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+            return raw.tell() - start
+
+
+log_retention = LogRetention(db_manager)
@@ -0,0 +1,69 @@
+import importlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Type
+from app.models.base_model import BaseDiseaseModel
+
+
+@dataclass(frozen=True)
+class ModelDefinition:  # One servable model, as declared in config
+    name: str                   # registry key, e.g. "heart"
+    display_name: str           # used in user-facing error messages
+    model_class: str            # "package.module:ClassName", must subclass BaseDiseaseModel
+    artifact_name: str          # file name inside saved_models/ and each registry version dir
+    options: Dict[str, Any] = field(default_factory=dict)   # extra constructor kwargs
+
+    def load_class(self) -> Type[BaseDiseaseModel]:
+        module_name, _, class_name = self.model_class.partition(":")
+        cls = getattr(importlib.import_module(module_name), class_name)
+        if not (isinstance(cls, type) and issubclass(cls, BaseDiseaseModel)):
+            raise TypeError(f"{self.model_class} must be a subclass of BaseDiseaseModel")
+        return cls
+
+
+def _builtin_definitions() -> List[ModelDefinition]:
+    return [
+        ModelDefinition(
+            name="heart",
+            display_name="heart disease",
+            model_class="app.models.heart.heart_disease_model:HeartDiseaseModel",
+            artifact_name="heart_model.pkl",
+            # HEART_ENGINE selects arrays (default, flat node arrays) or sklearn; with arrays,
+            # heart_model_arrays/ is mmap-shared across workers when it is present and current
+            options={
+                "engine": os.getenv("HEART_ENGINE", "arrays").strip().lower(),
+                "use_mmap_arrays": os.getenv("HEART_MMAP_ARRAYS", "1").strip().lower() in ("1", "true", "yes", "on"),
+            },
+        ),
+        ModelDefinition(
+            name="brain",
+            display_name="brain tumor",
+            model_class="app.models.brain.brain_tumor_model:BrainTumorModel",
+            artifact_name="brain_tumor_cnn_multiclass.h5",
+            # BRAIN_BACKEND selects keras (default), keras_compiled, tflite_float16 or tflite_int8
+            options={"backend": os.getenv("BRAIN_BACKEND", "keras").strip().lower()},
+        ),
+    ]
+
+
+def load_model_definitions() -> List[ModelDefinition]:
+    """
+    Built-in models plus the optional JSON file named by MODEL_CONFIG_PATH:
+
+        [{"name": "skin", "display_name": "skin lesion",
+          "model_class": "app.models.skin.skin_model:SkinLesionModel",
+          "artifact_name": "skin_model.h5", "options": {}}]
+
+    An entry with the same name as a built-in one replaces it.
+    """
+    definitions: Dict[str, ModelDefinition] = {d.name: d for d in _builtin_definitions()}
+
+    config_path = os.getenv("MODEL_CONFIG_PATH")
+    if config_path:
+        with open(config_path, "r", encoding="utf-8") as f:
+            for entry in json.load(f):
+                definition = ModelDefinition(**entry)
+                definitions[definition.name] = definition
+
+    return list(definitions.values())
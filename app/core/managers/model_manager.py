@@ -1,51 +1,352 @@
-from typing import Optional
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+from app.core.managers.model_config import ModelDefinition, load_model_definitions
+from app.core.managers.model_registry import LoadedVersion, ModelRegistry, ModelSpec
+from app.models.base_model import BaseDiseaseModel
 from app.models.heart.heart_disease_model import HeartDiseaseModel
 from app.models.brain.brain_tumor_model import BrainTumorModel
+from app.models.brain.batch_scheduler import BrainBatchScheduler
+from app.models.brain.prediction_cache import BrainPredictionCache
+from app.models.brain.process_pool import BrainProcessPool
+from app.models.heart.prediction_cache import HeartPredictionCache
+
+SAVED_MODELS_DIR = Path(__file__).resolve().parents[2] / "data" / "saved_models"
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
 
 class ModelManager: # Manages ML/DL model instances
     def __init__(self) -> None:
-        self._heart_model: Optional[HeartDiseaseModel] = None
-        self._brain_model: Optional[BrainTumorModel] = None
-        self._heart_model_error: Optional[str] = None
-        self._brain_model_error: Optional[str] = None
-        
+        self._brain_cache: Optional[BrainPredictionCache] = None
+        self._heart_cache: Optional[HeartPredictionCache] = None
+        self._lock = threading.RLock()  # getters may race with the preload thread
+
+        # Versioned models: saved_models/versions/<model>/<version>/ + ACTIVE pointer.
+        # Without registered versions the original files in saved_models/ are served.
+        # MODEL_MEMORY_BUDGET_MB / MODEL_IDLE_TIMEOUT_SECONDS (default: unlimited) evict
+        # least recently used models; they are loaded again on their next use.
+        budget_mb = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+        self.registry = ModelRegistry(
+            os.getenv("MODEL_REGISTRY_DIR") or SAVED_MODELS_DIR / "versions",
+            memory_budget_bytes=int(budget_mb * 2**20) if budget_mb > 0 else None,
+            idle_timeout_seconds=float(os.getenv("MODEL_IDLE_TIMEOUT_SECONDS", "0")) or None,
+        )
+
+        # Every servable model is declared in model_config.py (or MODEL_CONFIG_PATH)
+        self.definitions: Dict[str, ModelDefinition] = {}
+        for definition in load_model_definitions():
+            self.register_model(definition)
+
+        # Preload / warm-up state (see start_preload)
+        self._preload_thread: Optional[threading.Thread] = None
+        self._preload_done = threading.Event()
+        self._load_stats: Dict[str, Dict[str, Any]] = {}
+
+    def register_model(self, definition: ModelDefinition) -> None:
+        model_class = definition.load_class()
+        self.definitions[definition.name] = definition
+        self.registry.register(ModelSpec(
+            name=definition.name,
+            artifact_name=definition.artifact_name,
+            legacy_path=SAVED_MODELS_DIR / definition.artifact_name,
+            build=lambda model_path: self._build_model(model_class, definition, model_path),
+            smoke_test=lambda m: m.smoke_test(),
+            dispose=lambda m: m.unload(),
+        ))
+
+    def _build_model(
+        self,
+        model_class: type[BaseDiseaseModel],
+        definition: ModelDefinition,
+        model_path: Path,
+    ) -> BaseDiseaseModel:
+        model = model_class(model_path=model_path, **definition.options)
+        if isinstance(model, BrainTumorModel):
+            if not self._configure_brain_process_pool(model):
+                self._configure_brain_batching(model)
+            self._configure_brain_cache(model)
+        elif isinstance(model, HeartDiseaseModel):
+            self._configure_heart_cache(model)
+        model.load_model()  # in memory now, so the registry can measure it
+        return model
+
+    def _load_error(self, name: str, e: Exception) -> RuntimeError:
+        # Map a failed load to the user-facing message the services show
+        display_name = self.definitions[name].display_name if name in self.definitions else name
+        if isinstance(e, FileNotFoundError):
+            return RuntimeError(
+                f"{display_name.capitalize()} model file not found. Please ensure the model is trained and saved."
+            )
+        return RuntimeError(f"Failed to load {display_name} model: {str(e)}")
+
+    def _get_loaded(self, name: str) -> LoadedVersion:
+        if name not in self.definitions:
+            raise RuntimeError(f"Unknown model '{name}'.")
+        try:
+            return self.registry.get(name)
+        except Exception as e:
+            raise self._load_error(name, e)
+
+    @contextmanager
+    def acquire(self, name: str) -> Iterator[LoadedVersion]:
+        """
+        Lease the serving version of a model (e.g. "heart", "brain") for one
+        request. A hot swap or eviction during the request does not affect
+        it; the old version is unloaded after the last lease is released.
+        """
+        self._get_loaded(name)
+        with self.registry.acquire(name) as loaded:
+            yield loaded
+
+    def get_model(self, name: str) -> BaseDiseaseModel:   # Loaded model by name (no lease)
+        return self._get_loaded(name).model
+
     def get_heart_model(self) -> HeartDiseaseModel: #  Return a loaded HeartDiseaseModel instance
-        if self._heart_model is None and self._heart_model_error is None:
-            try:
-                # In the future we may pass a real model_path here.
-                self._heart_model = HeartDiseaseModel(
-                    model_path="app/data/saved_models/heart_model.pkl"
-                )
-                self._heart_model.load_model()
-            except FileNotFoundError as e:
-                self._heart_model_error = f"Heart disease model file not found. Please ensure the model is trained and saved."
-                print(f"[ERROR] ModelManager: {self._heart_model_error}: {e}")
-                raise RuntimeError(self._heart_model_error)
-            except Exception as e:
-                self._heart_model_error = f"Failed to load heart disease model: {str(e)}"
-                print(f"[ERROR] ModelManager: {self._heart_model_error}")
-                raise RuntimeError(self._heart_model_error)
-        
-        if self._heart_model is None:
-            raise RuntimeError(self._heart_model_error or "Heart model failed to load.")
-        
-        return self._heart_model
+        return self.get_model("heart")
 
     def get_brain_model(self) -> BrainTumorModel:   # Return a loaded BrainTumorModel instance
-        if self._brain_model is None and self._brain_model_error is None:
-            try:
-                # Model will use default path or can be overridden
-                # The model loads lazily when predict() is first called
-                self._brain_model = BrainTumorModel()
-            except Exception as e:
-                self._brain_model_error = f"Failed to initialize brain tumor model: {str(e)}"
-                print(f"[ERROR] ModelManager: {self._brain_model_error}")
-                raise RuntimeError(self._brain_model_error)
-        
-        if self._brain_model is None:
-            raise RuntimeError(self._brain_model_error or "Brain model failed to load.")
-        
-        return self._brain_model
+        return self.get_model("brain")
+
+    def _configure_brain_batching(self, brain_model: BrainTumorModel) -> None:
+        """
+        Put a micro-batching scheduler in front of the brain CNN.
+        Controlled by env vars:
+            BRAIN_BATCHING_ENABLED   (default: 1)
+            BRAIN_BATCH_MAX_SIZE     (default: 16 images)
+            BRAIN_BATCH_MAX_WAIT_MS  (default: 10 ms)
+        """
+        if not _env_flag("BRAIN_BATCHING_ENABLED", True):
+            return
+
+        # One scheduler per model version: it is stopped when that version is unloaded
+        brain_model.attach_executor(BrainBatchScheduler(
+            run_batch=brain_model.predict_batch,
+            max_batch_size=int(os.getenv("BRAIN_BATCH_MAX_SIZE", "16")),
+            max_wait_ms=float(os.getenv("BRAIN_BATCH_MAX_WAIT_MS", "10")),
+        ))
+
+    def _configure_brain_process_pool(self, brain_model: BrainTumorModel) -> bool:
+        """
+        Optional: run brain inference in worker processes (one model per worker),
+        with input tensors passed through shared memory. Replaces micro-batching.
+        Controlled by env vars:
+            BRAIN_PROCESS_POOL_WORKERS  (default: 0 = disabled)
+            BRAIN_POOL_SLOTS_PER_WORKER (default: 4 in-flight images per worker)
+        """
+        num_workers = int(os.getenv("BRAIN_PROCESS_POOL_WORKERS", "0"))
+        if num_workers <= 0:
+            return False
+
+        brain_model.attach_executor(BrainProcessPool(
+            model_path=brain_model.model_path,
+            backend=brain_model.backend_name,
+            num_workers=num_workers,
+            img_size=brain_model.img_size,
+            slots_per_worker=int(os.getenv("BRAIN_POOL_SLOTS_PER_WORKER", "4")),
+        ))
+        return True
+
+    def _configure_brain_cache(self, brain_model: BrainTumorModel) -> None:
+        """
+        Content-addressed cache of brain predictions (same scan -> no forward pass).
+        Controlled by env vars:
+            BRAIN_CACHE_ENABLED      (default: 1)
+            BRAIN_CACHE_MAX_ENTRIES  (default: 1024 results)
+            BRAIN_CACHE_PATH         (optional JSON file to persist across restarts)
+        """
+        if not _env_flag("BRAIN_CACHE_ENABLED", True):
+            return
+
+        # Shared by all versions: entries are keyed on the model fingerprint
+        if self._brain_cache is None:
+            self._brain_cache = BrainPredictionCache(
+                max_entries=int(os.getenv("BRAIN_CACHE_MAX_ENTRIES", "1024")),
+                persist_path=os.getenv("BRAIN_CACHE_PATH") or None,
+            )
+        brain_model.attach_cache(self._brain_cache)
+
+    def _configure_heart_cache(self, heart_model: HeartDiseaseModel) -> None:
+        """
+        LRU cache of heart predictions (same 13 inputs -> no forest call).
+        Controlled by env vars:
+            HEART_CACHE_ENABLED      (default: 1)
+            HEART_CACHE_MAX_ENTRIES  (default: 4096 results)
+        """
+        if not _env_flag("HEART_CACHE_ENABLED", True):
+            return
+
+        # Shared by all versions and reloads: entries are keyed on the model version (content hash)
+        if self._heart_cache is None:
+            self._heart_cache = HeartPredictionCache(
+                max_entries=int(os.getenv("HEART_CACHE_MAX_ENTRIES", "4096")),
+            )
+        heart_model.attach_cache(self._heart_cache)
+
+    def start_registry_watcher(self) -> None:
+        """
+        Watch the registry's ACTIVE files and hot-swap models when they change.
+        Controlled by env var:
+            MODEL_REGISTRY_POLL_SECONDS  (default: 10, 0 = disabled)
+        """
+        self.registry.start_watcher(float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", "10")))
+
+    # ------------------------------------------------------------------
+    # Preloading / warm-up
+    # ------------------------------------------------------------------
+    def start_preload(self) -> None:
+        """
+        Load all declared models in a background thread and run one synthetic
+        inference on each, so the first real request does not pay for
+        model loading and graph tracing. Idempotent.
+        """
+        with self._lock:
+            if self._preload_thread is not None:
+                return
+            for name in self.definitions:
+                self._load_stats[name] = {"status": "pending"}
+            self._preload_thread = threading.Thread(
+                target=self._preload_all,
+                name="model-preload",
+                daemon=True,
+            )
+            self._preload_thread.start()
+
+    def _preload_all(self) -> None:
+        try:
+            for name in self.definitions:
+                self._preload_one(name, lambda: self.get_model(name), lambda m: m.load_model())
+        finally:
+            self._preload_done.set()
+
+    def _preload_one(self, name: str, getter: Callable[[], Any], load: Callable[[Any], None]) -> None:
+        stats = self._load_stats[name]
+        stats["status"] = "loading"
+        try:
+            t0 = time.perf_counter()
+            model = getter()
+            load(model)
+            stats["load_seconds"] = round(time.perf_counter() - t0, 3)
+
+            stats["status"] = "warming_up"
+            t0 = time.perf_counter()
+            model.warm_up()
+            stats["warmup_seconds"] = round(time.perf_counter() - t0, 3)
+
+            stats["status"] = "ready"
+            print(
+                f"[ModelManager] {name} model ready "
+                f"(load {stats['load_seconds']}s, warm-up {stats['warmup_seconds']}s)"
+            )
+        except Exception as e:
+            stats["status"] = "failed"
+            stats["error"] = type(e).__name__   # the message (file paths) goes to the log only
+            print(f"[ERROR] ModelManager: Preloading {name} model failed: {e}")
+
+    def preload_before_fork(self) -> None:
+        """
+        Pre-fork servers (gunicorn with preload_app): load and warm the models
+        in the master, synchronously, so every worker inherits them
+        copy-on-write instead of loading its own copy. Models that would break
+        in a forked child (Keras backends, the brain worker-process pool) are
+        left for each worker to load after fork.
+        """
+        self.registry.stop_watcher()    # the master serves nothing, workers watch for new versions
+        for name, definition in self.definitions.items():
+            if not self._fork_safe(definition):
+                print(f"[INFO] ModelManager: {name} model is not fork-safe, workers load it after fork")
+                continue
+            self._load_stats[name] = {"status": "pending"}
+            self._preload_one(name, lambda: self.get_model(name), lambda m: m.load_model())
+
+    def _fork_safe(self, definition: ModelDefinition) -> bool:
+        model_class = definition.load_class()
+        if issubclass(model_class, BrainTumorModel) and int(os.getenv("BRAIN_PROCESS_POOL_WORKERS", "0")) > 0:
+            return False    # the pool's supervisor thread and pipes belong to the master
+        return model_class.fork_safe(**definition.options)
+
+    def after_fork(self) -> None:
+        """
+        Called in each worker right after fork(): restart the background
+        threads the master owned (they do not survive fork) and, with
+        PRELOAD_MODELS on, load whatever the master could not share.
+        """
+        self._lock = threading.RLock()
+        self.registry.after_fork()
+        self.start_registry_watcher()
+        self._preload_thread = None
+        self._preload_done = threading.Event()
+        if _env_flag("PRELOAD_MODELS", False):
+            self.start_preload()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        # Block until the preload thread finished (True) or the timeout expired (False)
+        if self._preload_thread is None:
+            return True
+        return self._preload_done.wait(timeout)
+
+    def get_readiness(self) -> Dict[str, Any]:
+        """
+        Readiness report for health checks:
+            status = "lazy"     -> preload not enabled, models load on first use
+                     "loading"  -> preload still running, hold traffic
+                     "ready"    -> all models loaded and warmed up
+                     "degraded" -> preload finished but a model failed
+        """
+        if self._preload_thread is None:
+            status = "lazy"
+        elif not self._preload_done.is_set():
+            status = "loading"
+        elif all(s.get("status") == "ready" for s in self._load_stats.values()):
+            status = "ready"
+        else:
+            status = "degraded"
+
+        return {
+            "status": status,
+            "models": {name: dict(stats) for name, stats in self._load_stats.items()},
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:    # Runtime metrics for tuning / monitoring
+        brain = self.registry.peek("brain")
+        executor = brain.model.executor if brain is not None else None
+        return {
+            "readiness": self.get_readiness(),
+            "model_registry": self.registry.get_stats(),
+            "brain_batching": (
+                executor.get_stats()
+                if isinstance(executor, BrainBatchScheduler)
+                else {"enabled": False}
+            ),
+            "brain_process_pool": (
+                executor.get_stats()
+                if isinstance(executor, BrainProcessPool)
+                else {"enabled": False}
+            ),
+            "brain_cache": (
+                self._brain_cache.get_stats()
+                if self._brain_cache is not None
+                else {"enabled": False}
+            ),
+            "heart_cache": (
+                self._heart_cache.get_stats()
+                if self._heart_cache is not None
+                else {"enabled": False}
+            ),
+        }
+
+    def shutdown(self) -> None:     # Stop background threads owned by the manager
+        self.registry.shutdown()    # unloads every version (stops batchers / worker pools)
+        if self._brain_cache is not None:
+            self._brain_cache.save()
 
 # Global instance used by services
 model_manager = ModelManager()
\ No newline at end of file
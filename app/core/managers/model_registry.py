@@ -0,0 +1,400 @@
+import gc
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from app.core.metrics.memory import current_rss_bytes
+
+LEGACY_VERSION = "legacy"   # model file in saved_models/ itself, not (yet) in the registry
+
+
+@dataclass
+class ModelSpec:    # How the registry finds, builds, validates and frees one model
+    name: str
+    artifact_name: str                          # file inside each version dir, e.g. heart_model.pkl
+    legacy_path: Path                           # used while the model has no registered versions
+    build: Callable[[Path], Any]                # artifact path -> model instance (loaded or lazy)
+    smoke_test: Callable[[Any], None]           # raises if a freshly loaded version is unusable
+    dispose: Callable[[Any], None]              # release memory / threads of a retired version
+
+
+@dataclass
+class LoadedVersion:    # One version of a model living in memory
+    name: str
+    version: str
+    path: Path
+    model: Any
+    loaded_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    memory_bytes: Optional[int] = None      # RSS growth measured while loading (approximate)
+    in_flight: int = 0          # requests currently holding a lease on this version
+    retired: bool = False       # swapped out / evicted; disposed once in_flight drops to 0
+
+
+class ModelRegistry:
+    """
+    Versioned models with zero-downtime hot swap.
+
+    On-disk layout (one immutable directory per version):
+
+        <root>/<model name>/<version>/<artifact file>
+        <root>/<model name>/ACTIVE          <- text file with the version to serve
+
+    Requests take a lease with `acquire(name)` and keep using that version
+    until they release it, even if a new one is swapped in meanwhile.
+    A watcher thread polls the ACTIVE files; when one changes, the new
+    version is built and smoke-tested in the background, then swapped in
+    atomically. The old version is disposed when its last lease is released.
+
+    Models are loaded on first use. With a memory budget, loading a model
+    evicts the least recently used other models until the resident total
+    fits; with an idle timeout, the watcher also evicts models nobody used
+    for that long. An evicted model is simply loaded again on its next use.
+    """
+
+    ACTIVE_FILE = "ACTIVE"
+
+    def __init__(
+        self,
+        root: str | Path,
+        memory_budget_bytes: Optional[int] = None,
+        idle_timeout_seconds: Optional[float] = None,
+    ) -> None:
+        self.root: Path = Path(root)
+        self.memory_budget_bytes: Optional[int] = memory_budget_bytes or None
+        self.idle_timeout_seconds: Optional[float] = idle_timeout_seconds or None
+        self._specs: Dict[str, ModelSpec] = {}
+        self._current: Dict[str, LoadedVersion] = {}
+        self._errors: Dict[str, Exception] = {}         # first-load failures, re-raised on later calls
+        self._failed_versions: Dict[str, str] = {}      # name -> version that failed its swap
+        self._swaps: Dict[str, int] = {}
+        self._loads: Dict[str, int] = {}
+        self._evictions: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+        self._watcher: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def register(self, spec: ModelSpec) -> None:
+        with self._lock:
+            self._specs[spec.name] = spec
+            self._load_locks[spec.name] = threading.Lock()
+            self._swaps[spec.name] = 0
+            self._loads[spec.name] = 0
+            self._evictions[spec.name] = 0
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    # ------------------------------------------------------------------
+    # Versions on disk
+    # ------------------------------------------------------------------
+    def _model_dir(self, name: str) -> Path:
+        return self.root / name
+
+    def list_versions(self, name: str) -> List[str]:
+        spec = self._specs[name]
+        model_dir = self._model_dir(name)
+        if not model_dir.is_dir():
+            return []
+        return sorted(
+            p.name for p in model_dir.iterdir()
+            if p.is_dir() and (p / spec.artifact_name).exists()
+        )
+
+    def active_version(self, name: str) -> str:
+        # Version named in ACTIVE, or the legacy file when nothing is registered yet
+        try:
+            version = (self._model_dir(name) / self.ACTIVE_FILE).read_text(encoding="utf-8").strip()
+        except OSError:
+            return LEGACY_VERSION
+        return version or LEGACY_VERSION
+
+    def _artifact_path(self, name: str, version: str) -> Path:
+        spec = self._specs[name]
+        if version == LEGACY_VERSION:
+            return spec.legacy_path
+        return self._model_dir(name) / version / spec.artifact_name
+
+    def set_active(self, name: str, version: str) -> None:
+        # Point ACTIVE at a registered version (atomic replace); the watcher / swap() picks it up
+        if version != LEGACY_VERSION and version not in self.list_versions(name):
+            raise ValueError(f"Unknown {name} model version '{version}'")
+        model_dir = self._model_dir(name)
+        model_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = model_dir / (self.ACTIVE_FILE + ".tmp")
+        tmp_path.write_text(version + "\n", encoding="utf-8")
+        os.replace(tmp_path, model_dir / self.ACTIVE_FILE)
+
+    # ------------------------------------------------------------------
+    # Serving
+    # ------------------------------------------------------------------
+    def _build(self, name: str, version: str) -> LoadedVersion:
+        path = self._artifact_path(name, version)
+        rss_before = current_rss_bytes()
+        model = self._specs[name].build(path)
+        rss_after = current_rss_bytes()
+
+        memory_bytes: Optional[int] = None
+        if rss_before is not None and rss_after is not None:
+            memory_bytes = max(0, rss_after - rss_before)
+        self._loads[name] += 1
+        return LoadedVersion(name=name, version=version, path=path, model=model, memory_bytes=memory_bytes)
+
+    def _ensure_loaded(self, name: str) -> LoadedVersion:
+        # First use: build the active version synchronously (same lazy behaviour as before)
+        current = self._current.get(name)
+        if current is not None:
+            return current
+
+        with self._load_locks[name]:
+            current = self._current.get(name)
+            if current is not None:
+                return current
+            if name in self._errors:
+                raise self._errors[name]
+
+            version = self.active_version(name)
+            try:
+                loaded = self._build(name, version)
+            except Exception as e:
+                self._errors[name] = e
+                print(f"[ERROR] ModelRegistry: Loading {name} model version {version} failed: {e}")
+                raise
+            with self._lock:
+                self._current[name] = loaded
+            print(f"[ModelRegistry] Serving {name} model version {version} from: {loaded.path}")
+
+        self._enforce_memory_budget(keep=name)
+        return loaded
+
+    def peek(self, name: str) -> Optional[LoadedVersion]:
+        # Current version if already loaded, without triggering a load
+        return self._current.get(name)
+
+    def get(self, name: str) -> LoadedVersion:
+        # Current version WITHOUT a lease (fine for metrics / warm-up, not for predictions)
+        return self._ensure_loaded(name)
+
+    @contextmanager
+    def acquire(self, name: str) -> Iterator[LoadedVersion]:
+        """
+        Lease the current version of a model for the duration of one request:
+
+            with registry.acquire("brain") as loaded:
+                result = loaded.model.predict(...)
+                version = loaded.version
+        """
+        while True:
+            self._ensure_loaded(name)
+            with self._lock:
+                loaded = self._current.get(name)
+                if loaded is not None:  # None: evicted between load and lease, load again
+                    loaded.in_flight += 1
+                    loaded.last_used = time.time()
+                    break
+        try:
+            yield loaded
+        finally:
+            dispose_now = False
+            with self._lock:
+                loaded.in_flight -= 1
+                dispose_now = loaded.retired and loaded.in_flight == 0
+            if dispose_now:
+                self._dispose(loaded)
+
+    def swap(self, name: str, version: str) -> bool:
+        """
+        Build + smoke-test `version`, then atomically make it the current one.
+        Returns False (and keeps serving the old version) if anything fails.
+        """
+        with self._load_locks[name]:
+            current = self._current.get(name)
+            if current is not None and current.version == version:
+                return True
+
+            t0 = time.perf_counter()
+            new: Optional[LoadedVersion] = None
+            try:
+                new = self._build(name, version)
+                self._specs[name].smoke_test(new.model)
+            except Exception as e:
+                self._failed_versions[name] = version
+                print(f"[ERROR] ModelRegistry: {name} version {version} failed to load, keeping current: {e}")
+                if new is not None:
+                    self._dispose(new)
+                return False
+
+            dispose_now = False
+            with self._lock:
+                old = self._current.get(name)
+                self._current[name] = new
+                self._errors.pop(name, None)
+                self._failed_versions.pop(name, None)
+                self._swaps[name] += 1
+                if old is not None:
+                    old.retired = True
+                    dispose_now = old.in_flight == 0
+
+            print(
+                f"[ModelRegistry] Swapped {name} model to version {version} "
+                f"in {time.perf_counter() - t0:.2f}s"
+            )
+            if old is not None and dispose_now:
+                self._dispose(old)
+
+        self._enforce_memory_budget(keep=name)
+        return True
+
+    def _dispose(self, loaded: LoadedVersion) -> None:
+        try:
+            self._specs[loaded.name].dispose(loaded.model)
+        except Exception as e:
+            print(f"[ERROR] ModelRegistry: Disposing {loaded.name} version {loaded.version} failed: {e}")
+        loaded.model = None
+        gc.collect()
+        print(f"[ModelRegistry] Unloaded {loaded.name} model version {loaded.version}")
+
+    # ------------------------------------------------------------------
+    # Eviction (memory budget / idle timeout)
+    # ------------------------------------------------------------------
+    def evict(self, name: str, reason: str = "manual") -> bool:
+        # Drop the serving version; in-flight requests keep it until they finish
+        with self._lock:
+            loaded = self._current.pop(name, None)
+            if loaded is None:
+                return False
+            loaded.retired = True
+            self._evictions[name] += 1
+            dispose_now = loaded.in_flight == 0
+        print(f"[ModelRegistry] Evicting {name} model version {loaded.version} ({reason})")
+        if dispose_now:
+            self._dispose(loaded)
+        return True
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(loaded.memory_bytes or 0 for loaded in self._current.values())
+
+    def _enforce_memory_budget(self, keep: str) -> None:
+        # Evict least recently used models (idle ones first) until the budget fits
+        if self.memory_budget_bytes is None:
+            return
+        while True:
+            with self._lock:
+                if self.resident_bytes() <= self.memory_budget_bytes:
+                    return
+                candidates = sorted(
+                    (loaded for name, loaded in self._current.items() if name != keep),
+                    key=lambda loaded: (loaded.in_flight > 0, loaded.last_used),
+                )
+            if not candidates:
+                print(
+                    f"[WARNING] ModelRegistry: {keep} model alone exceeds the memory budget "
+                    f"({self.resident_bytes() / 2**20:.0f} MB > {self.memory_budget_bytes / 2**20:.0f} MB)"
+                )
+                return
+            self.evict(candidates[0].name, reason="memory budget")
+
+    def evict_idle(self) -> None:
+        if self.idle_timeout_seconds is None:
+            return
+        cutoff = time.time() - self.idle_timeout_seconds
+        with self._lock:
+            idle = [
+                name for name, loaded in self._current.items()
+                if loaded.in_flight == 0 and loaded.last_used < cutoff
+            ]
+        for name in idle:
+            self.evict(name, reason=f"idle for more than {self.idle_timeout_seconds:.0f}s")
+
+    # ------------------------------------------------------------------
+    # Watching ACTIVE for new deployments
+    # ------------------------------------------------------------------
+    def check_for_updates(self) -> None:
+        # Swap every loaded model whose ACTIVE version changed (skips a version that already failed)
+        for name in list(self._specs):
+            current = self._current.get(name)
+            if current is None:
+                continue    # not loaded yet: first use will pick up the active version
+            version = self.active_version(name)
+            if version != current.version and self._failed_versions.get(name) != version:
+                self.swap(name, version)
+
+    def start_watcher(self, poll_seconds: float = 10.0) -> None:
+        if self._watcher is not None or poll_seconds <= 0:
+            return
+        self._stopping.clear()
+        self._watcher = threading.Thread(
+            target=self._watch_loop,
+            args=(poll_seconds,),
+            name="model-registry-watcher",
+            daemon=True,
+        )
+        self._watcher.start()
+
+    def _watch_loop(self, poll_seconds: float) -> None:
+        while not self._stopping.wait(poll_seconds):
+            try:
+                self.check_for_updates()
+                self.evict_idle()
+            except Exception as e:
+                print(f"[ERROR] ModelRegistry: Checking for new model versions failed: {e}")
+
+    def stop_watcher(self) -> None:
+        self._stopping.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5.0)
+        self._watcher = None
+
+    def after_fork(self) -> None:
+        # Threads do not survive fork(): forget the parent's watcher and give the
+        # child fresh locks (one may have been held by a thread that no longer exists)
+        self._watcher = None
+        self._stopping = threading.Event()
+        self._lock = threading.RLock()
+        self._load_locks = {name: threading.Lock() for name in self._specs}
+
+    def shutdown(self) -> None:
+        self.stop_watcher()
+        with self._lock:
+            loaded_versions = list(self._current.values())
+            self._current.clear()
+        for loaded in loaded_versions:
+            self._dispose(loaded)
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            models: Dict[str, Any] = {}
+            for name in self._specs:
+                current = self._current.get(name)
+                models[name] = {
+                    "active_version": self.active_version(name),
+                    "serving_version": current.version if current is not None else None,
+                    "in_flight": current.in_flight if current is not None else 0,
+                    "memory_mb": (
+                        round(current.memory_bytes / 2**20, 1)
+                        if current is not None and current.memory_bytes is not None
+                        else None
+                    ),
+                    "idle_seconds": round(now - current.last_used, 1) if current is not None else None,
+                    "available_versions": self.list_versions(name),
+                    "loads": self._loads[name],
+                    "swaps": self._swaps[name],
+                    "evictions": self._evictions[name],
+                    "failed_version": self._failed_versions.get(name),
+                }
+            return {
+                "memory_budget_mb": (
+                    round(self.memory_budget_bytes / 2**20, 1) if self.memory_budget_bytes is not None else None
+                ),
+                "resident_mb": round(self.resident_bytes() / 2**20, 1),
+                "idle_timeout_seconds": self.idle_timeout_seconds,
+                "models": models,
+            }
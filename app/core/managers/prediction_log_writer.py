@@ -0,0 +1,334 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from app.core.managers.database_manager import DatabaseManager, db_manager
+
+# Skips the row when its user cleared the history (or deleted the account) at or after created_at:
+# another worker may still have had it queued at that moment
+INSERT_PREDICTION_LOG = """
+    INSERT INTO prediction_logs (
+        id, user_id, model_type, input_summary,
+        prediction_result, probability, created_at, model_version,
+        features, probabilities
+    )
+    SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10
+    WHERE NOT EXISTS (
+        SELECT 1 FROM prediction_history_clears WHERE user_id = ?2 AND cleared_at >= ?7
+    )
+"""
+
+RECORD_HISTORY_CLEAR = """
+    INSERT OR REPLACE INTO prediction_history_clears (user_id, cleared_at) VALUES (?, ?)
+"""
+
+LogRow = Tuple[int, int, str, Optional[str], str, Optional[float], str, Optional[str], Optional[str], Optional[str]]
+
+
+def to_json(values: Optional[Dict[str, float]]) -> Optional[str]:
+    # Compact JSON object for the features / probabilities columns (key order kept)
+    if not values:
+        return None
+    return json.dumps({key: float(value) for key, value in values.items()}, separators=(",", ":"))
+
+
+class PredictionLogWriter:
+    """
+    Writes prediction_logs rows from a background thread instead of the
+    request thread: log() queues the row and returns at once, and the thread
+    inserts whatever is queued with ONE executemany / commit per batch
+    (PREDICTION_LOG_BATCH_SIZE rows or PREDICTION_LOG_FLUSH_MS, whichever
+    comes first).
+
+    Callers still get the row id immediately: ids are taken from blocks
+    reserved in sqlite_sequence (PREDICTION_LOG_ID_BLOCK at a time, one
+    short transaction per block), which is safe across threads and worker
+    processes. wait_for(log_id) blocks until that row is committed, for
+    readers that need it (report pages).
+
+    The queue is bounded (PREDICTION_LOG_QUEUE_SIZE); when it is full, log()
+    falls back to a synchronous insert rather than dropping the row. A batch
+    that fails is retried row by row; only rows that still fail report an
+    error to wait_for().
+
+    flush() only reaches this process's queue. Clearing a user's history
+    therefore also records a tombstone (RECORD_HISTORY_CLEAR): rows created
+    before it that any worker still had queued are skipped on insert.
+    PREDICTION_LOG_ASYNC=0 makes every log() synchronous.
+    """
+
+    def __init__(self, db: DatabaseManager) -> None:
+        self.db = db
+        self.enabled: bool = os.getenv("PREDICTION_LOG_ASYNC", "1").strip().lower() in ("1", "true", "yes", "on")
+        self.batch_size: int = max(1, int(os.getenv("PREDICTION_LOG_BATCH_SIZE", "100")))
+        self.flush_interval: float = float(os.getenv("PREDICTION_LOG_FLUSH_MS", "50")) / 1000.0
+        self.queue_size: int = int(os.getenv("PREDICTION_LOG_QUEUE_SIZE", "10000"))
+        self.id_block: int = max(1, int(os.getenv("PREDICTION_LOG_ID_BLOCK", "64")))
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._id_lock = threading.Lock()
+        self._pid: int = os.getpid()
+        self._next_id: int = 0          # next unused id of the reserved block
+        self._block_end: int = 0        # last id of the reserved block
+        self._pending: Dict[int, Future] = {}
+        self._failed_ids: Deque[int] = deque(maxlen=1000)     # recent rows that could not be written
+
+        # Counters
+        self._stats: Dict[str, int] = {
+            "enqueued": 0, "written": 0, "failed": 0, "sync_writes": 0,
+            "flushes": 0, "id_blocks": 0, "max_queue_depth": 0,
+        }
+        self._flush_ms: Deque[float] = deque(maxlen=1000)
+        atexit.register(self.shutdown)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def log(
+        self,
+        user_id: int,
+        model_type: str,
+        input_summary: Optional[str],
+        prediction_result: str,
+        probability: Optional[float],
+        created_at: str,
+        model_version: Optional[str] = None,
+        features: Optional[Dict[str, float]] = None,
+        probabilities: Optional[Dict[str, float]] = None,
+    ) -> int:
+        # Queue one prediction_logs row and return its id (the row is committed shortly after)
+        if os.getpid() != self._pid:
+            self._after_fork()
+
+        log_id = self._allocate_id()
+        row: LogRow = (log_id, user_id, model_type, input_summary, prediction_result,
+                       probability, created_at, model_version, to_json(features), to_json(probabilities))
+
+        if not self.enabled:
+            self._write_sync(row)
+            return log_id
+
+        future: Future = Future()
+        with self._lock:
+            self._pending[log_id] = future
+        self._start()
+        try:
+            self._queue.put_nowait((row, future))
+        except queue.Full:
+            # Back-pressure: the database is not keeping up, write on the caller's thread
+            with self._lock:
+                self._pending.pop(log_id, None)
+            self._write_sync(row)
+            return log_id
+
+        with self._lock:
+            self._stats["enqueued"] += 1
+            depth = self._queue.qsize()
+            if depth > self._stats["max_queue_depth"]:
+                self._stats["max_queue_depth"] = depth
+        return log_id
+
+    def wait_for(self, log_id: int, timeout: float = 2.0) -> bool:
+        # Block until a queued row is committed; True right away if it is not pending here
+        with self._lock:
+            future = self._pending.get(log_id)
+            failed = log_id in self._failed_ids
+        if future is None:
+            return not failed
+        try:
+            future.result(timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        # Commit everything queued so far (the marker is handled after every row ahead of it).
+        # Only this process's queue: other gunicorn workers keep their own until their next batch
+        # (see RECORD_HISTORY_CLEAR)
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        marker: Future = Future()
+        self._queue.put(marker)
+        try:
+            marker.result(timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        # Flush and stop the thread (app / worker exit)
+        if os.getpid() != self._pid:
+            return
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)   # stop after the rows already queued
+            thread.join(timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            flush_ms = sorted(self._flush_ms)
+        stats.update({
+            "enabled": self.enabled,
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self.queue_size,
+            "avg_batch_size": round(stats["written"] / stats["flushes"], 2) if stats["flushes"] else 0.0,
+            "flush_ms_p50": self._percentile(flush_ms, 0.50),
+            "flush_ms_p99": self._percentile(flush_ms, 0.99),
+            "flush_ms_max": round(flush_ms[-1], 3) if flush_ms else 0.0,
+        })
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _percentile(sorted_values: List[float], q: float) -> float:
+        if not sorted_values:
+            return 0.0
+        return round(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))], 3)
+
+    def _allocate_id(self) -> int:
+        with self._id_lock:
+            if self._next_id == 0 or self._next_id > self._block_end:
+                first, last = self.db.run_in_transaction(self._reserve_ids)
+                self._next_id, self._block_end = first, last
+                with self._lock:
+                    self._stats["id_blocks"] += 1
+            log_id = self._next_id
+            self._next_id += 1
+            return log_id
+
+    def _reserve_ids(self, conn: sqlite3.Connection) -> Tuple[int, int]:
+        # Bump prediction_logs' AUTOINCREMENT counter by one block: no other insert
+        # (in any process) can get these ids, and unused ones are just skipped
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'prediction_logs'").fetchone()
+        top = conn.execute("SELECT COALESCE(MAX(id), 0) FROM prediction_logs").fetchone()[0]
+        start = max(row[0] if row is not None else 0, top)
+        end = start + self.id_block
+        if row is not None:
+            conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'prediction_logs'", (end,))
+        else:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('prediction_logs', ?)", (end,))
+        return start + 1, end
+
+    def _write_sync(self, row: LogRow) -> None:
+        self.db.execute(INSERT_PREDICTION_LOG, row)
+        with self._lock:
+            self._stats["sync_writes"] += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="prediction-log-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: List[Tuple[LogRow, Future]] = []
+            markers: List[Future] = []
+            stop = False
+
+            # Collect until the batch is full or the flush interval since the first item is over
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, Future):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stop or markers or len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._flush(batch)
+            for marker in markers:
+                marker.set_result(True)
+            if stop:
+                return
+
+    def _flush(self, batch: List[Tuple[LogRow, Future]]) -> None:
+        t0 = time.perf_counter()
+        errors: Dict[int, Exception] = {}
+        try:
+            self.db.execute_many(INSERT_PREDICTION_LOG, [row for row, _ in batch])
+        except Exception as e:
+            # The batch was rolled back as a whole: retry row by row so one bad row (or a
+            # transient error) does not lose the others, whose ids callers already hold
+            print(f"[WARNING] PredictionLogWriter: Batch of {len(batch)} prediction logs failed ({e}), "
+                  f"retrying one by one")
+            for row, _ in batch:
+                error = self._insert_one(row)
+                if error is not None:
+                    errors[row[0]] = error
+            if errors:
+                print(f"[ERROR] PredictionLogWriter: Failed to write {len(errors)} prediction logs: "
+                      f"{next(iter(errors.values()))}")
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        with self._lock:
+            self._stats["flushes"] += 1
+            self._stats["written"] += len(batch) - len(errors)
+            self._stats["failed"] += len(errors)
+            self._flush_ms.append(elapsed_ms)
+            for row, _ in batch:
+                self._pending.pop(row[0], None)
+            self._failed_ids.extend(errors)
+        for row, future in batch:
+            error = errors.get(row[0])
+            if error is None:
+                future.set_result(True)
+            else:
+                future.set_exception(error)
+
+    def _insert_one(self, row: LogRow) -> Optional[Exception]:
+        # Single-row insert; None when the row is in the table afterwards
+        try:
+            self.db.execute(INSERT_PREDICTION_LOG, row)
+            return None
+        except sqlite3.IntegrityError as e:
+            # Ids are reserved for this row only: if the id exists, an earlier attempt did commit
+            try:
+                if self.db.fetch_one("SELECT 1 FROM prediction_logs WHERE id = ?", (row[0],)) is not None:
+                    return None
+            except Exception:
+                pass
+            return e
+        except Exception as e:
+            return e
+
+    def _after_fork(self) -> None:
+        # The parent's thread, queue and reserved ids are not ours (ids would be duplicated);
+        # fresh locks too, in case another parent thread held one at fork time
+        self._lock = threading.Lock()
+        self._id_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._thread = None
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._next_id = 0
+        self._block_end = 0
+        self._pending = {}
+        self._failed_ids = deque(maxlen=1000)
+
+
+prediction_log_writer = PredictionLogWriter(db_manager)    # global instance used by the services
@@ -0,0 +1,123 @@
+import sqlite3
+from typing import Any, Dict, List, Tuple
+
+# user_prediction_summary: one row per (user, model_type) with the prediction
+# count and the latest prediction (latest = highest (created_at, id)), kept in
+# step with prediction_logs by triggers. Every write path (the background log
+# writer, CSV batches, history clearing, retention deletes) therefore maintains
+# it inside its own transaction, with no extra code at the call site.
+
+SUMMARY_COLUMNS = (
+    "user_id", "model_type", "prediction_count", "latest_log_id", "latest_result",
+    "latest_probability", "latest_input_summary", "latest_created_at",
+)
+
+# What the summary must contain, computed from scratch (logs of existing users only)
+SUMMARY_FROM_LOGS = """
+    SELECT user_id, model_type, n, id, prediction_result, probability, input_summary, created_at
+    FROM (
+        SELECT l.*,
+               ROW_NUMBER() OVER (PARTITION BY user_id, model_type ORDER BY created_at DESC, id DESC) AS rn,
+               COUNT(*) OVER (PARTITION BY user_id, model_type) AS n
+        FROM prediction_logs l
+        WHERE user_id IN (SELECT id FROM users)
+    )
+    WHERE rn = 1
+"""
+
+CREATE_SUMMARY_TABLE = """
+    CREATE TABLE IF NOT EXISTS user_prediction_summary (
+        user_id INTEGER NOT NULL,
+        model_type TEXT NOT NULL,
+        prediction_count INTEGER NOT NULL,
+        latest_log_id INTEGER NOT NULL,
+        latest_result TEXT,
+        latest_probability REAL,
+        latest_input_summary TEXT,
+        latest_created_at TEXT NOT NULL,
+        PRIMARY KEY (user_id, model_type)
+    ) WITHOUT ROWID;
+"""
+
+CREATE_SUMMARY_TRIGGERS = (
+    # New log: count it, and make it the latest one if it is newer
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_prediction_logs_summary_insert
+    AFTER INSERT ON prediction_logs
+    WHEN NEW.user_id IN (SELECT id FROM users)
+    BEGIN
+        INSERT INTO user_prediction_summary (
+            user_id, model_type, prediction_count, latest_log_id, latest_result,
+            latest_probability, latest_input_summary, latest_created_at
+        )
+        VALUES (NEW.user_id, NEW.model_type, 1, NEW.id, NEW.prediction_result,
+                NEW.probability, NEW.input_summary, NEW.created_at)
+        ON CONFLICT (user_id, model_type) DO UPDATE SET prediction_count = prediction_count + 1;
+
+        UPDATE user_prediction_summary
+        SET latest_log_id = NEW.id, latest_result = NEW.prediction_result,
+            latest_probability = NEW.probability, latest_input_summary = NEW.input_summary,
+            latest_created_at = NEW.created_at
+        WHERE user_id = NEW.user_id AND model_type = NEW.model_type
+          AND (latest_created_at, latest_log_id) < (NEW.created_at, NEW.id);
+    END;
+    """,
+    # Deleted log: uncount it; drop the row at zero; if it was the latest, look up the new latest
+    # (one index seek, and only for that one deleted row)
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_prediction_logs_summary_delete
+    AFTER DELETE ON prediction_logs
+    BEGIN
+        UPDATE user_prediction_summary SET prediction_count = prediction_count - 1
+        WHERE user_id = OLD.user_id AND model_type = OLD.model_type;
+
+        DELETE FROM user_prediction_summary
+        WHERE user_id = OLD.user_id AND model_type = OLD.model_type AND prediction_count <= 0;
+
+        UPDATE user_prediction_summary
+        SET (latest_log_id, latest_result, latest_probability, latest_input_summary, latest_created_at) = (
+            SELECT id, prediction_result, probability, input_summary, created_at
+            FROM prediction_logs
+            WHERE user_id = OLD.user_id AND model_type = OLD.model_type
+            ORDER BY created_at DESC, id DESC
+            LIMIT 1
+        )
+        WHERE user_id = OLD.user_id AND model_type = OLD.model_type AND latest_log_id = OLD.id;
+    END;
+    """,
+    # Deleted account: its summary goes with it
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_users_summary_delete
+    AFTER DELETE ON users
+    BEGIN
+        DELETE FROM user_prediction_summary WHERE user_id = OLD.id;
+    END;
+    """,
+)
+
+
+def rebuild_prediction_summary(conn: sqlite3.Connection) -> int:
+    # Recompute the whole table from prediction_logs (caller commits); returns rows written
+    conn.execute("DELETE FROM user_prediction_summary")
+    cursor = conn.execute(f"INSERT INTO user_prediction_summary ({', '.join(SUMMARY_COLUMNS)}) {SUMMARY_FROM_LOGS}")
+    return cursor.rowcount
+
+
+def find_summary_mismatches(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """
+    Compare user_prediction_summary with a from-scratch computation.
+    Returns one {"key", "stored", "expected"} entry per differing
+    (user_id, model_type); empty when the table is consistent.
+    """
+    expected: Dict[Tuple[int, str], tuple] = {
+        (row[0], row[1]): tuple(row) for row in conn.execute(SUMMARY_FROM_LOGS)
+    }
+    stored: Dict[Tuple[int, str], tuple] = {
+        (row[0], row[1]): tuple(row)
+        for row in conn.execute(f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM user_prediction_summary")
+    }
+    return [
+        {"key": key, "stored": stored.get(key), "expected": expected.get(key)}
+        for key in sorted(expected.keys() | stored.keys(), key=lambda k: (k[0], k[1]))
+        if stored.get(key) != expected.get(key)
+    ]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Sequence
+
+
+class Histogram:    # Thread-safe fixed-bucket histogram for sizes / latencies
+    """
+    Very small histogram used to expose runtime metrics (batch sizes,
+    queue wait times, flush latencies, ...).
+
+    Buckets are upper bounds (inclusive). Values above the last bound are
+    counted in the "+Inf" bucket.
+    """
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self._bounds: List[float] = sorted(float(b) for b in buckets)
+        self._counts: List[int] = [0] * (len(self._bounds) + 1)
+        self._count: int = 0
+        self._sum: float = 0.0
+        self._max: float = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self._bounds) + 1)
+            self._count = 0
+            self._sum = 0.0
+            self._max = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        # Return a JSON-friendly copy of the current state
+        with self._lock:
+            counts = list(self._counts)
+            count = self._count
+            total = self._sum
+            max_value = self._max
+
+        buckets: Dict[str, int] = {}
+        for bound, n in zip(self._bounds, counts):
+            label = f"{bound:g}"
+            buckets[f"<={label}"] = n
+        buckets["+Inf"] = counts[-1]
+
+        return {
+            "count": count,
+            "sum": round(total, 6),
+            "mean": round(total / count, 6) if count else 0.0,
+            "max": round(max_value, 6),
+            "buckets": buckets,
+        }
@@ -0,0 +1,35 @@
+from __future__ import annotations
+import os
+from typing import Optional
+
+
+def current_rss_bytes() -> Optional[int]:   # Resident set size of this process, None if unknown
+    # Linux: /proc is cheap to read and always current
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    # Other Unixes: peak RSS only (KB on Linux/BSD, bytes on macOS) -> still a usable upper bound
+    try:
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def peak_rss_bytes(children: bool = False) -> Optional[int]:   # Peak RSS so far, None where unknown (Windows)
+    # children=True: the largest terminated-and-waited-for child process (e.g. pool workers)
+    try:
+        import resource
+        import sys
+
+        who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+        peak = resource.getrusage(who).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
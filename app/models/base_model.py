@@ -11,6 +11,9 @@ class BaseDiseaseModel(ABC):
     Provides a common interface so different disease models can be treated
     polymorphically (e.g., in a list[BaseDiseaseModel]) while keeping each
     model's internal details independent.
+
+    ModelManager relies on this interface to load models on demand,
+    validate new versions and evict idle ones under a memory budget.
     """
 
     def __init__(self, model_path: str | Path) -> None:
@@ -18,6 +21,14 @@ class BaseDiseaseModel(ABC):
         self._model_path: Path = Path(model_path)
         self._loaded_model: Any | None = None
 
+    @property
+    def loaded_model(self) -> Any | None:
+        return self._loaded_model
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_model is not None
+
     @abstractmethod
     def load_model(self) -> None:
         """Load the underlying ML model into memory."""
@@ -25,3 +36,20 @@ class BaseDiseaseModel(ABC):
     @abstractmethod
     def predict(self, *args: Any, **kwargs: Any) -> Any:
         """Run a prediction using the loaded model."""
+
+    def warm_up(self) -> None:
+        """Load the model and run one synthetic prediction (optional)."""
+        self.load_model()
+
+    def smoke_test(self) -> None:
+        """Raise if a freshly loaded model gives unusable output."""
+        self.warm_up()
+
+    @classmethod
+    def fork_safe(cls, **options: Any) -> bool:
+        """Whether a model loaded before fork() keeps working in the child."""
+        return True
+
+    def unload(self) -> None:
+        """Drop the loaded model so its memory can be reclaimed."""
+        self._loaded_model = None
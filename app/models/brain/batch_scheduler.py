@@ -0,0 +1,173 @@
+from __future__ import annotations
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from app.core.metrics.histogram import Histogram
+
+
+@dataclass
+class _PendingRequest:  # One preprocessed image waiting for a forward pass
+    x: np.ndarray
+    future: Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class BrainBatchScheduler:
+    """
+    Dynamic micro-batching in front of the brain CNN.
+
+    Concurrent callers submit single preprocessed images (shape (1, H, W, 3)).
+    A background thread collects them until either `max_batch_size` images
+    are waiting or `max_wait_ms` has passed since the first one arrived,
+    runs ONE forward pass on the stacked batch and hands each caller its
+    own row of probabilities.
+    """
+
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+    WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 20, 50, 100, 250)
+
+    def __init__(
+        self,
+        run_batch: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0")
+
+        self._run_batch = run_batch     # (N, H, W, 3) -> (N, num_classes)
+        self.loads_model: bool = False  # forward passes run in this process
+        self.max_batch_size: int = max_batch_size
+        self.max_wait_ms: float = max_wait_ms
+
+        self._queue: "queue.Queue[_PendingRequest]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+        # Metrics
+        self.batch_size_histogram = Histogram(self.BATCH_SIZE_BUCKETS)
+        self.wait_ms_histogram = Histogram(self.WAIT_MS_BUCKETS)
+        self._batches_run: int = 0
+        self._batch_errors: int = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        # Start the worker thread (idempotent, also called lazily on submit)
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._worker_loop,
+                name="brain-batch-scheduler",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def warm_up(self) -> None:
+        self.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+        # Fail anything still waiting so callers don't hang forever
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if not pending.future.done():
+                pending.future.set_exception(RuntimeError("Brain batch scheduler stopped."))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def submit(self, x: np.ndarray) -> Future:
+        # Queue one preprocessed image of shape (1, H, W, 3); returns a Future of its probabilities
+        if x.ndim != 4 or x.shape[0] != 1:
+            raise ValueError(f"Expected a single image with shape (1, H, W, 3), got {x.shape}")
+
+        self.start()
+        future: Future = Future()
+        self._queue.put(_PendingRequest(x=x, future=future))
+        return future
+
+    def predict(self, x: np.ndarray, timeout: Optional[float] = None) -> np.ndarray:
+        # Blocking helper: submit and wait for the (num_classes,) probability vector
+        return self.submit(x).result(timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queue_depth": self._queue.qsize(),
+            "batches_run": self._batches_run,
+            "batch_errors": self._batch_errors,
+            "batch_size": self.batch_size_histogram.snapshot(),
+            "wait_ms": self.wait_ms_histogram.snapshot(),
+        }
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+    def _collect_batch(self) -> List[_PendingRequest]:
+        # Block for the first request, then gather more until size or time limit
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait_ms / 1000.0
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    # Window closed: still take whatever is already queued
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _worker_loop(self) -> None:
+        while not self._stopping.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            started_at = time.perf_counter()
+            for pending in batch:
+                self.wait_ms_histogram.observe((started_at - pending.enqueued_at) * 1000.0)
+            self.batch_size_histogram.observe(len(batch))
+
+            try:
+                x = np.concatenate([pending.x for pending in batch], axis=0)
+                preds = self._run_batch(x)
+            except Exception as e:
+                self._batch_errors += 1
+                print(f"[ERROR] BrainBatchScheduler: Batch of {len(batch)} failed: {e}")
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                continue
+
+            self._batches_run += 1
+            for i, pending in enumerate(batch):
+                if not pending.future.done():
+                    pending.future.set_result(preds[i])
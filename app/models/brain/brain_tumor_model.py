@@ -1,18 +1,36 @@
 from __future__ import annotations
+import hashlib
+import threading
+from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, List, Optional
 import numpy as np
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras.utils import load_img, img_to_array   # type: ignore
+from PIL import Image
 
+# TensorFlow is NOT imported here: the inference backends import it on first
+# load, so heart-only / auth-only processes never pay its import time or RSS.
+from app.models.base_model import BaseDiseaseModel
+from app.models.brain.inference_backends import (
+    BACKEND_NAMES,
+    FORK_SAFE_BACKENDS,
+    InferenceBackend,
+    create_backend,
+    tflite_artifact_path,
+)
 
-class BrainTumorModel:  # Wrapper around the trained 4-class CNN for brain tumor detection
+if TYPE_CHECKING:
+    from app.models.brain.batch_scheduler import BrainBatchScheduler
+    from app.models.brain.process_pool import BrainProcessPool
+    from app.models.brain.prediction_cache import BrainPredictionCache
+
+
+class BrainTumorModel(BaseDiseaseModel):  # Wrapper around the trained 4-class CNN for brain tumor detection
 
     def __init__(
         self,
         model_path: str | Path | None = None,
         img_size: tuple[int, int] = (128, 128),
+        backend: str = "keras",
     ) -> None:
         # Locate app directory: .../Multi Disease Detection System/app
         app_dir = Path(__file__).resolve().parents[2]
@@ -23,10 +41,31 @@ class BrainTumorModel:  # Wrapper around the trained 4-class CNN for brain tumor
 
         # 🔹 IMPORTANT: always convert to Path, even if a string was passed
         self.model_path: Path = Path(model_path)
+        super().__init__(self.model_path)
 
         self.img_size: tuple[int, int] = img_size
 
-        self._model: keras.Model | None = None
+        # Inference backend: "keras" (.h5 via model.predict), "keras_compiled"
+        # (.h5 via pre-traced fixed-shape tf.functions) or a quantized TFLite
+        # artifact ("tflite_float16" / "tflite_int8", exported next to the .h5 file)
+        if backend not in BACKEND_NAMES:
+            raise ValueError(f"Unknown brain inference backend '{backend}'. Expected one of {BACKEND_NAMES}")
+        self.backend_name: str = backend
+
+        self._loaded_model: InferenceBackend | None = None   # forward-pass strategy, see inference_backends.py
+        self._load_lock = threading.Lock()
+
+        # Optional executor for single-image forward passes (attached by ModelManager):
+        # a micro-batching scheduler or a pool of worker processes
+        self._executor: Optional[BrainBatchScheduler | BrainProcessPool] = None
+
+        # Optional content-addressed result cache (attached by ModelManager)
+        self._cache: Optional[BrainPredictionCache] = None
+
+        # (mtime_ns, size) of the model file -> used to detect retrained models
+        self._loaded_file_stat: Optional[tuple[int, int]] = None
+        self._fingerprint_stat: Optional[tuple[int, int]] = None
+        self._fingerprint: Optional[str] = None
 
         # Make sure this matches class_names from training
         self.class_names: List[str] = [
@@ -36,19 +75,62 @@ class BrainTumorModel:  # Wrapper around the trained 4-class CNN for brain tumor
             "pituitary",
         ]
         
-    def _ensure_model_loaded(self) -> None:
-        if self._model is not None:
-            return
+    @property
+    def artifact_path(self) -> Path:
+        # File actually loaded by the selected backend
+        if not self.backend_name.startswith("tflite_"):
+            return self.model_path
+        return tflite_artifact_path(self.model_path, self.backend_name[len("tflite_"):])
 
-        if not self.model_path.exists():
+    def _file_stat(self) -> tuple[int, int]:
+        artifact_path = self.artifact_path
+        if not artifact_path.exists():
+            if self.backend_name.startswith("tflite_"):
+                raise FileNotFoundError(
+                    f"Brain tumor TFLite model not found at: {artifact_path}\n"
+                    "Run model_training/brain_tumor/export_brain_tflite.py to "
+                    "export the quantized artifacts."
+                )
             raise FileNotFoundError(
                 f"Brain tumor model file not found at: {self.model_path}\n"
                 "Make sure you have trained the 4-class model and saved it "
                 "to this location."
             )
+        st = artifact_path.stat()
+        return (st.st_mtime_ns, st.st_size)
+
+    @property
+    def model_version(self) -> str:
+        """
+        Backend name + short content hash of the loaded artifact on disk.
+        Only re-hashed when the file's mtime/size change, so this is cheap per call.
+        """
+        stat = self._file_stat()
+        if self._fingerprint is None or stat != self._fingerprint_stat:
+            digest = hashlib.sha256()
+            with open(self.artifact_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            self._fingerprint = f"{self.backend_name}-{digest.hexdigest()[:16]}"
+            self._fingerprint_stat = stat
+        return self._fingerprint
+
+    def _ensure_model_loaded(self) -> None:
+        if self._loaded_model is not None and self._file_stat() == self._loaded_file_stat:
+            return
 
-        self._model = keras.models.load_model(self.model_path)  # Load the trained CNN
-        print(f"[BrainTumorModel] Loaded model from: {self.model_path}")
+        with self._load_lock:   # Concurrent first requests must not load the CNN twice
+            stat = self._file_stat()
+            if self._loaded_model is not None:
+                if stat == self._loaded_file_stat:
+                    return
+                print(f"[BrainTumorModel] Model file changed on disk, reloading: {self.artifact_path}")
+
+            model = create_backend(self.backend_name, self.model_path)
+            model.load()    # Load the trained CNN
+            self._loaded_model = model
+            self._loaded_file_stat = stat
+            print(f"[BrainTumorModel] Loaded {self.backend_name} model from: {self.artifact_path}")
 
     def _preprocess_image(self, image_path: str | Path) -> np.ndarray:
         """
@@ -65,20 +147,48 @@ class BrainTumorModel:  # Wrapper around the trained 4-class CNN for brain tumor
             raise FileNotFoundError(f"Image not found at: {image_path}")
 
         try:
-            # Load & resize image to RGB format
-            # load_img returns a PIL Image in RGB mode
-            img = load_img(
-                str(image_path),  # Ensure string path for load_img
-                target_size=self.img_size,
-                color_mode="rgb",
-            )
+            # Load & resize image to RGB format (same result as keras load_img)
+            with open(image_path, "rb") as f:
+                img = self._decode_image(f)
         except Exception as e:
             raise ValueError(f"Failed to load image from {image_path}: {str(e)}")
-        
+
+        return self._image_to_tensor(img)
+
+    def _preprocess_bytes(self, image_data: bytes | BinaryIO) -> np.ndarray:
+        """
+        Same preprocessing as _preprocess_image, but decodes straight from an
+        in-memory buffer (e.g. the upload stream) instead of a file on disk.
+        """
+        if isinstance(image_data, (bytes, bytearray, memoryview)):
+            if len(image_data) == 0:
+                raise ValueError("Uploaded image is empty.")
+            stream: BinaryIO = BytesIO(image_data)
+        else:
+            stream = image_data
+
+        try:
+            img = self._decode_image(stream)
+        except Exception as e:
+            raise ValueError(f"Failed to decode image data: {str(e)}")
+
+        return self._image_to_tensor(img)
+
+    def _decode_image(self, stream: BinaryIO) -> Image.Image:
+        # Mirrors keras load_img(target_size, color_mode="rgb"): RGB + nearest-neighbour resize
+        with Image.open(stream) as raw:
+            img = raw.convert("RGB") if raw.mode != "RGB" else raw.copy()
+        width_height = (self.img_size[1], self.img_size[0])
+        if img.size != width_height:
+            img = img.resize(width_height, Image.NEAREST)
+        return img
+
+    def _image_to_tensor(self, img: Image.Image) -> np.ndarray:
+        # Decoded RGB PIL image (already resized) -> (1, 128, 128, 3) float32 tensor
         try:
             # Convert PIL image to numpy array
-            # img_to_array returns values in [0, 255] range by default
-            img_array = img_to_array(img).astype("float32")
+            # Values stay in [0, 255] range (same as keras img_to_array)
+            img_array = np.asarray(img, dtype="float32")
             
             # The model has a Rescaling(1.0/255) layer built-in, so it expects
             # pixel values in [0, 255] range and will normalize internally
@@ -105,19 +215,81 @@ class BrainTumorModel:  # Wrapper around the trained 4-class CNN for brain tumor
         except Exception as e:
             raise ValueError(f"Failed to preprocess image: {str(e)}")
 
-    def predict(self, image_path: str | Path) -> Dict[str, Any]:
+    def attach_executor(self, executor: Optional[BrainBatchScheduler | BrainProcessPool]) -> None:
+        # Route single-image forward passes through a batching scheduler or process pool
+        self._executor = executor
+
+    @property
+    def executor(self) -> Optional[BrainBatchScheduler | BrainProcessPool]:
+        return self._executor
+
+    def attach_cache(self, cache: Optional[BrainPredictionCache]) -> None:
+        # Serve repeated scans from a content-addressed cache instead of the CNN
+        self._cache = cache
+
+    def predict_batch(self, x: np.ndarray) -> np.ndarray:
+        """
+        Run ONE forward pass on an already preprocessed batch.
+        x has shape (N, 128, 128, 3) -> returns probabilities of shape (N, num_classes).
+        """
         self._ensure_model_loaded()
 
-        assert self._model is not None  # for type checkers
+        assert self._loaded_model is not None  # for type checkers
 
-        # Preprocess image
-        x = self._preprocess_image(image_path)
+        return self._loaded_model.run(x)
+
+    def load_model(self) -> None:
+        # Load the CNN wherever inference runs (worker processes in pool mode, here otherwise)
+        if self._executor is not None and self._executor.loads_model:
+            self._executor.warm_up()
+        else:
+            self._ensure_model_loaded()
+
+    def warm_up(self) -> None:
+        # Load the model and run one synthetic forward pass (allocations, tracing, thread pools)
+        self.load_model()
+        if self._executor is not None and self._executor.loads_model:
+            return  # each worker already warmed itself up
+
+        self.predict_batch(np.zeros((1,) + self.img_size + (3,), dtype="float32"))
+        if self._executor is not None:
+            self._executor.warm_up()
+
+    def smoke_test(self) -> None:
+        # Warm up, then check one synthetic forward pass returns a valid distribution
+        self.warm_up()
+        preds = np.asarray(self._infer(np.zeros((1,) + self.img_size + (3,), dtype="float32")))
+        if preds.shape != (len(self.class_names),):
+            raise ValueError(
+                f"Brain model returned {preds.shape[-1] if preds.ndim else 0} classes, "
+                f"expected {len(self.class_names)}"
+            )
+        if not np.all(np.isfinite(preds)) or abs(float(preds.sum()) - 1.0) > 1e-3:
+            raise ValueError("Brain model output is not a valid probability distribution.")
 
-        # Model returns shape (1, num_classes); we take [0]
-        preds: np.ndarray = self._model.predict(x, verbose=0)[0]
+    @classmethod
+    def fork_safe(cls, backend: str = "keras", **options: Any) -> bool:
+        # Only the TFLite backends survive fork(); see FORK_SAFE_BACKENDS
+        return backend in FORK_SAFE_BACKENDS
 
+    def unload(self) -> None:
+        # Stop the attached executor and drop the network so its memory can be reclaimed
+        if self._executor is not None:
+            self._executor.stop()
+            self._executor = None
+        with self._load_lock:
+            self._loaded_model = None
+            self._loaded_file_stat = None
+
+    def _infer(self, x: np.ndarray) -> np.ndarray:
+        # Forward pass for a single (1, H, W, 3) image -> (num_classes,)
+        if self._executor is not None:
+            return self._executor.predict(x)
+        return self.predict_batch(x)[0]
+
+    def _build_result(self, preds: np.ndarray) -> Dict[str, Any]:
         # Convert to python floats
-        preds = preds.astype("float64")
+        preds = np.asarray(preds).astype("float64")
         pred_index = int(np.argmax(preds))
         probability = float(preds[pred_index])
 
@@ -138,3 +310,35 @@ class BrainTumorModel:  # Wrapper around the trained 4-class CNN for brain tumor
             "probability": probability,
             "probabilities": probabilities_dict,
         }
+
+    def _predict_tensor(self, x: np.ndarray) -> Dict[str, Any]:
+        # Cache lookup -> forward pass on miss -> result dict
+        key: Optional[str] = None
+        if self._cache is not None:
+            key = self._cache.make_key(x, self.model_version)
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+
+        # Single-image forward pass (batched with concurrent callers if enabled)
+        result = self._build_result(self._infer(x))
+
+        if key is not None and self._cache is not None:
+            self._cache.put(key, result)
+        return result
+
+    def predict(self, image_path: str | Path) -> Dict[str, Any]:
+        self._file_stat()   # fail fast if the model file is missing
+
+        # Preprocess image
+        x = self._preprocess_image(image_path)
+
+        return self._predict_tensor(x)
+
+    def predict_from_bytes(self, image_data: bytes | BinaryIO) -> Dict[str, Any]:
+        # In-memory variant of predict(): no temporary file, no second decode from disk
+        self._file_stat()
+
+        x = self._preprocess_bytes(image_data)
+
+        return self._predict_tensor(x)
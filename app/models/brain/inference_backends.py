@@ -0,0 +1,215 @@
+from __future__ import annotations
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional
+import numpy as np
+
+
+class InferenceBackend(ABC):
+    """
+    Strategy for running the brain CNN forward pass.
+
+    Every backend takes a float32 batch of shape (N, 128, 128, 3) with
+    pixel values in [0, 255] and returns softmax probabilities (N, num_classes).
+    """
+
+    name: str = "base"
+
+    def __init__(self, artifact_path: Path) -> None:
+        self.artifact_path: Path = artifact_path
+
+    @abstractmethod
+    def load(self) -> None:
+        """Load the artifact into memory."""
+
+    @abstractmethod
+    def run(self, x: np.ndarray) -> np.ndarray:
+        """Run one forward pass on a preprocessed batch."""
+
+
+class KerasBackend(InferenceBackend):   # Full Keras model (.h5), the original serving path
+    name = "keras"
+
+    def __init__(self, artifact_path: Path) -> None:
+        super().__init__(artifact_path)
+        self._model: Any = None
+
+    def load(self) -> None:
+        from tensorflow import keras
+
+        self._model = keras.models.load_model(self.artifact_path)
+
+    def run(self, x: np.ndarray) -> np.ndarray:
+        return self._model.predict(x, batch_size=len(x), verbose=0)
+
+
+class CompiledKerasBackend(InferenceBackend):
+    """
+    Keras model wrapped in traced tf.functions with FIXED input signatures.
+
+    keras.Model.predict builds a data adapter and runs the whole predict loop
+    on every call, which costs far more than the 128x128 forward pass itself.
+    Here one concrete function is traced per batch-size bucket at load time
+    (warm-up), and each call goes straight to the matching graph. Batches are
+    zero-padded up to the next bucket, so no retracing happens while serving.
+    """
+
+    name = "keras_compiled"
+
+    DEFAULT_BATCH_BUCKETS = (1, 2, 4, 8, 16, 32)
+
+    def __init__(self, artifact_path: Path, batch_buckets: tuple[int, ...] = DEFAULT_BATCH_BUCKETS) -> None:
+        super().__init__(artifact_path)
+        self.batch_buckets: tuple[int, ...] = tuple(sorted(set(batch_buckets)))
+        self._model: Any = None
+        self._functions: Dict[int, Any] = {}
+        self._input_shape: tuple[int, ...] = ()
+
+    def load(self) -> None:
+        import tensorflow as tf
+        from tensorflow import keras
+
+        model = keras.models.load_model(self.artifact_path)
+        self._input_shape = tuple(int(d) for d in model.input_shape[1:])
+
+        @tf.function(reduce_retracing=False)
+        def forward(x):
+            return model(x, training=False)
+
+        functions: Dict[int, Any] = {}
+        for batch_size in self.batch_buckets:
+            spec = tf.TensorSpec((batch_size,) + self._input_shape, tf.float32)
+            concrete = forward.get_concrete_function(spec)
+            concrete(tf.zeros((batch_size,) + self._input_shape, tf.float32))   # warm-up run
+            functions[batch_size] = concrete
+
+        self._model = model
+        self._functions = functions
+
+    def _bucket_for(self, n: int) -> int:
+        for batch_size in self.batch_buckets:
+            if n <= batch_size:
+                return batch_size
+        return self.batch_buckets[-1]
+
+    def run(self, x: np.ndarray) -> np.ndarray:
+        import tensorflow as tf
+
+        n = len(x)
+        outputs: list[np.ndarray] = []
+        largest = self.batch_buckets[-1]
+        for start in range(0, n, largest):
+            chunk = np.asarray(x[start:start + largest], dtype="float32")
+            bucket = self._bucket_for(len(chunk))
+            if len(chunk) < bucket:
+                padding = np.zeros((bucket - len(chunk),) + chunk.shape[1:], dtype="float32")
+                chunk_in = np.concatenate([chunk, padding], axis=0)
+            else:
+                chunk_in = chunk
+            out = self._functions[bucket](tf.constant(chunk_in))
+            outputs.append(out.numpy()[: len(chunk)])
+        return np.concatenate(outputs, axis=0)
+
+
+def _create_tflite_interpreter(model_path: Path, num_threads: Optional[int]) -> Any:
+    # Prefer the standalone runtimes (no full TensorFlow import), fall back to tf.lite
+    try:
+        from ai_edge_litert.interpreter import Interpreter  # type: ignore
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter  # type: ignore
+        except ImportError:
+            import tensorflow as tf
+
+            Interpreter = tf.lite.Interpreter
+
+    return Interpreter(model_path=str(model_path), num_threads=num_threads)
+
+
+class TFLiteBackend(InferenceBackend):
+    """
+    Post-training-quantized TFLite artifact (float16 or int8), produced by
+    model_training/brain_tumor/export_brain_tflite.py.
+
+    The interpreter is not thread-safe, so calls are serialized with a lock
+    (the micro-batching scheduler already funnels work through one thread).
+    """
+
+    QUANTIZATIONS = ("float16", "int8")
+
+    def __init__(self, artifact_path: Path, quantization: str, num_threads: Optional[int] = None) -> None:
+        if quantization not in self.QUANTIZATIONS:
+            raise ValueError(f"Unknown TFLite quantization '{quantization}'. Expected one of {self.QUANTIZATIONS}")
+        super().__init__(artifact_path)
+        self.name = f"tflite_{quantization}"
+        self.quantization: str = quantization
+        self.num_threads: Optional[int] = num_threads
+        self._interpreter: Any = None
+        self._input: Dict[str, Any] = {}
+        self._output: Dict[str, Any] = {}
+        self._batch_size: int = 0
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        interpreter = _create_tflite_interpreter(self.artifact_path, self.num_threads)
+        interpreter.allocate_tensors()
+        self._input = interpreter.get_input_details()[0]
+        self._output = interpreter.get_output_details()[0]
+        self._batch_size = int(self._input["shape"][0])
+        self._interpreter = interpreter
+
+    def _resize(self, batch_size: int) -> None:
+        # The exported signature has a dynamic batch dim; resize only when it changes
+        if batch_size == self._batch_size:
+            return
+        shape = [batch_size] + [int(d) for d in self._input["shape"][1:]]
+        self._interpreter.resize_tensor_input(self._input["index"], shape)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = batch_size
+
+    def run(self, x: np.ndarray) -> np.ndarray:
+        with self._lock:
+            self._resize(len(x))
+
+            input_dtype = self._input["dtype"]
+            if input_dtype in (np.int8, np.uint8):
+                # Fully integer I/O: quantize the [0, 255] pixels with the tensor's params
+                scale, zero_point = self._input["quantization"]
+                x = np.clip(np.round(x / scale + zero_point), np.iinfo(input_dtype).min, np.iinfo(input_dtype).max)
+            self._interpreter.set_tensor(self._input["index"], x.astype(input_dtype))
+            self._interpreter.invoke()
+            out = self._interpreter.get_tensor(self._output["index"])
+
+            if self._output["dtype"] in (np.int8, np.uint8):
+                scale, zero_point = self._output["quantization"]
+                out = (out.astype("float32") - zero_point) * scale
+
+            return np.array(out, dtype="float32")
+
+
+BACKEND_NAMES = ("keras", "keras_compiled", "tflite_float16", "tflite_int8")
+
+# Backends that can be loaded in a pre-fork master and used in its children.
+# The TensorFlow runtime (Keras / tf.function) deadlocks on the first forward
+# pass in a forked child, even if the parent only loaded the model; the TFLite
+# interpreter keeps no runtime threads and works after fork.
+FORK_SAFE_BACKENDS = ("tflite_float16", "tflite_int8")
+
+
+def tflite_artifact_path(model_path: Path, quantization: str) -> Path:
+    # brain_tumor_cnn_multiclass.h5 -> brain_tumor_cnn_multiclass_int8.tflite (same folder)
+    return model_path.with_name(f"{model_path.stem}_{quantization}.tflite")
+
+
+def create_backend(name: str, model_path: Path) -> InferenceBackend:
+    if name == "keras":
+        return KerasBackend(model_path)
+    if name == "keras_compiled":
+        return CompiledKerasBackend(model_path)
+    if name.startswith("tflite_"):
+        quantization = name[len("tflite_"):]
+        return TFLiteBackend(tflite_artifact_path(model_path, quantization), quantization)
+    raise ValueError(f"Unknown brain inference backend '{name}'. Expected one of {BACKEND_NAMES}")
@@ -0,0 +1,69 @@
+from __future__ import annotations
+import os
+import time
+from multiprocessing import shared_memory
+from typing import Any
+import numpy as np
+
+# Entry point of the BrainProcessPool worker processes. Spawned workers import this module as
+# their __main__ instead of the web process's entry script: keep it free of start-up side effects.
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    # The parent owns (and unlinks) the block. On Python < 3.13 attaching registers the name
+    # again, but spawned workers share the parent's resource tracker so that is a no-op there.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def worker_main(
+    worker_id: int,
+    generation: int,
+    model_path: str,
+    backend: str,
+    shm_name: str,
+    slots_shape: tuple[int, ...],
+    task_queue: Any,
+    result_conn: Any,
+) -> None:
+    """
+    Worker process: owns its own loaded BrainTumorModel and reads input
+    tensors straight from the shared-memory slots written by the parent.
+
+    Messages sent back on result_conn (generation = this spawn; worker ids
+    are reused when a crashed worker is replaced, generations are not):
+        ("ready",   worker_id, generation, None,    pid)
+        ("started", worker_id, generation, task_id, None)
+        ("done",    worker_id, generation, task_id, (ok, payload, busy_seconds))
+    """
+    from app.models.brain.brain_tumor_model import BrainTumorModel
+
+    model = BrainTumorModel(model_path=model_path, backend=backend)
+    model.warm_up()
+
+    shm = _attach_shared_memory(shm_name)
+    slots = np.ndarray(slots_shape, dtype=np.float32, buffer=shm.buf)
+    result_conn.send(("ready", worker_id, generation, None, os.getpid()))
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:    # shutdown sentinel
+                break
+            task_id, slot = task
+            result_conn.send(("started", worker_id, generation, task_id, None))
+
+            t0 = time.perf_counter()
+            try:
+                preds = model.predict_batch(slots[slot:slot + 1])[0]
+                ok, result = True, np.asarray(preds, dtype=np.float32)
+            except Exception as e:
+                ok, result = False, f"{type(e).__name__}: {e}"
+            busy = time.perf_counter() - t0
+            result_conn.send(("done", worker_id, generation, task_id, (ok, result, busy)))
+    finally:
+        del slots
+        shm.close()
+        result_conn.close()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+import atexit
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+import numpy as np
+
+
+class BrainPredictionCache:
+    """
+    Content-addressed LRU cache for brain MRI predictions.
+
+    Key   = sha256(decoded input tensor bytes + model version)
+    Value = the result dict returned by BrainTumorModel (predicted_class,
+            probabilities, ...)
+
+    The model version is part of every key, so a retrained .h5 file never
+    serves stale answers, while results of several live versions (old and
+    new side by side during a hot swap) coexist; entries of a retired
+    version simply age out of the LRU. Optionally the entries are
+    persisted as JSON so they survive restarts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        persist_path: str | Path | None = None,
+        persist_every: int = 32,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+
+        self.max_entries: int = max_entries
+        self.persist_path: Optional[Path] = Path(persist_path) if persist_path else None
+        self.persist_every: int = max(1, persist_every)
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty_puts: int = 0
+
+        # Counters
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        if self.persist_path is not None:
+            self._load_from_disk()
+            atexit.register(self.save)
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+    @staticmethod
+    def make_key(x: np.ndarray, model_version: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(x).tobytes())
+        digest.update(str(x.shape).encode("ascii"))
+        digest.update(model_version.encode("utf-8"))
+        return digest.hexdigest()
+
+    # ------------------------------------------------------------------
+    # Lookup / insert
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(result)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = copy.deepcopy(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._dirty_puts += 1
+            should_persist = self.persist_path is not None and self._dirty_puts >= self.persist_every
+
+        if should_persist:
+            self.save()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._dirty_puts += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "size": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "persistent": self.persist_path is not None,     # no filesystem paths in public stats
+        }
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self) -> None:
+        if self.persist_path is None:
+            return
+
+        with self._lock:
+            if self._dirty_puts == 0:
+                return
+            payload = {"entries": list(self._entries.items())}     # LRU order: oldest first
+            self._dirty_puts = 0
+
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.persist_path.with_suffix(self.persist_path.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.persist_path)     # atomic swap, never a half-written file
+        except Exception as e:
+            print(f"[WARNING] BrainPredictionCache: Failed to persist cache to {self.persist_path}: {e}")
+
+    def _load_from_disk(self) -> None:
+        assert self.persist_path is not None
+        if not self.persist_path.exists():
+            return
+
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            entries = payload.get("entries", [])
+            for key, result in entries[-self.max_entries:]:
+                self._entries[key] = result
+            print(f"[BrainPredictionCache] Loaded {len(self._entries)} entries from {self.persist_path}")
+        except Exception as e:
+            print(f"[WARNING] BrainPredictionCache: Ignoring unreadable cache file {self.persist_path}: {e}")
+            self._entries.clear()
@@ -0,0 +1,444 @@
+from __future__ import annotations
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait as wait_connections
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import numpy as np
+
+
+_entry_lock = threading.Lock()
+
+
+@contextmanager
+def _worker_entry_point() -> Iterator[None]:
+    # A spawned child first re-imports the parent's __main__ (run.py, a CLI script, ...), which would
+    # build a second app / pool there. While the child is launched, pool_worker stands in as
+    # __main__, so the child imports that small module instead. (Imported here, not at the top:
+    # runpy warns when the module to run is already loaded by its package.)
+    from app.models.brain import pool_worker
+
+    with _entry_lock:
+        main = sys.modules["__main__"]
+        sys.modules["__main__"] = pool_worker
+        try:
+            yield
+        finally:
+            sys.modules["__main__"] = main
+
+
+@dataclass
+class _Task:
+    future: Future
+    slot: int
+    attempts: int = 1
+    owner: Optional[int] = None         # generation of the worker the task was dispatched to
+    started: bool = False               # that worker reported "started"
+    requeues: int = 0                   # re-dispatched from a dead worker before it started
+
+
+@dataclass
+class _WorkerState:
+    process: Any
+    generation: int
+    tasks: Any                          # this worker's own task queue
+    results: Any                        # read end of this worker's result pipe
+    assigned: int = 0                   # dispatched, not yet done
+    started_at: float = field(default_factory=time.perf_counter)
+    pid: Optional[int] = None
+    ready: bool = False
+    tasks_done: int = 0
+    busy_seconds: float = 0.0
+    restarts: int = 0
+
+
+class BrainProcessPool:
+    """
+    Runs brain CNN inference in a pool of worker processes, each holding
+    its own loaded model, so predictions are not serialized on the GIL of
+    the web process.
+
+    Preprocessed (1, H, W, 3) float32 tensors are copied into a shared
+    memory block split into fixed slots; only (task_id, slot) is pickled
+    through a task queue. Each worker has its own task queue and its own
+    result pipe, and the parent dispatches to the least busy worker: it
+    always knows who holds a task, and a worker killed mid-send or inside
+    queue.get() cannot leave a shared queue lock held for the others.
+    A supervisor thread reads the results, restarts crashed workers,
+    re-dispatches what was queued on them and retries the task they were
+    running once.
+    """
+
+    MAX_ATTEMPTS = 2
+    MAX_REQUEUES = 3
+    MAX_STARTUP_FAILURES = 3    # a worker that keeps dying before "ready" is not restarted forever
+
+    def __init__(
+        self,
+        model_path: str | Path,
+        backend: str = "keras",
+        num_workers: Optional[int] = None,
+        img_size: tuple[int, int] = (128, 128),
+        slots_per_worker: int = 4,
+        start_method: str = "spawn",
+        task_timeout: float = 60.0,
+    ) -> None:
+        self.model_path: str = str(model_path)
+        self.backend: str = backend
+        self.num_workers: int = num_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.img_size: tuple[int, int] = img_size
+        self.num_slots: int = self.num_workers * max(1, slots_per_worker)
+        self.task_timeout: float = task_timeout
+        self.loads_model: bool = True   # models live in the workers, not in this process
+
+        self._ctx = mp.get_context(start_method)
+        self._slots_shape: tuple[int, ...] = (self.num_slots, img_size[0], img_size[1], 3)
+
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._slots: Optional[np.ndarray] = None
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+
+        self._workers: Dict[int, _WorkerState] = {}
+        self._pending: Dict[int, _Task] = {}
+        self._task_ids = itertools.count(1)
+        self._generations = itertools.count(1)
+        self._lock = threading.Lock()
+        self._all_ready = threading.Event()
+        self._stopping = threading.Event()
+        self._supervisor: Optional[threading.Thread] = None
+        self._started_at: float = 0.0
+        self._tasks_failed: int = 0
+        self._broken: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        with self._lock:
+            if self._supervisor is not None:
+                return
+
+            slot_bytes = int(np.prod(self._slots_shape)) * np.dtype(np.float32).itemsize
+            self._shm = shared_memory.SharedMemory(create=True, size=slot_bytes)
+            self._slots = np.ndarray(self._slots_shape, dtype=np.float32, buffer=self._shm.buf)
+            # Fresh bookkeeping on every start, so a restart after stop() never duplicates slots
+            self._free_slots = queue.Queue()
+            for slot in range(self.num_slots):
+                self._free_slots.put(slot)
+            self._all_ready.clear()
+            self._broken = None
+
+            self._started_at = time.perf_counter()
+            self._stopping.clear()
+
+            for worker_id in range(self.num_workers):
+                self._workers[worker_id] = self._spawn_worker(worker_id)
+
+            self._supervisor = threading.Thread(
+                target=self._supervise,
+                name="brain-pool-supervisor",
+                daemon=True,
+            )
+            self._supervisor.start()
+            print(f"[BrainProcessPool] Started {self.num_workers} worker(s), {self.num_slots} shared-memory slots")
+
+    def _spawn_worker(self, worker_id: int) -> _WorkerState:
+        assert self._shm is not None
+        generation = next(self._generations)
+        tasks = self._ctx.Queue()
+        results, result_conn = self._ctx.Pipe(duplex=False)
+        from app.models.brain.pool_worker import worker_main
+
+        process = self._ctx.Process(
+            target=worker_main,
+            args=(
+                worker_id,
+                generation,
+                self.model_path,
+                self.backend,
+                self._shm.name,
+                self._slots_shape,
+                tasks,
+                result_conn,
+            ),
+            name=f"brain-worker-{worker_id}",
+            daemon=True,
+        )
+        with _worker_entry_point():
+            process.start()
+        result_conn.close()     # only the worker writes; its exit then shows up as EOF here
+        return _WorkerState(process=process, generation=generation, tasks=tasks, results=results)
+
+    @staticmethod
+    def _discard_worker(state: _WorkerState) -> None:
+        # A dead / stopped worker's channels: drop whatever is still buffered, never wait on a feeder thread
+        state.tasks.cancel_join_thread()
+        state.tasks.close()
+        state.results.close()
+
+    def warm_up(self, timeout: Optional[float] = None) -> None:
+        # Start the workers and wait until every one has loaded + warmed its model
+        self.start()
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while not self._all_ready.wait(0.2):
+            if self._broken is not None:
+                raise RuntimeError(self._broken)
+            if deadline is not None and time.perf_counter() >= deadline:
+                raise RuntimeError("Brain worker processes did not become ready in time.")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stopping.set()
+        with self._lock:
+            workers = list(self._workers.values())
+        for state in workers:
+            state.tasks.put(None)
+        for state in workers:
+            state.process.join(timeout=timeout)
+            if state.process.is_alive():
+                state.process.terminate()
+
+        if self._supervisor is not None:
+            self._supervisor.join(timeout=timeout)
+        self._supervisor = None
+
+        with self._lock:
+            for task in self._pending.values():
+                if not task.future.done():
+                    task.future.set_exception(RuntimeError("Brain process pool stopped."))
+            self._pending.clear()
+            self._workers.clear()
+            self._free_slots = queue.Queue()
+            self._all_ready.clear()
+
+        for state in workers:
+            self._discard_worker(state)
+        self._slots = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def submit(self, x: np.ndarray) -> Future:
+        if x.shape != self._slots_shape[1:] and x.shape != (1,) + self._slots_shape[1:]:
+            raise ValueError(f"Expected a single image with shape (1, H, W, 3), got {x.shape}")
+
+        if self._broken is not None:
+            raise RuntimeError(self._broken)
+
+        self.start()
+        try:
+            slot = self._free_slots.get(timeout=self.task_timeout)   # back-pressure when all slots busy
+        except queue.Empty:
+            raise RuntimeError("Brain process pool is saturated; no free input slot.")
+
+        assert self._slots is not None
+        self._slots[slot] = x.reshape(self._slots_shape[1:])   # the only copy of the input tensor
+
+        future: Future = Future()
+        task_id = next(self._task_ids)
+        with self._lock:
+            task = _Task(future=future, slot=slot)
+            self._pending[task_id] = task
+            self._dispatch(task_id, task)
+        return future
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        return self.submit(x).result(timeout=self.task_timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.perf_counter()
+        workers: List[Dict[str, Any]] = []
+        with self._lock:
+            for worker_id, state in sorted(self._workers.items()):
+                uptime = max(now - state.started_at, 1e-9)
+                workers.append({
+                    "worker_id": worker_id,
+                    "pid": state.pid if state.pid is not None else state.process.pid,
+                    "alive": state.process.is_alive(),
+                    "ready": state.ready,
+                    "assigned": state.assigned,
+                    "tasks_done": state.tasks_done,
+                    "busy_seconds": round(state.busy_seconds, 3),
+                    "utilisation": round(state.busy_seconds / uptime, 4),
+                    "restarts": state.restarts,
+                })
+            in_flight = len(self._pending)
+
+        return {
+            "enabled": True,
+            "num_workers": self.num_workers,
+            "num_slots": self.num_slots,
+            "free_slots": self._free_slots.qsize(),
+            "in_flight": in_flight,
+            "tasks_failed": self._tasks_failed,
+            "broken": self._broken,
+            "workers": workers,
+        }
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+    def _dispatch(self, task_id: int, task: _Task) -> None:
+        # Caller holds self._lock. Least busy live worker, ready ones first; the put never blocks.
+        state = min(
+            self._workers.values(),
+            key=lambda w: (not w.process.is_alive(), not w.ready, w.assigned),
+        )
+        task.owner = state.generation
+        task.started = False
+        state.assigned += 1
+        state.tasks.put((task_id, task.slot))
+
+    # ------------------------------------------------------------------
+    # Supervisor: results + crash detection
+    # ------------------------------------------------------------------
+    def _supervise(self) -> None:
+        last_health_check = 0.0
+        while not self._stopping.is_set():
+            with self._lock:
+                states = {state.results: state for state in self._workers.values()}
+            try:
+                ready = wait_connections(list(states), timeout=0.2)
+            except OSError:     # a pipe was closed under us (stop / restart): look again
+                ready = []
+
+            worker_gone = False
+            for conn in ready:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    # The worker exited: let the process be reaped, then replace it right away
+                    states[conn].process.join(timeout=1.0)
+                    worker_gone = True
+                    continue
+                self._handle_message(message)
+
+            if worker_gone or time.perf_counter() - last_health_check >= 0.5:
+                self._check_workers()
+                last_health_check = time.perf_counter()
+
+    def _handle_message(self, message: tuple) -> None:
+        kind, worker_id, generation, task_id, payload = message
+        with self._lock:
+            state = self._workers.get(worker_id)
+            current = state is not None and state.generation == generation   # not a replaced worker
+
+            if kind == "ready":
+                if current:
+                    state.pid = payload
+                    state.ready = True
+                if self._workers and all(w.ready for w in self._workers.values()):
+                    self._all_ready.set()
+                return
+
+            task = self._pending.get(task_id)
+            if kind == "started":
+                if task is not None and current and task.owner == generation:
+                    task.started = True
+                return
+
+            # kind == "done": a finished result is valid whichever spawn produced it
+            ok, result, busy = payload
+            if current:
+                state.tasks_done += 1
+                state.busy_seconds += busy
+            if task is None:
+                return
+            del self._pending[task_id]
+            for w in self._workers.values():
+                if w.generation == task.owner:
+                    w.assigned -= 1
+
+        self._free_slots.put(task.slot)
+        if ok:
+            task.future.set_result(result)
+        else:
+            self._tasks_failed += 1
+            task.future.set_exception(RuntimeError(f"Brain worker inference failed: {result}"))
+
+    def _drain(self, state: _WorkerState) -> None:
+        # Everything a dead worker managed to send before it died ("started" / "done")
+        while True:
+            try:
+                if not state.results.poll():
+                    return
+                message = state.results.recv()
+            except (EOFError, OSError):
+                return
+            self._handle_message(message)
+
+    def _check_workers(self) -> None:
+        failed: List[_Task] = []
+
+        with self._lock:
+            dead = [
+                state for state in self._workers.values()
+                if not state.process.is_alive() and not self._stopping.is_set() and self._broken is None
+            ]
+        for state in dead:
+            self._drain(state)
+
+        with self._lock:
+            replaced = False
+            for state in dead:
+                worker_id = next((i for i, w in self._workers.items() if w is state), None)
+                if worker_id is None:
+                    continue
+
+                if not state.ready and state.restarts + 1 >= self.MAX_STARTUP_FAILURES:
+                    self._broken = (
+                        f"Brain worker {worker_id} failed to start {self.MAX_STARTUP_FAILURES} times "
+                        f"(exit code {state.process.exitcode}); check the model file and worker logs."
+                    )
+                    print(f"[ERROR] BrainProcessPool: {self._broken}")
+                    failed.extend(self._pending.values())
+                    self._pending.clear()
+                    break
+
+                print(
+                    f"[WARNING] BrainProcessPool: worker {worker_id} (pid {state.process.pid}) died "
+                    f"with exit code {state.process.exitcode}; restarting"
+                )
+                self._discard_worker(state)
+                replacement = self._spawn_worker(worker_id)
+                replacement.started_at = state.started_at
+                replacement.restarts = state.restarts + 1
+                replacement.tasks_done = state.tasks_done
+                replacement.busy_seconds = state.busy_seconds
+                self._workers[worker_id] = replacement
+                replaced = True
+
+            if replaced and self._broken is None:
+                # Everything dispatched to a dead worker is gone with its queue. The task it was
+                # running counts as an attempt; the ones still waiting behind it are re-dispatched
+                # as they are (bounded too, in case the crash swallowed the "started" message).
+                live = {w.generation for w in self._workers.values()}
+                for task_id, task in list(self._pending.items()):
+                    if task.owner in live:
+                        continue
+                    if task.started:
+                        task.attempts += 1
+                    else:
+                        task.requeues += 1
+                    if task.attempts <= self.MAX_ATTEMPTS and task.requeues <= self.MAX_REQUEUES:
+                        self._dispatch(task_id, task)
+                    else:
+                        del self._pending[task_id]
+                        failed.append(task)
+
+        for task in failed:
+            self._tasks_failed += 1
+            self._free_slots.put(task.slot)
+            task.future.set_exception(RuntimeError("Brain worker process crashed during inference."))
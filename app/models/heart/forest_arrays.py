@@ -0,0 +1,200 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+FORMAT_VERSION = 1
+ARRAY_NAMES = ("children_left", "children_right", "feature", "threshold", "value", "tree_offsets")
+
+
+def arrays_dir_for(model_path: str | Path) -> Path:
+    # heart_model.pkl -> heart_model_arrays/ (same folder)
+    model_path = Path(model_path)
+    return model_path.with_name(f"{model_path.stem}_arrays")
+
+
+def source_digest(model_path: Path) -> str:
+    # Content hash (not mtime) so copies / git checkouts of the same pickle still match
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compile_forest(forest: Any, feature_names: List[str]) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Flatten a fitted RandomForestClassifier into one node table for all
+    trees (children, feature, threshold, normalized leaf values) + metadata.
+    """
+    estimators = forest.estimators_
+
+    offsets = np.zeros(len(estimators) + 1, dtype=np.int64)
+    for i, estimator in enumerate(estimators):
+        offsets[i + 1] = offsets[i] + estimator.tree_.node_count
+
+    left: List[np.ndarray] = []
+    right: List[np.ndarray] = []
+    feature: List[np.ndarray] = []
+    threshold: List[np.ndarray] = []
+    value: List[np.ndarray] = []
+    for i, estimator in enumerate(estimators):
+        tree = estimator.tree_
+        base = offsets[i]
+        is_leaf = tree.children_left == -1
+        # Child indices become global rows of the shared table; leaves keep -1
+        left.append(np.where(is_leaf, -1, tree.children_left + base))
+        right.append(np.where(is_leaf, -1, tree.children_right + base))
+        feature.append(tree.feature)
+        threshold.append(tree.threshold)
+
+        # Leaf class distribution, normalized exactly like DecisionTreeClassifier.predict_proba
+        proba = np.array(tree.value[:, 0, :], dtype=np.float64)
+        normalizer = proba.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        value.append(proba / normalizer)
+
+    arrays = {
+        "children_left": np.concatenate(left).astype(np.int32),
+        "children_right": np.concatenate(right).astype(np.int32),
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "value": np.concatenate(value).astype(np.float64),
+        "tree_offsets": offsets,
+    }
+    meta: Dict[str, Any] = {
+        "format_version": FORMAT_VERSION,
+        "feature_names": list(feature_names),
+        "classes": [c.item() if hasattr(c, "item") else c for c in forest.classes_],
+        "n_estimators": len(estimators),
+        "n_nodes": int(offsets[-1]),
+    }
+    return arrays, meta
+
+
+def export_forest_arrays(
+    forest: Any,
+    feature_names: List[str],
+    out_dir: str | Path,
+    source_path: Optional[str | Path] = None,
+) -> Path:
+    """
+    Write compile_forest's tables as plain, UNCOMPRESSED .npy files + meta.json.
+
+    sklearn's Tree.__setstate__ copies its node arrays into memory it owns,
+    so a pickled forest can never be shared between processes, even when
+    loaded with joblib's mmap_mode. These flat arrays can: np.load(...,
+    mmap_mode="r") maps them read-only and every worker on the host reads
+    the same page-cache pages.
+    """
+    out_dir = Path(out_dir)
+    arrays, meta = compile_forest(forest, feature_names)
+    if source_path is not None:
+        meta["source_sha256"] = source_digest(Path(source_path))
+
+    # Write into a temp dir and swap it in, so a reader never maps half an export
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    for name, array in arrays.items():
+        np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(array))
+    with open(tmp_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    old_dir = out_dir.with_name(out_dir.name + ".old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if out_dir.exists():
+        os.replace(out_dir, old_dir)
+    os.replace(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return out_dir
+
+
+class ForestArrays:
+    """
+    Read-only random forest backed by flat node arrays: mapped from an
+    export_forest_arrays directory, or compiled in memory from a fitted
+    forest. Exposes `classes_` and `predict_proba` like the sklearn
+    estimator, so HeartDiseaseModel can use either one.
+
+    For one patient, sklearn's predict_proba spends most of its time in
+    input validation and joblib dispatch over the trees; here all trees
+    are walked together with a handful of NumPy ops per tree level.
+    """
+
+    # Rows walked together: bounds the (rows x trees) index temporaries to a few MB
+    BLOCK_ROWS = 1024
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> None:
+        self.children_left: np.ndarray = arrays["children_left"]
+        self.children_right: np.ndarray = arrays["children_right"]
+        self.feature: np.ndarray = arrays["feature"]
+        self.threshold: np.ndarray = arrays["threshold"]
+        self.value: np.ndarray = arrays["value"]
+        self.tree_offsets: np.ndarray = arrays["tree_offsets"]
+
+        self.feature_names: List[str] = list(meta["feature_names"])
+        self.classes_: np.ndarray = np.array(meta["classes"])
+        self.n_estimators: int = int(meta["n_estimators"])
+
+    @classmethod
+    def load(cls, arrays_dir: str | Path, mmap: bool = True) -> "ForestArrays":
+        arrays_dir = Path(arrays_dir)
+        with open(arrays_dir / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported forest array format in {arrays_dir}: {meta.get('format_version')}")
+
+        mmap_mode = "r" if mmap else None
+        arrays = {name: np.load(arrays_dir / f"{name}.npy", mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        return cls(arrays, meta)
+
+    @classmethod
+    def from_forest(cls, forest: Any, feature_names: List[str]) -> "ForestArrays":
+        # In-memory compile (no export on disk, nothing shared between processes)
+        arrays, meta = compile_forest(forest, feature_names)
+        return cls(arrays, meta)
+
+    @staticmethod
+    def is_current(arrays_dir: str | Path, model_path: str | Path, digest: Optional[str] = None) -> bool:
+        # Export exists and was made from this exact pickle (not a stale one)
+        try:
+            with open(Path(arrays_dir) / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            return meta.get("source_sha256") == (digest or source_digest(Path(model_path)))
+        except (OSError, ValueError):
+            return False
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        # Same float32 input cast + "<=" split rule as sklearn's tree traversal
+        X = np.asarray(X, dtype=np.float32)
+        if X.shape[0] <= self.BLOCK_ROWS:
+            return self._predict_block(X)
+        return np.concatenate([
+            self._predict_block(X[start:start + self.BLOCK_ROWS])
+            for start in range(0, X.shape[0], self.BLOCK_ROWS)
+        ])
+
+    def _predict_block(self, X: np.ndarray) -> np.ndarray:
+        n_rows = X.shape[0]
+
+        # Walk every (row, tree) pair one level per step; pairs that reached a
+        # leaf drop out, so deep trees do not keep re-gathering finished ones
+        node = np.tile(self.tree_offsets[:-1], n_rows)
+        row = np.repeat(np.arange(n_rows), self.n_estimators)
+        active = np.arange(node.size)
+        while active.size:
+            current = node[active]
+            left = self.children_left[current]
+            split = left != -1
+            active, current, left = active[split], current[split], left[split]
+            go_left = X[row[active], self.feature[current]] <= self.threshold[current]
+            node[active] = np.where(go_left, left, self.children_right[current])
+        node = node.reshape(n_rows, self.n_estimators)
+
+        # cumsum adds tree by tree in order, like sklearn's accumulation (np.sum would reorder)
+        return np.cumsum(self.value[node], axis=1)[:, -1] / self.n_estimators
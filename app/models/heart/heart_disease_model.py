@@ -1,21 +1,47 @@
-from typing import Dict, Tuple, Any, List
+from typing import Dict, Tuple, Any, List, Optional
 from pathlib import Path
 import numpy as np
 import joblib
+from app.models.base_model import BaseDiseaseModel
+from app.models.heart.forest_arrays import ForestArrays, arrays_dir_for, source_digest
+from app.models.heart.prediction_cache import HeartPredictionCache
 
-class HeartDiseaseModel:    # Wrapper for the Heart Disease prediction model
-    def __init__(self, model_path: str | None = None) -> None:
+ENGINES = ("arrays", "sklearn")
+
+class HeartDiseaseModel(BaseDiseaseModel):    # Wrapper for the Heart Disease prediction model
+    def __init__(
+        self,
+        model_path: str | Path | None = None,
+        use_mmap_arrays: bool = True,
+        engine: str = "arrays",
+    ) -> None:
         
         if model_path is None:
             self.model_path = "app/data/saved_models/heart_model.pkl"
         else:
             self.model_path = model_path
 
-        self.loaded_model: Any = None
+        super().__init__(self.model_path)   # sets _loaded_model = None
         self.feature_names: List[str] = []
 
+        # Prefer the flat .npy export (heart_model_arrays/) mapped read-only: the node
+        # arrays then live once in the page cache instead of once per worker process
+        self.use_mmap_arrays: bool = use_mmap_arrays
+
+        # Inference engine: "arrays" walks flat node arrays (ForestArrays: the mmap'd
+        # export, or compiled in memory from the pickle), "sklearn" calls the
+        # RandomForestClassifier itself. Both give identical probabilities.
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown heart inference engine '{engine}'. Expected one of {ENGINES}")
+        self.engine: str = engine
+        self.loaded_format: str | None = None   # "mmap_arrays", "compiled_arrays" or "pickle"
+        self._model_version: str | None = None  # short content hash of the loaded pickle
+
+        # Optional LRU cache of (risk_label, probability) results (attached by ModelManager)
+        self._cache: Optional[HeartPredictionCache] = None
+
     def load_model(self) -> None:   # Load the RandomForest model + feature names
-        if self.loaded_model is not None:
+        if self._loaded_model is not None:
             return  # already loaded
 
         bundle_path = Path(self.model_path)
@@ -25,18 +51,70 @@ class HeartDiseaseModel:    # Wrapper for the Heart Disease prediction model
                 f"Make sure you ran the training script and saved the model."
             )
 
-        bundle = joblib.load(bundle_path)
-        self.loaded_model = bundle["model"]
-        self.feature_names = bundle["feature_names"]
+        digest = source_digest(bundle_path)
+        arrays_dir = arrays_dir_for(bundle_path)
+        use_export = self.engine == "arrays" and self.use_mmap_arrays
+        if use_export and ForestArrays.is_current(arrays_dir, bundle_path, digest):
+            forest = ForestArrays.load(arrays_dir, mmap=True)
+            self._loaded_model = forest
+            self.feature_names = forest.feature_names
+            self.loaded_format = "mmap_arrays"
+        else:
+            if use_export and arrays_dir.exists():
+                print(f"[WARNING] HeartDiseaseModel: {arrays_dir} is stale, loading the pickle instead")
+            bundle = joblib.load(bundle_path)
+            self.feature_names = bundle["feature_names"]
+            self._loaded_model = bundle["model"]
+            self.loaded_format = "pickle"
+            if self.engine == "arrays":
+                try:
+                    self._loaded_model = ForestArrays.from_forest(bundle["model"], self.feature_names)
+                    self.loaded_format = "compiled_arrays"
+                except AttributeError as e:   # not a fitted tree ensemble
+                    print(f"[WARNING] HeartDiseaseModel: Cannot compile the model ({e}), using sklearn")
 
         if not self.feature_names:
             raise ValueError("Loaded heart model has empty feature_names list.")
 
+        self._model_version = digest[:16]    # part of the cache key: a reload keeps the warm cache
+
+    @property
+    def model_version(self) -> str | None:
+        return self._model_version
+
+    def attach_cache(self, cache: Optional[HeartPredictionCache]) -> None:
+        # Serve repeated feature vectors from an LRU cache instead of the forest
+        self._cache = cache
+
+    def warm_up(self) -> None:   # One synthetic prediction so the first real request is fast
+        self.load_model()
+        self._predict_row(self._feature_row({}))
+
+    def smoke_test(self) -> None:   # Raise if a freshly loaded model gives unusable output
+        self.load_model()
+        _, probability = self._predict_row(self._feature_row({}))   # never from the cache
+        if not 0.0 <= probability <= 1.0:
+            raise ValueError(f"Heart model returned an invalid probability: {probability}")
+
     def predict(self, features: Dict[str, float]) -> Tuple[str, float]:
         # Returns -> (risk_label, probability_of_disease)
         self.load_model()
+        row = self._feature_row(features)
 
-        # Build feature vector in correct order
+        key = None
+        if self._cache is not None:
+            key = (self._model_version, row)
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+
+        result = self._predict_row(row)
+        if key is not None and self._cache is not None:
+            self._cache.put(key, result)
+        return result
+
+    def _feature_row(self, features: Dict[str, Any]) -> Tuple[float, ...]:
+        # Canonical feature vector in correct order ("63", 63 and 63.0 -> 63.0)
         row_values: list[float] = []
         for name in self.feature_names:
             value = features.get(name, 0.0)  # default 0 for missing fields
@@ -44,28 +122,53 @@ class HeartDiseaseModel:    # Wrapper for the Heart Disease prediction model
                 row_values.append(float(value))
             except (TypeError, ValueError):
                 row_values.append(0.0)
+        return tuple(row_values)
 
-        X = np.array([row_values], dtype=float)
+    def _predict_row(self, row: Tuple[float, ...]) -> Tuple[str, float]:
+        X = np.array([row], dtype=float)
 
         # Predict probability of each class
-        proba = self.loaded_model.predict_proba(X)[0]  # shape: (n_classes)
+        proba = self._loaded_model.predict_proba(X)[0]  # shape: (n_classes)
+        prob_disease = float(proba[self._disease_index()])
+        return self._risk_label(prob_disease), prob_disease
+
+    def predict_many(self, X: Any) -> Tuple[List[str], np.ndarray]:
+        """
+        Score many patients with ONE predict_proba call.
+        X: 2-D array with columns in `feature_names` order, or a DataFrame
+        holding (at least) the `feature_names` columns.
+        Returns -> (risk_labels, probabilities_of_disease)
+        """
+        self.load_model()
+
+        if hasattr(X, "columns"):   # DataFrame: select + order columns by name
+            X = X[self.feature_names].to_numpy(dtype=float)
+        X = np.asarray(X, dtype=float)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(
+                f"Expected a 2-D array with {len(self.feature_names)} columns "
+                f"({', '.join(self.feature_names)}), got shape {X.shape}."
+            )
+        if len(X) == 0:
+            return [], np.empty(0, dtype=float)
 
+        prob_disease = self._loaded_model.predict_proba(X)[:, self._disease_index()].astype(float)
+        labels = np.select([prob_disease >= 0.7, prob_disease >= 0.4], ["High", "Medium"], default="Low")
+        return labels.tolist(), prob_disease
+
+    def _disease_index(self) -> int:
         # We assume class "1" = has disease; figure out which index that is
-        classes = list(self.loaded_model.classes_)
+        classes = list(self._loaded_model.classes_)
         if 1 in classes:
-            idx_disease = classes.index(1)
-        else:
-            # Fallback: assume last class is "disease"
-            idx_disease = len(classes) - 1
-
-        prob_disease = float(proba[idx_disease])
+            return classes.index(1)
+        # Fallback: assume last class is "disease"
+        return len(classes) - 1
 
+    @staticmethod
+    def _risk_label(prob_disease: float) -> str:
         # Map probability to simple risk label
         if prob_disease >= 0.7:
-            label = "High"
+            return "High"
         elif prob_disease >= 0.4:
-            label = "Medium"
-        else:
-            label = "Low"
-
-        return label, prob_disease
+            return "Medium"
+        return "Low"
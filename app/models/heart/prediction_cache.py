@@ -0,0 +1,69 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+CacheKey = Tuple[str, Tuple[float, ...]]
+
+
+class HeartPredictionCache:
+    """
+    In-memory LRU cache for heart predictions.
+
+    Key   = (model version, canonical feature tuple) - the float vector
+            HeartDiseaseModel.predict builds in feature_names order, so
+            "63", 63 and 63.0 all hit the same entry
+    Value = (risk_label, probability)
+
+    The heart form has 13 mostly small-integer inputs and identical
+    vectors are submitted again and again (retries, demo accounts,
+    what-if checks), so a few thousand entries cover most traffic.
+    The version (content hash of the loaded model) in the key keeps results
+    of different models apart, so a reload or a version swap never needs to
+    clear the cache: the old version's entries just age out of the LRU.
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+
+        self.max_entries: int = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def get(self, key: CacheKey) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: CacheKey, result: Tuple[str, float]) -> None:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "size": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
@@ -3,12 +3,20 @@ from app.services.prediction.prediction_service import prediction_service
 from app.services.authentication.auth_service import auth_service
 from app.services.chatbot.chatbot_service import chatbot_service
 from app.services.report.report_service import report_service
+from app.services.history.history_service import HistoryService, history_service
 from app.core.managers.database_manager import db_manager
+from app.core.managers.model_manager import model_manager
+from app.core.managers.prediction_log_writer import prediction_log_writer
 from werkzeug.utils import secure_filename
 from app.models.user.user import User
 from flask import send_file, send_from_directory
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from io import BytesIO
+import base64
+import hmac
 import os
+import threading
 from flask import (
     Blueprint,
     render_template,
@@ -17,6 +25,7 @@ from flask import (
     url_for,
     flash,
     session,
+    jsonify,
 )
 
 # Blueprint for main/public routes
@@ -36,6 +45,36 @@ BRAIN_UPLOAD_DIR.mkdir(parents = True, exist_ok = True)
 # Allowed MRI image extensions
 ALLOWED_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp"}
 
+# Persisting uploads is only needed to display the image back to the user.
+# Prediction runs from memory, so the disk write happens off the request thread.
+# Set BRAIN_PERSIST_UPLOADS=0 to skip it entirely (image is then shown inline).
+PERSIST_BRAIN_UPLOADS = os.getenv("BRAIN_PERSIST_UPLOADS", "1").strip().lower() in ("1", "true", "yes", "on")
+_upload_writer = ThreadPoolExecutor(max_workers = 2, thread_name_prefix = "upload-writer")
+
+IMAGE_MIME_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".bmp": "image/bmp"}
+
+
+def _write_upload(data: bytes, save_path: str) -> bool:
+    # Written under a temporary name and renamed into place, so the static URL never serves a partial file
+    tmp_path = f"{save_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, save_path)
+        return True
+    except Exception as e:
+        print(f"[ERROR] Failed to save uploaded MRI to {save_path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+
+def _inline_image_url(data: bytes, ext: str) -> str:
+    mime_type = IMAGE_MIME_TYPES.get(ext, "application/octet-stream")
+    return f"data:{mime_type};base64,{base64.b64encode(data).decode('ascii')}"
+
 
 @main_bp.route("/")
 def welcome():
@@ -185,6 +224,47 @@ def heart_disease():
     
     return render_template("heart_disease.html", result=result)
 
+@main_bp.route("/heart-disease/batch", methods = ["POST"])
+def heart_disease_batch():  # CSV upload: score many patients, download the results as CSV
+    if "user_id" not in session:
+        flash("Please log in to access heart disease detection.", "error")
+        return redirect(url_for("main.login"))
+
+    file = request.files.get("patients_csv")
+    if not file or not file.filename:
+        flash("Please select a CSV file to upload.", "error")
+        return redirect(url_for("main.heart_disease"))
+
+    filename = secure_filename(file.filename)
+    if Path(filename).suffix.lower() != ".csv":
+        flash("Unsupported file type. Please upload a .csv file.", "error")
+        return redirect(url_for("main.heart_disease"))
+
+    csv_data = file.read()
+    if not csv_data:
+        flash("The uploaded file is empty. Please select a valid CSV file.", "error")
+        return redirect(url_for("main.heart_disease"))
+
+    try:
+        batch = prediction_service.predict_heart_disease_csv(csv_data, session.get("user_id"))
+    except RuntimeError as e:
+        flash(str(e), "error")
+        return redirect(url_for("main.heart_disease"))
+    except Exception as e:
+        print(f"[ERROR] Heart disease batch route: Unexpected error: {type(e).__name__}: {e}")
+        import traceback
+        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+        flash("Heart disease batch prediction failed. Please try again later.", "error")
+        return redirect(url_for("main.heart_disease"))
+
+    print(f"[INFO] Heart batch: {batch['scored']} of {batch['rows']} rows scored, {batch['invalid']} invalid")
+    return send_file(
+        BytesIO(batch["csv_bytes"]),
+        mimetype="text/csv",
+        as_attachment=True,
+        download_name=f"{Path(filename).stem}_predictions.csv",
+    )
+
 # Removed custom route - now using static folder with url_for("static", ...)
 
 @main_bp.route("/brain-tumor", methods = ["GET", "POST"])
@@ -224,33 +304,32 @@ def brain_tumor():  # Brain tumor detection page
             )
             return redirect(url_for("main.brain_tumor"))
 
-        # Full save path: app/ui/uploads/brain/<filename>
-        # Flask static_folder is "ui", so url_for("static", filename="uploads/brain/...") 
-        # looks for files in app/ui/uploads/brain/
-        # Use os.path.join to ensure proper path handling on all platforms
-        save_path = os.path.join(str(BRAIN_UPLOAD_DIR), filename)
-
-        # Save the file
-        try:
-            file.save(save_path)
-        except Exception as e:
-            print(f"[ERROR] Failed to save uploaded MRI: {e}")
-            flash("There was a problem saving the uploaded image. Please try again.", "error")
+        # Read the upload once; prediction decodes straight from this buffer
+        image_data = file.read()
+        if not image_data:
+            flash("The uploaded file is empty. Please select a valid image file.", "error")
             return redirect(url_for("main.brain_tumor"))
 
-        # Build the public URL for the uploaded image using static folder
-        # Use forward slashes for URL (works on all platforms)
-        image_url = url_for("static", filename=f"uploads/brain/{filename}")
+        upload_write = None
+        if PERSIST_BRAIN_UPLOADS:
+            # Full save path: app/ui/static/uploads/brain/<filename>
+            # Written in the background while the prediction runs
+            save_path = os.path.join(str(BRAIN_UPLOAD_DIR), filename)
+            upload_write = _upload_writer.submit(_write_upload, image_data, save_path)
 
         user_id = session.get("user_id")
 
         # Run prediction
         try:
-            # Pass string path to prediction service
-            result = prediction_service.predict_brain_tumor(str(save_path), user_id)
+            result = prediction_service.predict_brain_tumor_from_bytes(image_data, filename, user_id)
             # Add image URL to result for template display
             if result:
-                result["image_url"] = image_url
+                if upload_write is not None and upload_write.done() and upload_write.result():
+                    # On disk already: serve it via the static folder (forward slashes work on all platforms)
+                    result["image_url"] = url_for("static", filename=f"uploads/brain/{filename}")
+                else:
+                    # Not persisted (yet): embed the image directly in the page
+                    result["image_url"] = _inline_image_url(image_data, ext)
             flash(
                 "Brain tumor prediction completed "
                 "(educational only, not a real medical diagnosis).",
@@ -395,6 +474,35 @@ def delete_account():
     flash(message, "success" if success else "error")
     return redirect(url_for("main.welcome"))
 
+@main_bp.route("/history")
+def prediction_history():
+    """
+    JSON page of the user's predictions, newest first.
+    Query params: model_type, since, until (YYYY-MM-DD or ISO datetime), limit, cursor
+    (the previous page's next_cursor).
+    """
+    if "user_id" not in session:
+        return jsonify({"error": "Please log in to view your prediction history."}), 401
+
+    try:
+        page = history_service.get_page(
+            session.get("user_id"),
+            model_type=request.args.get("model_type") or None,
+            since=request.args.get("since") or None,
+            until=request.args.get("until") or None,
+            limit=request.args.get("limit", HistoryService.DEFAULT_PAGE_SIZE, type=int),
+            cursor=request.args.get("cursor") or None,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(page)
+
+@main_bp.route("/history/summary")
+def prediction_summary():   # JSON: counts + latest result per model, last activity
+    if "user_id" not in session:
+        return jsonify({"error": "Please log in to view your prediction history."}), 401
+    return jsonify(history_service.get_summary(session.get("user_id")))
+
 @main_bp.route("/reports/heart/<int:log_id>")
 def heart_report(log_id: int):
     """
@@ -509,6 +617,38 @@ def brain_report(log_id: int):
         flash("An error occurred while generating the report. Please try again later.", "error")
         return redirect(url_for("main.dashboard"))
     
+def _metrics_authorized() -> bool:
+    # Only a scraper sending "Authorization: Bearer <METRICS_TOKEN>"; without that env var nobody
+    # (any visitor can register an account, so a login is not enough for server internals)
+    token = os.getenv("METRICS_TOKEN", "")
+    supplied = request.headers.get("Authorization", "")
+    return bool(token) and hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {token}".encode("utf-8"))
+
+@main_bp.route("/metrics")
+def metrics():
+    """
+    JSON runtime metrics for the model layer (batch sizes, queue wait times, ...)
+    the database connection pool and the background prediction log writer.
+    Not public: requires the METRICS_TOKEN bearer token.
+    """
+    if not _metrics_authorized():
+        return jsonify({"error": "Authentication required."}), 401
+    return jsonify({
+        **model_manager.get_metrics(),
+        "db_pool": db_manager.get_pool_stats(),
+        "prediction_log_writer": prediction_log_writer.get_stats(),
+    })
+
+@main_bp.route("/health/ready")
+def health_ready():
+    """
+    Readiness probe: 503 while models are still being preloaded, 200 afterwards.
+    Load balancers can hold traffic until this returns 200.
+    """
+    readiness = model_manager.get_readiness()
+    status_code = 503 if readiness["status"] == "loading" else 200
+    return jsonify(readiness), status_code
+
 @main_bp.route("/logout")  # Log the user out by clearing the session
 def logout():
     session.clear()
@@ -61,44 +61,37 @@ class ChatbotService:
             "and keep explanations brief and summarized."
         )
         
-    def _fetch_latest_prediction(   # Fetch the latest prediction_log row for a given user and model_type
+    def _fetch_latest_predictions(   # Latest prediction per model_type for a user, from user_prediction_summary
         self,
         user_id: int,
-        model_type: str,
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Dict[str, Dict[str, Any]]:
         
         try:
-            row = db_manager.fetch_one(
+            rows = db_manager.fetch_all(
                 """
-                SELECT id, user_id, model_type, input_summary,
-                       prediction_result, probability, created_at
-                FROM prediction_logs
-                WHERE user_id = ? AND model_type = ?
-                ORDER BY created_at DESC
-                LIMIT 1
+                SELECT latest_log_id, user_id, model_type, latest_input_summary,
+                       latest_result, latest_probability, latest_created_at
+                FROM user_prediction_summary
+                WHERE user_id = ?
                 """,
-                (user_id, model_type),
+                (user_id,),
             )
         except Exception as e:
-            print(f"[WARNING] Failed to fetch prediction for user {user_id}, model {model_type}: {e}")
-            return None
+            print(f"[WARNING] Failed to fetch predictions for user {user_id}: {e}")
+            return {}
 
-        if row is None:
-            return None
-
-        # sqlite3.Row objects can be accessed like dicts
-        if hasattr(row, 'keys'):
-            return dict(row)
-
-        # Fallback if row is a sequence/tuple; adjust indices if schema differs.
+        # Same keys as the prediction_logs columns the context builders expect
         return {
-            "id": row[0],
-            "user_id": row[1],
-            "model_type": row[2],
-            "input_summary": row[3],
-            "prediction_result": row[4],
-            "probability": row[5],
-            "created_at": row[6],
+            row[2]: {
+                "id": row[0],
+                "user_id": row[1],
+                "model_type": row[2],
+                "input_summary": row[3],
+                "prediction_result": row[4],
+                "probability": row[5],
+                "created_at": row[6],
+            }
+            for row in rows
         }
     
     # Build a short text summary of the user's latest heart and brain results
@@ -111,8 +104,9 @@ class ChatbotService:
                 "for this conversation."
             )
 
-        heart = self._fetch_latest_prediction(user_id, "heart_disease")
-        brain = self._fetch_latest_prediction(user_id, "brain_tumor_multiclass")
+        latest = self._fetch_latest_predictions(user_id)
+        heart = latest.get("heart_disease")
+        brain = latest.get("brain_tumor_multiclass")
 
         parts: list[str] = []
 
@@ -325,8 +319,9 @@ class ChatbotService:
                 "Proceed with symptom analysis without historical context."
             )
         
-        heart = self._fetch_latest_prediction(user_id, "heart_disease")
-        brain = self._fetch_latest_prediction(user_id, "brain_tumor_multiclass")
+        latest = self._fetch_latest_predictions(user_id)
+        heart = latest.get("heart_disease")
+        brain = latest.get("brain_tumor_multiclass")
         
         parts: list[str] = [
             "═══════════════════════════════════════════════════════════",
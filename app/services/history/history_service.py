@@ -0,0 +1,151 @@
+from __future__ import annotations
+import base64
+import json
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.managers.database_manager import db_manager
+
+
+class HistoryService:
+    """
+    Pages through a user's prediction_logs, newest first.
+
+    Keyset pagination on (created_at, id): each page continues strictly
+    after the last row of the previous one, so fetching page 1 and page
+    10,000 costs the same index seek (OFFSET would walk and discard every
+    earlier row). The cursor handed to the client is that last (created_at,
+    id) pair, base64-encoded.
+    """
+
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
+    def get_page(
+        self,
+        user_id: int,
+        model_type: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        One page of history. since / until are ISO dates or datetimes (until
+        is inclusive for a plain date). Raises ValueError on a bad cursor or
+        date. Returns {"items": [...], "next_cursor": str | None}.
+        """
+        limit = max(1, min(int(limit), self.MAX_PAGE_SIZE))
+
+        # Every filter is an equality / range on the (user_id, [model_type,] created_at) index
+        conditions = ["user_id = ?"]
+        params: List[Any] = [user_id]
+        if model_type:
+            conditions.append("model_type = ?")
+            params.append(model_type)
+        if since:
+            conditions.append("created_at >= ?")
+            params.append(self._parse_bound(since, end=False))
+        if until:
+            conditions.append("created_at < ?")
+            params.append(self._parse_bound(until, end=True))
+        if cursor:
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(self.decode_cursor(cursor))
+
+        # One extra row tells whether there is a next page without a COUNT(*)
+        rows = db_manager.fetch_all(
+            f"""
+            SELECT id, model_type, prediction_result, probability, created_at, model_version
+            FROM prediction_logs
+            WHERE {" AND ".join(conditions)}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+            """,
+            (*params, limit + 1),
+        )
+
+        items = [
+            {
+                "id": row[0],
+                "model_type": row[1],
+                "result": row[2],
+                "probability": row[3],
+                "created_at": row[4],
+                "model_version": row[5],
+            }
+            for row in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = self.encode_cursor(last["created_at"], last["id"])
+        return {"items": items, "next_cursor": next_cursor}
+
+    def get_summary(self, user_id: int) -> Dict[str, Any]:
+        """
+        Counts and latest result per model, plus last activity, from the
+        trigger-maintained user_prediction_summary table (one primary-key
+        range read, however long the history is).
+        """
+        rows = db_manager.fetch_all(
+            """
+            SELECT model_type, prediction_count, latest_log_id, latest_result,
+                   latest_probability, latest_input_summary, latest_created_at
+            FROM user_prediction_summary
+            WHERE user_id = ?
+            """,
+            (user_id,),
+        )
+        models = {
+            row[0]: {
+                "count": row[1],
+                "latest": {
+                    "id": row[2],
+                    "result": row[3],
+                    "probability": row[4],
+                    "input_summary": row[5],
+                    "created_at": row[6],
+                },
+            }
+            for row in rows
+        }
+        return {
+            "models": models,
+            "total": sum(m["count"] for m in models.values()),
+            "last_activity_at": max((m["latest"]["created_at"] for m in models.values()), default=None),
+        }
+
+    @staticmethod
+    def encode_cursor(created_at: str, log_id: int) -> str:
+        raw = json.dumps([created_at, log_id], separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            created_at, log_id = json.loads(raw)
+            if not isinstance(created_at, str) or not isinstance(log_id, int):
+                raise TypeError
+        except (ValueError, TypeError):
+            raise ValueError("Invalid history cursor.")
+        return created_at, log_id
+
+    @staticmethod
+    def _parse_bound(value: str, end: bool) -> str:
+        # created_at is stored as a UTC ISO string (...+00:00), so bounds compare as strings of the
+        # same shape: an offset is converted to UTC first, a naive datetime is taken as UTC
+        value = value.strip()
+        try:
+            if len(value) == 10:
+                day = date.fromisoformat(value)
+                return (day + timedelta(days=1) if end else day).isoformat()
+            moment = datetime.fromisoformat(value)
+            if moment.tzinfo is None:
+                return moment.replace(tzinfo=timezone.utc).isoformat()
+            return moment.astimezone(timezone.utc).isoformat()
+        except ValueError:
+            raise ValueError(f"Invalid date '{value}'. Use YYYY-MM-DD or an ISO datetime.")
+
+
+history_service = HistoryService()
@@ -1,13 +1,31 @@
-from typing import Dict, Any, Optional
+import os
+from typing import Dict, Any, List, Optional, Callable, BinaryIO
 from datetime import datetime, timezone
+from io import BytesIO
 from app.core.managers.database_manager import db_manager
 from app.core.managers.model_manager import model_manager
+from app.core.managers.prediction_log_writer import prediction_log_writer, to_json
+
+# Heart form / CSV columns, grouped by how they are parsed
+HEART_NUMERIC_FIELDS = ["age", "trestbps", "chol", "thalach", "oldpeak", "ca"]    # must be >= 0
+HEART_CODE_FIELDS = ["cp", "restecg", "slope", "thal"]                            # numeric codes
+HEART_BINARY_FIELDS = ["sex", "fbs", "exang"]                                     # 1/0, yes/no, true/false
+HEART_FIELDS = HEART_NUMERIC_FIELDS + HEART_CODE_FIELDS + HEART_BINARY_FIELDS
+# Training / form order, used for logged feature vectors
+HEART_FEATURE_ORDER = ["age", "sex", "cp", "trestbps", "chol", "fbs", "restecg",
+                       "thalach", "exang", "oldpeak", "slope", "ca", "thal"]
+BINARY_VALUES = {"1": 1.0, "yes": 1.0, "y": 1.0, "true": 1.0, "0": 0.0, "no": 0.0, "n": 0.0, "false": 0.0}
+
+# Largest CSV upload scored in one request
+HEART_BATCH_MAX_ROWS = int(os.getenv("HEART_BATCH_MAX_ROWS", "5000"))
+
 
 class PredictionService:    # Handles prediction logic for heart disease and brain tumor
-    # Uses ModelManager to access models and DatabaseManager to log results
+    # Uses ModelManager to access models and DatabaseManager / PredictionLogWriter to log results
     def __init__(self) -> None:
         self.db = db_manager
         self.models = model_manager
+        self.log_writer = prediction_log_writer
         
     @staticmethod
     def _now_iso() -> str:
@@ -81,8 +99,10 @@ class PredictionService:    # Handles prediction logic for heart disease and bra
             # 2) Predict
             # --------------------
             try:
-                heart_model = self.models.get_heart_model()
-                risk_label, probability = heart_model.predict(features)
+                # Lease the serving version: a hot swap mid-request does not affect it
+                with self.models.acquire("heart") as heart:
+                    risk_label, probability = heart.model.predict(features)
+                    model_version = heart.version
             except RuntimeError as e:
                 raise RuntimeError(f"Heart disease model error: {str(e)}")
             except Exception as e:
@@ -103,23 +123,16 @@ class PredictionService:    # Handles prediction logic for heart disease and bra
 
             if user_id is not None:
                 try:
-                    # Insert log and get the inserted row ID in the same transaction
-                    log_id = self.db.execute_and_get_id(
-                        """
-                        INSERT INTO prediction_logs (
-                            user_id, model_type, input_summary,
-                            prediction_result, probability, created_at
-                        )
-                        VALUES (?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            user_id,
-                            "heart_disease",
-                            input_summary,
-                            risk_label,
-                            float(probability),
-                            self._now_iso(),
-                        ),
+                    # Queued for the background log writer; the id is reserved up front
+                    log_id = self.log_writer.log(
+                        user_id,
+                        "heart_disease",
+                        input_summary,
+                        risk_label,
+                        float(probability),
+                        self._now_iso(),
+                        model_version,
+                        features=features,
                     )
                 except Exception as e:
                     print(f"[ERROR] PredictionService.predict_heart_disease: Failed to log prediction: {e}")
@@ -134,6 +147,7 @@ class PredictionService:    # Handles prediction logic for heart disease and bra
                 "features": features,
                 "input_summary": input_summary,
                 "suggestion": self._generate_heart_suggestion(risk_label),
+                "model_version": model_version,
                 "log_id": log_id,
             }
         except RuntimeError:
@@ -164,21 +178,178 @@ class PredictionService:    # Handles prediction logic for heart disease and bra
                 "Maintain a healthy lifestyle, exercise regularly, and keep up with periodic check-ups."
             )
     
+    def predict_heart_disease_csv(self, csv_data: bytes | BinaryIO, user_id: Optional[int]) -> Dict[str, Any]:
+        """
+        Score a CSV of patients (one row each, same columns as the form) in one go:
+        parse + validate every column at once -> ONE predict_many call ->
+        log all valid rows in ONE transaction (if user_id) -> result CSV.
+        Invalid rows are not scored; the result CSV gives the reason in "error".
+        Raises RuntimeError if the file itself is unusable or prediction fails.
+        """
+        import pandas as pd     # only batch uploads need pandas; keep it out of app startup
+
+        # --------------------
+        # 1) Parse + validate (column-wise)
+        # --------------------
+        try:
+            df = pd.read_csv(
+                BytesIO(csv_data) if isinstance(csv_data, bytes) else csv_data,
+                dtype=str,
+                keep_default_na=False,
+            )
+        except (ValueError, UnicodeDecodeError, pd.errors.ParserError) as e:
+            print(f"[ERROR] PredictionService.predict_heart_disease_csv: Could not parse CSV: {e}")
+            raise RuntimeError("Could not read the CSV file. Please upload a valid comma-separated file.")
+
+        df.columns = [str(c).strip().lower() for c in df.columns]
+        missing = [field for field in HEART_FIELDS if field not in df.columns]
+        if missing:
+            raise RuntimeError(f"The CSV file is missing required columns: {', '.join(missing)}")
+        if df.empty:
+            raise RuntimeError("The CSV file has no patient rows.")
+        if len(df) > HEART_BATCH_MAX_ROWS:
+            raise RuntimeError(f"The CSV file has {len(df)} rows; the limit is {HEART_BATCH_MAX_ROWS} per upload.")
+
+        raw = df[HEART_FIELDS].apply(lambda col: col.str.strip())
+        features = pd.DataFrame(index=df.index)
+        for field in HEART_NUMERIC_FIELDS + HEART_CODE_FIELDS:
+            features[field] = pd.to_numeric(raw[field], errors="coerce").astype(float)
+        for field in HEART_BINARY_FIELDS:
+            features[field] = raw[field].str.lower().map(BINARY_VALUES)
+
+        # Same rules as the single-patient form, one boolean mask per rule
+        checks = [(raw[field] == "", f"missing {field}") for field in HEART_FIELDS]
+        checks += [(features[field].isna() & (raw[field] != ""), f"invalid {field}") for field in HEART_FIELDS]
+        checks += [(features[field] < 0, f"{field} must be non-negative") for field in HEART_NUMERIC_FIELDS]
+        checks.append(((features["ca"] < 0) | (features["ca"] > 3), "ca must be between 0 and 3"))
+
+        errors = pd.Series("", index=df.index)
+        for mask, message in checks:
+            errors = errors.where(~mask, errors + message + "; ")
+        errors = errors.str.rstrip("; ")
+        valid = errors == ""
+
+        # --------------------
+        # 2) Predict (one call for every valid row)
+        # --------------------
+        labels: List[str] = []
+        probabilities: List[float] = []
+        model_version: Optional[str] = None
+        if valid.any():
+            try:
+                with self.models.acquire("heart") as heart:
+                    labels, proba = heart.model.predict_many(features.loc[valid])
+                    probabilities = proba.tolist()
+                    model_version = heart.version
+            except RuntimeError as e:
+                raise RuntimeError(f"Heart disease model error: {str(e)}")
+            except Exception as e:
+                print(f"[ERROR] PredictionService.predict_heart_disease_csv: Model prediction failed: {e}")
+                raise RuntimeError("Heart disease prediction failed. Please try again later.")
+
+        # --------------------
+        # 3) Log all valid rows in one transaction
+        # --------------------
+        logged = 0
+        if user_id is not None and labels:
+            created_at = self._now_iso()
+            rows = features.loc[valid, HEART_FEATURE_ORDER]
+            try:
+                logged = self.db.execute_many(
+                    """
+                    INSERT INTO prediction_logs (
+                        user_id, model_type, input_summary,
+                        prediction_result, probability, created_at, model_version, features
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        (
+                            user_id,
+                            "heart_disease",
+                            (
+                                f"age={r.age}, sex={r.sex}, cp={r.cp}, trestbps={r.trestbps}, chol={r.chol}, "
+                                f"fbs={r.fbs}, restecg={r.restecg}, thalach={r.thalach}, exang={r.exang}, "
+                                f"oldpeak={r.oldpeak}, slope={r.slope}, ca={r.ca}, thal={r.thal}"
+                            ),
+                            label,
+                            probability,
+                            created_at,
+                            model_version,
+                            to_json(dict(zip(HEART_FEATURE_ORDER, r))),
+                        )
+                        for r, label, probability in zip(rows.itertuples(index=False), labels, probabilities)
+                    ),
+                )
+            except Exception as e:
+                print(f"[ERROR] PredictionService.predict_heart_disease_csv: Failed to log predictions: {e}")
+                # Still return the results if logging fails
+
+        # --------------------
+        # 4) Result CSV: uploaded columns + prediction columns
+        # --------------------
+        # (invalid rows get empty cells)
+        df["risk_label"] = pd.Series(labels, index=df.index[valid], dtype=object)
+        df["probability"] = pd.Series(probabilities, index=df.index[valid], dtype=float).round(4)
+        df["error"] = errors
+
+        return {
+            "rows": len(df),
+            "scored": int(valid.sum()),
+            "invalid": int((~valid).sum()),
+            "logged": logged,
+            "model_version": model_version,
+            "csv_bytes": df.to_csv(index=False).encode("utf-8"),
+        }
+
     def predict_brain_tumor(self, image_path: str, user_id: Optional[int]) -> Dict[str, Any]:
         """
         Take an MRI image path -> call BrainTumorModel -> log prediction -> return result.
         Raises RuntimeError if model fails or prediction fails.
         """
+        input_summary = f"image_path={image_path.name if hasattr(image_path, 'name') else str(image_path)}"
+        return self._run_brain_prediction(
+            lambda brain_model: brain_model.predict(image_path),
+            input_summary,
+            user_id,
+        )
+
+    def predict_brain_tumor_from_bytes(
+        self,
+        image_data: bytes | BinaryIO,
+        filename: str,
+        user_id: Optional[int],
+    ) -> Dict[str, Any]:
+        """
+        Same as predict_brain_tumor, but decodes the MRI straight from memory
+        (request stream buffer) instead of re-reading a saved file from disk.
+        """
+        input_summary = f"image_path={filename}"
+        return self._run_brain_prediction(
+            lambda brain_model: brain_model.predict_from_bytes(image_data),
+            input_summary,
+            user_id,
+        )
+
+    def _run_brain_prediction(
+        self,
+        run: Callable[[Any], Dict[str, Any]],
+        input_summary: str,
+        user_id: Optional[int],
+    ) -> Dict[str, Any]:
+        # Shared body for both brain entry points: predict -> log -> build result
         try:
             # Get brain model
             try:
-                brain_model = self.models.get_brain_model()
+                self.models.get_brain_model()
             except RuntimeError as e:
                 raise RuntimeError(f"Brain tumor model error: {str(e)}")
             
-            # Run prediction
+            # Run prediction on a lease of the serving version (a hot swap mid-request does not affect it)
             try:
-                model_result = brain_model.predict(image_path)
+                with self.models.acquire("brain") as brain:
+                    model_result = run(brain.model)
+                    model_version = brain.version
             except FileNotFoundError as e:
                 print(f"[ERROR] PredictionService.predict_brain_tumor: Image file not found: {e}")
                 raise RuntimeError("Image file not found. Please ensure the file was uploaded correctly.")
@@ -196,9 +367,6 @@ class PredictionService:    # Handles prediction logic for heart disease and bra
             # Decide if this is considered "tumor" or "no_tumor"
             tumor_classes = {"glioma", "meningioma", "pituitary"}
             is_tumor = predicted_class in tumor_classes
-            
-            # Build a short input summary for logging
-            input_summary = f"image_path={image_path.name if hasattr(image_path, 'name') else str(image_path)}"
 
             # --------------------
             # Log prediction in DB + get log_id
@@ -207,23 +375,16 @@ class PredictionService:    # Handles prediction logic for heart disease and bra
 
             if user_id is not None:
                 try:
-                    # Insert log and get the inserted row ID in the same transaction
-                    log_id = self.db.execute_and_get_id(
-                        """
-                        INSERT INTO prediction_logs (
-                            user_id, model_type, input_summary,
-                            prediction_result, probability, created_at
-                        )
-                        VALUES (?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            user_id,
-                            "brain_tumor_multiclass",
-                            input_summary,
-                            predicted_class,
-                            probability,
-                            self._now_iso(),
-                        ),
+                    # Queued for the background log writer; the id is reserved up front
+                    log_id = self.log_writer.log(
+                        user_id,
+                        "brain_tumor_multiclass",
+                        input_summary,
+                        predicted_class,
+                        probability,
+                        self._now_iso(),
+                        model_version,
+                        probabilities=probabilities,
                     )
                 except Exception as e:
                     print(f"[ERROR] PredictionService.predict_brain_tumor: Failed to log prediction: {e}")
@@ -239,6 +400,7 @@ class PredictionService:    # Handles prediction logic for heart disease and bra
                 "is_tumor": is_tumor,
                 "input_summary": input_summary,
                 "suggestion": suggestion,
+                "model_version": model_version,
                 "log_id": log_id,
             }
         except RuntimeError:
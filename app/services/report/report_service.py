@@ -1,11 +1,13 @@
 from __future__ import annotations
-from typing import Optional, Dict, Any
+import json
+from typing import Optional, Dict, Any, List
 from io import BytesIO
 from datetime import datetime
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import mm
 from app.core.managers.database_manager import db_manager
+from app.core.managers.prediction_log_writer import prediction_log_writer
 from app.models.user.user import User
 
 
@@ -22,22 +24,29 @@ class ReportService:
         Convert a DB row into a plain dict.
         Expected columns:
             id, user_id, model_type, input_summary,
-            prediction_result, probability, created_at
+            prediction_result, probability, created_at, features, probabilities
+        The JSON features / probabilities columns are decoded to dicts (None if absent).
         """
         if hasattr(row, "keys"):
             # sqlite3.Row or dict-like
-            return dict(row)
-
-        # tuple fallback
-        return {
-            "id": row[0],
-            "user_id": row[1],
-            "model_type": row[2],
-            "input_summary": row[3],
-            "prediction_result": row[4],
-            "probability": row[5],
-            "created_at": row[6],
-        }
+            log = dict(row)
+        else:
+            # tuple fallback
+            log = {
+                "id": row[0],
+                "user_id": row[1],
+                "model_type": row[2],
+                "input_summary": row[3],
+                "prediction_result": row[4],
+                "probability": row[5],
+                "created_at": row[6],
+                "features": row[7] if len(row) > 7 else None,
+                "probabilities": row[8] if len(row) > 8 else None,
+            }
+
+        for key in ("features", "probabilities"):
+            log[key] = json.loads(log[key]) if log.get(key) else None
+        return log
 
     def get_prediction_for_user(
         self,
@@ -52,7 +61,7 @@ class ReportService:
         params = [log_id, user_id]
         query = """
             SELECT id, user_id, model_type, input_summary,
-                   prediction_result, probability, created_at
+                   prediction_result, probability, created_at, features, probabilities
             FROM prediction_logs
             WHERE id = ? AND user_id = ?
         """
@@ -61,6 +70,8 @@ class ReportService:
             query += " AND model_type = ?"
             params.append(model_type)
 
+        # A just-made prediction may still be in the background log writer's queue
+        prediction_log_writer.wait_for(log_id)
         row = db_manager.fetch_one(query, tuple(params))
         if row is None:
             return None
@@ -70,6 +81,15 @@ class ReportService:
     # ------------------------------------------------------------------
     # Helpers for formatting
     # ------------------------------------------------------------------
+    def _input_lines(self, features: Optional[Dict[str, float]], input_summary: str) -> List[str]:
+        """
+        One "name=value" line per heart input: from the typed features column,
+        or split from the input_summary text for rows logged before it existed.
+        """
+        if features:
+            return [f"{name}={value:g}" for name, value in features.items()]
+        return [line.strip() for line in input_summary.split(",")]
+
     def _format_datetime(self, value: Any) -> str:
         """
         Try to format ISO datetime string nicely as 'YYYY-MM-DD HH:MM'.
@@ -262,8 +282,8 @@ class ReportService:
         text_obj = c.beginText()
         text_obj.setTextOrigin(margin_left, y)
         text_obj.setLeading(13)
-        for line in input_summary.split(","):
-            text_obj.textLine(line.strip())
+        for line in self._input_lines(log.get("features"), input_summary):
+            text_obj.textLine(line)
         c.drawText(text_obj)
 
         # Explanation
@@ -354,6 +374,16 @@ class ReportService:
             y,
             "Model type: Brain tumor CNN (4-class: glioma, meningioma, pituitary, no_tumor)",
         )
+        probabilities = log.get("probabilities")
+        if probabilities:
+            y -= 14
+            c.drawString(
+                margin_left,
+                y,
+                "Class probabilities: " + ", ".join(
+                    f"{name} {self._probability_to_percent(p)}" for name, p in probabilities.items()
+                ),
+            )
 
         # Interpretation
         y -= 20
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Optional, Tuple, Dict, Any
 from app.core.managers.database_manager import db_manager
+from app.core.managers.prediction_log_writer import RECORD_HISTORY_CLEAR, prediction_log_writer
 from app.models.user.user import User 
 
 
@@ -71,17 +72,29 @@ class UserSettingsService:
         return True, "Password updated successfully."
 
     def clear_prediction_history(self, user_id: int) -> Tuple[bool, str]:
-        db_manager.execute(
-            "DELETE FROM prediction_logs WHERE user_id = ?",
-            (user_id,),
-        )
+        # Rows queued in this process are committed first. Other worker processes cannot be
+        # flushed from here: the tombstone makes their writers skip this user's older rows.
+        prediction_log_writer.flush()
+        cleared_at = User.now_iso()
+
+        def clear(conn) -> None:
+            conn.execute(RECORD_HISTORY_CLEAR, (user_id, cleared_at))
+            conn.execute("DELETE FROM prediction_logs WHERE user_id = ?", (user_id,))
+
+        db_manager.run_in_transaction(clear)
         return True, "Prediction history cleared."
 
     def delete_account(self, user_id: int) -> Tuple[bool, str]:
-        db_manager.execute(
-            "DELETE FROM users WHERE id = ?",
-            (user_id,),
-        )
+        # Tombstone too: a prediction still queued in another worker must not log (and
+        # re-create a summary row) for the deleted account
+        prediction_log_writer.flush()
+        cleared_at = User.now_iso()
+
+        def delete(conn) -> None:
+            conn.execute(RECORD_HISTORY_CLEAR, (user_id, cleared_at))
+            conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+
+        db_manager.run_in_transaction(delete)
         return True, "Your account has been deleted."
 
 user_settings_service = UserSettingsService()
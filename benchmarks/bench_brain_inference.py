@@ -0,0 +1,64 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+# Allow "python benchmarks/bench_brain_inference.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.models.brain.brain_tumor_model import BrainTumorModel  # noqa: E402
+
+
+def _time_calls(model: BrainTumorModel, x: np.ndarray, iterations: int) -> np.ndarray:
+    model.predict_batch(x)  # warm-up
+    latencies_ms = np.empty(iterations)
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        model.predict_batch(x)
+        latencies_ms[i] = (time.perf_counter() - t0) * 1000.0
+    return latencies_ms
+
+
+def main() -> None: # Per-call CPU latency: keras.Model.predict vs pre-traced fixed-shape tf.function
+    default_model = PROJECT_ROOT / "app" / "data" / "saved_models" / "brain_tumor_cnn_multiclass.h5"
+
+    parser = argparse.ArgumentParser(description = "Benchmark brain CNN per-call latency by backend.")
+    parser.add_argument("--model-path", type = Path, default = default_model)
+    parser.add_argument("--iterations", type = int, default = 200)
+    parser.add_argument("--batch-sizes", type = int, nargs = "+", default = [1, 4, 16])
+    parser.add_argument("--backends", nargs = "+", default = ["keras", "keras_compiled"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"[INFO] Model: {args.model_path}")
+    print(f"[INFO] Iterations per case: {args.iterations}")
+    print()
+    print(f"{'backend':<16}{'batch':>6}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'img/s':>10}")
+
+    baseline_p50: dict[int, float] = {}
+    for backend in args.backends:
+        model = BrainTumorModel(model_path = args.model_path, backend = backend)
+        t0 = time.perf_counter()
+        model._ensure_model_loaded()
+        load_s = time.perf_counter() - t0
+
+        for batch_size in args.batch_sizes:
+            x = rng.uniform(0, 255, size = (batch_size, 128, 128, 3)).astype("float32")
+            lat = _time_calls(model, x, args.iterations)
+            p50 = float(np.percentile(lat, 50))
+            speedup = ""
+            if backend == args.backends[0]:
+                baseline_p50[batch_size] = p50
+            elif batch_size in baseline_p50:
+                speedup = f"  ({baseline_p50[batch_size] / p50:.1f}x vs {args.backends[0]})"
+            print(
+                f"{backend:<16}{batch_size:>6}{lat.mean():>10.3f}{p50:>10.3f}"
+                f"{np.percentile(lat, 95):>10.3f}{batch_size * 1000.0 / lat.mean():>10.1f}{speedup}"
+            )
+        print(f"{'':<16}load + warm-up: {load_s:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Allow "python benchmarks/bench_db_pool.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.managers.database_manager import DatabaseManager  # noqa: E402
+
+
+def _workload(db: DatabaseManager, user_id: int, operations: int) -> None:
+    # What one heart prediction request does: look up the user, log the result, read it back
+    for _ in range(operations):
+        db.fetch_one("SELECT * FROM users WHERE id = ?", (user_id,))
+        log_id = db.execute_and_get_id(
+            "INSERT INTO prediction_logs (user_id, model_type, input_summary, prediction_result, "
+            "probability, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (user_id, "heart_disease", "bench", "Low", 0.1, "2025-01-01T00:00:00+00:00"),
+        )
+        db.fetch_one("SELECT * FROM prediction_logs WHERE id = ?", (log_id,))
+
+
+def _run(db_path: str, pool_size: int, threads: int, operations: int) -> float:
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    db = DatabaseManager(db_path)
+    db.init_db()
+    user_id = db.execute_and_get_id(
+        "INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+        (f"bench{pool_size}-{threads}", f"bench{pool_size}-{threads}@example.com", "x", "2025-01-01"),
+    )
+
+    workers = [threading.Thread(target = _workload, args = (db, user_id, operations)) for _ in range(threads)]
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t0
+    db.close_all()
+    return threads * operations * 3 / elapsed
+
+
+def main() -> None: # Queries/second through DatabaseManager, new connection per query vs pooled
+    parser = argparse.ArgumentParser(description = "Benchmark DatabaseManager with and without connection pooling.")
+    parser.add_argument("--threads", type = int, nargs = "+", default = [1, 4, 8])
+    parser.add_argument("--operations", type = int, default = 300, help = "Request-like operations per thread.")
+    parser.add_argument("--pool-size", type = int, default = 8)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix = "mdds-db-bench-")
+    try:
+        print(f"{'threads':>8}{'no pool q/s':>14}{'pooled q/s':>14}{'speedup':>10}")
+        for threads in args.threads:
+            plain = _run(os.path.join(tmp_dir, f"plain-{threads}.db"), 0, threads, args.operations)
+            pooled = _run(os.path.join(tmp_dir, f"pooled-{threads}.db"), args.pool_size, threads, args.operations)
+            print(f"{threads:>8}{plain:>14,.0f}{pooled:>14,.0f}{pooled / plain:>9.1f}x")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors = True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Dict, List
+import numpy as np
+
+# Allow "python benchmarks/bench_heart_engine.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.models.heart.heart_disease_model import HeartDiseaseModel  # noqa: E402
+
+
+def _patients(feature_names: List[str], n: int, seed: int = 42) -> List[Dict[str, float]]:
+    # Plausible ranges for the 13 UCI heart features (unknown names get 0..3)
+    ranges = {
+        "age": (29, 77), "sex": (0, 1), "cp": (0, 3), "trestbps": (94, 200), "chol": (126, 564),
+        "fbs": (0, 1), "restecg": (0, 2), "thalach": (71, 202), "exang": (0, 1), "oldpeak": (0, 6),
+        "slope": (0, 2), "ca": (0, 3), "thal": (1, 3),
+    }
+    rng = np.random.default_rng(seed)
+    return [
+        {name: float(rng.integers(*ranges.get(name, (0, 3)), endpoint = True)) for name in feature_names}
+        for _ in range(n)
+    ]
+
+
+def _time_single(model: HeartDiseaseModel, patients: List[Dict[str, float]]) -> np.ndarray:
+    model.predict(patients[0])  # warm-up
+    latencies_ms = np.empty(len(patients))
+    for i, features in enumerate(patients):
+        t0 = time.perf_counter()
+        model.predict(features)
+        latencies_ms[i] = (time.perf_counter() - t0) * 1000.0
+    return latencies_ms
+
+
+def main() -> None: # Per-request heart latency: sklearn predict_proba vs flat-array forest engine
+    default_model = PROJECT_ROOT / "app" / "data" / "saved_models" / "heart_model.pkl"
+
+    parser = argparse.ArgumentParser(description = "Benchmark heart model latency by inference engine.")
+    parser.add_argument("--model-path", type = Path, default = default_model)
+    parser.add_argument("--requests", type = int, default = 500)
+    parser.add_argument("--batch-size", type = int, default = 1000)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")     # sklearn feature-name warnings on plain arrays
+    engines = {
+        "sklearn": HeartDiseaseModel(model_path = args.model_path, engine = "sklearn"),
+        "arrays (compiled)": HeartDiseaseModel(model_path = args.model_path, engine = "arrays", use_mmap_arrays = False),
+        "arrays (mmap)": HeartDiseaseModel(model_path = args.model_path, engine = "arrays"),
+    }
+    for model in engines.values():
+        model.load_model()
+
+    feature_names = engines["sklearn"].feature_names
+    patients = _patients(feature_names, args.requests)
+    X = np.array([[p[name] for name in feature_names] for p in _patients(feature_names, args.batch_size, seed = 7)])
+
+    print(f"[INFO] Model: {args.model_path}")
+    print(f"[INFO] {args.requests} single-patient requests, batch of {args.batch_size} rows")
+    print()
+    print(f"{'engine':<20}{'format':<17}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'batch ms':>10}{'exact':>7}")
+
+    reference = engines["sklearn"].predict_many(X)[1]
+    baseline_p50 = None
+    for name, model in engines.items():
+        lat = _time_single(model, patients)
+        t0 = time.perf_counter()
+        _, proba = model.predict_many(X)
+        batch_ms = (time.perf_counter() - t0) * 1000.0
+
+        p50 = float(np.percentile(lat, 50))
+        speedup = ""
+        if baseline_p50 is None:
+            baseline_p50 = p50
+        else:
+            speedup = f"  ({baseline_p50 / p50:.0f}x vs sklearn)"
+        exact = "yes" if np.array_equal(proba, reference) else "NO"
+        print(
+            f"{name:<20}{model.loaded_format:<17}{lat.mean():>9.3f}{p50:>9.3f}"
+            f"{np.percentile(lat, 95):>9.3f}{batch_ms:>10.2f}{exact:>7}{speedup}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import multiprocessing as mp
+import sys
+import warnings
+from pathlib import Path
+from typing import Dict
+
+# Allow "python benchmarks/bench_heart_memory.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def _memory_kb() -> Dict[str, int]:
+    # RSS split into private (anon) and file-backed pages, plus PSS (shared pages divided among sharers)
+    out: Dict[str, int] = {}
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            key = line.split(":")[0]
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                out[key] = int(line.split()[1])
+    try:
+        with open("/proc/self/smaps_rollup", "r") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    out["Pss"] = int(line.split()[1])
+    except OSError:
+        pass
+    return out
+
+
+def _worker(model_path: str, use_mmap: bool, results, release) -> None:
+    warnings.simplefilter("ignore")
+    from app.models.heart.heart_disease_model import HeartDiseaseModel
+
+    before = _memory_kb()
+    model = HeartDiseaseModel(model_path = model_path, use_mmap_arrays = use_mmap)
+    model.warm_up()     # load + one prediction (touches every tree)
+    after = _memory_kb()
+    results.put((model.loaded_format, before, after))
+    release.wait()      # stay alive so PSS reflects all workers sharing pages
+    after_all = _memory_kb()
+    results.put(("pss_all_alive", after_all.get("Pss", 0)))
+
+
+def _run(model_path: Path, workers: int, use_mmap: bool) -> None:
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    release = ctx.Event()
+    procs = [ctx.Process(target = _worker, args = (str(model_path), use_mmap, results, release)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    loads = [results.get() for _ in procs]
+    release.set()
+    pss = [results.get()[1] for _ in procs]
+    for p in procs:
+        p.join()
+
+    fmt = loads[0][0]
+    print(f"\n[INFO] {workers} worker(s), heart model loaded as: {fmt}")
+    print(f"{'worker':>7}{'RSS +MB':>10}{'anon +MB':>10}{'file +MB':>10}{'RSS MB':>9}")
+    for i, (_, before, after) in enumerate(loads):
+        print(
+            f"{i:>7}{(after['VmRSS'] - before['VmRSS']) / 1024:>10.2f}"
+            f"{(after['RssAnon'] - before['RssAnon']) / 1024:>10.2f}"
+            f"{(after['RssFile'] - before['RssFile']) / 1024:>10.2f}"
+            f"{after['VmRSS'] / 1024:>9.1f}"
+        )
+    anon_delta = sum(after["RssAnon"] - before["RssAnon"] for _, before, after in loads) / 1024
+    print(f"[INFO] Private (anon) memory added by loading, all workers: {anon_delta:.2f} MB")
+    if any(pss):
+        print(f"[INFO] Total PSS with all workers alive: {sum(pss) / 1024:.1f} MB")
+
+
+def main() -> None: # Per-worker RSS of the heart model: pickled forest vs mmap-shared .npy arrays
+    default_model = PROJECT_ROOT / "app" / "data" / "saved_models" / "heart_model.pkl"
+
+    parser = argparse.ArgumentParser(description = "Measure heart model memory per worker process.")
+    parser.add_argument("--model-path", type = Path, default = default_model)
+    parser.add_argument("--workers", type = int, default = 4)
+    args = parser.parse_args()
+
+    if not sys.platform.startswith("linux"):
+        raise SystemExit("[ERROR] This benchmark reads /proc and only runs on Linux.")
+
+    _run(args.model_path, args.workers, use_mmap = False)
+    _run(args.model_path, args.workers, use_mmap = True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, List
+
+# Allow "python benchmarks/bench_history_pagination.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.managers.database_manager import db_manager  # noqa: E402
+from app.services.history.history_service import HistoryService  # noqa: E402
+
+MODEL_TYPES = ("heart_disease", "brain_tumor_multiclass")
+
+
+def _fill(rows: int, users: int, heavy_share: float) -> None:
+    # Synthetic prediction_logs: user 1 is the heavy user, the rest share the remainder
+    rng = random.Random(0)
+    start = datetime(2023, 1, 1, tzinfo = timezone.utc)
+    step = timedelta(days = 730) / rows
+    for u in range(1, users + 1):
+        db_manager.execute(
+            "INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+            (f"user{u}", f"user{u}@example.com", "x", start.isoformat()),
+        )
+
+    batch: List[tuple] = []
+    for i in range(rows):
+        user_id = 1 if rng.random() < heavy_share else rng.randint(2, users)
+        created_at = (start + step * i).isoformat(timespec = "seconds")
+        batch.append((user_id, rng.choice(MODEL_TYPES), "synthetic", "Low", rng.random(), created_at, "v1"))
+        if len(batch) == 50_000:
+            db_manager.execute_many(
+                "INSERT INTO prediction_logs (user_id, model_type, input_summary, prediction_result, "
+                "probability, created_at, model_version) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+            batch = []
+    if batch:
+        db_manager.execute_many(
+            "INSERT INTO prediction_logs (user_id, model_type, input_summary, prediction_result, "
+            "probability, created_at, model_version) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+
+
+def _ms(fn: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return sorted(times)[len(times) // 2] * 1000
+
+
+def main() -> None: # Page fetch time vs history depth: keyset (HistoryService) vs LIMIT/OFFSET
+    parser = argparse.ArgumentParser(description = "Benchmark keyset vs OFFSET pagination of prediction_logs.")
+    parser.add_argument("--rows", type = int, default = 1_000_000)
+    parser.add_argument("--users", type = int, default = 100)
+    parser.add_argument("--heavy-share", type = float, default = 0.5, help = "Share of rows owned by user 1.")
+    parser.add_argument("--page-size", type = int, default = 50)
+    parser.add_argument("--repeat", type = int, default = 5)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix = "mdds-history-bench-")
+    db_manager.db_path = os.path.join(tmp_dir, "history.db")
+    try:
+        db_manager.init_db()
+        t0 = time.perf_counter()
+        _fill(args.rows, args.users, args.heavy_share)
+        heavy_rows = db_manager.fetch_one("SELECT COUNT(*) FROM prediction_logs WHERE user_id = 1")[0]
+        print(f"[INFO] {args.rows:,} rows ({heavy_rows:,} for the heavy user) in {time.perf_counter() - t0:.1f}s")
+
+        service = HistoryService()
+        print(f"{'offset':>10}{'keyset ms':>12}{'OFFSET ms':>12}")
+        for offset in (0, 1_000, 10_000, 100_000, heavy_rows - args.page_size):
+            if offset < 0 or offset >= heavy_rows:
+                continue
+            # Cursor of the row just before this position (what the client would hold)
+            cursor = None
+            if offset:
+                before = db_manager.fetch_one(
+                    "SELECT created_at, id FROM prediction_logs WHERE user_id = 1 "
+                    "ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET ?",
+                    (offset - 1,),
+                )
+                cursor = service.encode_cursor(before[0], before[1])
+
+            keyset = _ms(lambda: service.get_page(1, limit = args.page_size, cursor = cursor), args.repeat)
+            offset_ms = _ms(lambda: db_manager.fetch_all(
+                "SELECT id, model_type, prediction_result, probability, created_at, model_version "
+                "FROM prediction_logs WHERE user_id = 1 ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                (args.page_size, offset),
+            ), args.repeat)
+            print(f"{offset:>10,}{keyset:>12.2f}{offset_ms:>12.2f}")
+
+        filtered = _ms(lambda: service.get_page(
+            1, model_type = "brain_tumor_multiclass", since = "2024-03-01", until = "2024-03-31", limit = args.page_size,
+        ), args.repeat)
+        print(f"[INFO] Filtered page (model_type + one month): {filtered:.2f} ms")
+
+        t0 = time.perf_counter()
+        everything = db_manager.fetch_all("SELECT * FROM prediction_logs WHERE user_id = 1")
+        print(f"[INFO] Naive fetch_all of the heavy user's history: {len(everything):,} rows, "
+              f"{(time.perf_counter() - t0) * 1000:.0f} ms")
+    finally:
+        db_manager.close_all()
+        shutil.rmtree(tmp_dir, ignore_errors = True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Allow "python benchmarks/bench_prefork_memory.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _children(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", "r") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def _memory_kb(pid: int) -> Dict[str, int]:
+    # RSS counts shared pages once per process; PSS splits them between the sharers
+    out = {"Rss": 0, "Pss": 0, "Private": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                key = line.split(":")[0]
+                if key in ("Rss", "Pss"):
+                    out[key] = int(line.split()[1])
+                elif key in ("Private_Clean", "Private_Dirty"):
+                    out["Private"] += int(line.split()[1])
+    except OSError:
+        pass
+    return out
+
+
+def _wait_until_settled(master_pid: int, workers: int, timeout: float) -> List[int]:
+    # Workers load models in the background: wait until all exist and total RSS stops moving
+    deadline = time.time() + timeout
+    last_total, stable_polls = -1, 0
+    while time.time() < deadline:
+        pids = [master_pid] + _children(master_pid)
+        total = sum(_memory_kb(pid)["Rss"] for pid in pids)
+        if len(pids) == workers + 1 and abs(total - last_total) <= 0.005 * max(total, 1):
+            stable_polls += 1
+            if stable_polls >= 3:
+                return pids
+        else:
+            stable_polls = 0
+        last_total = total
+        time.sleep(1.0)
+    print("[WARNING] Memory did not settle before the timeout, reporting current numbers.")
+    return [master_pid] + _children(master_pid)
+
+
+def _run(workers: int, preload: bool, port: int, timeout: float) -> Dict[str, float]:
+    env = dict(
+        os.environ,
+        WEB_CONCURRENCY = str(workers),
+        GUNICORN_PRELOAD = "1" if preload else "0",
+        GUNICORN_BIND = f"127.0.0.1:{port}",
+        PRELOAD_MODELS = "1",     # without master preload, every worker loads its own models at start
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        cwd = PROJECT_ROOT, env = env, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL,
+    )
+    try:
+        pids = _wait_until_settled(server.pid, workers, timeout)
+        memory = [_memory_kb(pid) for pid in pids]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout = 60)
+
+    label = "preload" if preload else "no preload"
+    print(f"\n[INFO] {workers} worker(s), {label}")
+    print(f"{'process':>9}{'RSS MB':>9}{'PSS MB':>9}{'private MB':>12}")
+    for i, m in enumerate(memory):
+        name = "master" if i == 0 else f"worker {i}"
+        print(f"{name:>9}{m['Rss'] / 1024:>9.1f}{m['Pss'] / 1024:>9.1f}{m['Private'] / 1024:>12.1f}")
+    totals = {key: sum(m[key] for m in memory) / 1024 for key in ("Rss", "Pss", "Private")}
+    print(f"{'total':>9}{totals['Rss']:>9.1f}{totals['Pss']:>9.1f}{totals['Private']:>12.1f}")
+    return totals
+
+
+def main() -> None: # Total memory of gunicorn master + N workers, models loaded before vs after fork
+    parser = argparse.ArgumentParser(description = "Measure gunicorn memory with and without pre-fork model loading.")
+    parser.add_argument("--workers", type = int, default = 4)
+    parser.add_argument("--port", type = int, default = 8765)
+    parser.add_argument("--timeout", type = float, default = 180.0, help = "Max seconds to wait for workers to settle.")
+    args = parser.parse_args()
+
+    if not sys.platform.startswith("linux"):
+        raise SystemExit("[ERROR] This benchmark reads /proc and only runs on Linux.")
+
+    no_preload = _run(args.workers, preload = False, port = args.port, timeout = args.timeout)
+    preload = _run(args.workers, preload = True, port = args.port, timeout = args.timeout)
+
+    print(
+        f"\n[INFO] Total PSS (real memory used): {no_preload['Pss']:.1f} MB -> {preload['Pss']:.1f} MB "
+        f"({no_preload['Pss'] - preload['Pss']:.1f} MB saved with preload)"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Runs in a fresh interpreter so every sample pays the full import cost
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from app import create_app
+t_import = time.perf_counter() - t0
+create_app(preload_models=False)
+t_total = time.perf_counter() - t0
+
+rss_mb = None
+try:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss_mb = int(line.split()[1]) / 1024.0
+except OSError:
+    pass
+
+print(json.dumps({
+    "import_s": t_import,
+    "create_app_s": t_total,
+    "rss_mb": rss_mb,
+    "tensorflow_imported": "tensorflow" in sys.modules,
+}))
+"""
+
+
+def _sample() -> dict:
+    env = dict(os.environ, PRELOAD_MODELS = "0", TF_CPP_MIN_LOG_LEVEL = "3")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD],
+        cwd = PROJECT_ROOT,
+        env = env,
+        capture_output = True,
+        text = True,
+        check = True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None: # Cold-start time of create_app() in fresh processes (regression guard for lazy imports)
+    parser = argparse.ArgumentParser(description = "Benchmark Flask app startup time.")
+    parser.add_argument("--runs", type = int, default = 5)
+    parser.add_argument("--max-seconds", type = float, default = None,
+                        help = "Exit non-zero if the median create_app() time is above this.")
+    args = parser.parse_args()
+
+    samples = [_sample() for _ in range(args.runs)]
+    import_s = np.array([s["import_s"] for s in samples])
+    total_s = np.array([s["create_app_s"] for s in samples])
+    rss = [s["rss_mb"] for s in samples if s["rss_mb"] is not None]
+    tf_imported = any(s["tensorflow_imported"] for s in samples)
+
+    print(f"[INFO] Runs: {args.runs}")
+    print(f"[INFO] import app:    median {np.median(import_s):.3f}s  min {import_s.min():.3f}s  max {import_s.max():.3f}s")
+    print(f"[INFO] create_app():  median {np.median(total_s):.3f}s  min {total_s.min():.3f}s  max {total_s.max():.3f}s")
+    if rss:
+        print(f"[INFO] RSS after startup: {np.median(rss):.1f} MB")
+    print(f"[INFO] TensorFlow imported at startup: {tf_imported}")
+
+    failed = False
+    if tf_imported:
+        print("[ERROR] TensorFlow was imported by create_app(); it should only load on first brain prediction.")
+        failed = True
+    if args.max_seconds is not None and np.median(total_s) > args.max_seconds:
+        print(f"[ERROR] Median startup {np.median(total_s):.3f}s exceeds --max-seconds {args.max_seconds}")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
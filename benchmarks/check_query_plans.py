@@ -0,0 +1,129 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+# Allow "python benchmarks/check_query_plans.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.managers.database_manager import DatabaseManager  # noqa: E402
+
+# Also asserted by tests/test_query_plans.py, so a migration that loses an index fails the tests
+# (description, SQL as the services run it, params, text the plan must contain)
+HOT_QUERIES: List[Tuple[str, str, tuple, str]] = [
+    (
+        "ChatbotService._fetch_latest_predictions",
+        """
+        SELECT latest_log_id, user_id, model_type, latest_input_summary,
+               latest_result, latest_probability, latest_created_at
+        FROM user_prediction_summary
+        WHERE user_id = ?
+        """,
+        (1,),
+        "USING PRIMARY KEY (user_id=?)",
+    ),
+    (
+        "user_prediction_summary delete trigger (new latest row)",
+        """
+        SELECT id, prediction_result, probability, input_summary, created_at
+        FROM prediction_logs
+        WHERE user_id = ? AND model_type = ?
+        ORDER BY created_at DESC, id DESC
+        LIMIT 1
+        """,
+        (1, "heart_disease"),
+        "USING INDEX idx_prediction_logs_user_model_created (user_id=? AND model_type=?)",
+    ),
+    (
+        "ReportService.get_prediction_for_user",
+        """
+        SELECT id, user_id, model_type, input_summary,
+               prediction_result, probability, created_at, features, probabilities
+        FROM prediction_logs
+        WHERE id = ? AND user_id = ? AND model_type = ?
+        """,
+        (1, 1, "heart_disease"),
+        "USING INTEGER PRIMARY KEY (rowid=?)",
+    ),
+    (
+        "HistoryService.get_page (next page)",
+        """
+        SELECT id, model_type, prediction_result, probability, created_at, model_version
+        FROM prediction_logs
+        WHERE user_id = ? AND (created_at, id) < (?, ?)
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+        """,
+        (1, "2025-01-01T00:00:00+00:00", 100, 21),
+        "USING INDEX idx_prediction_logs_user_created (user_id=? AND created_at<?)",
+    ),
+    (
+        "HistoryService.get_page (model_type + date range)",
+        """
+        SELECT id, model_type, prediction_result, probability, created_at, model_version
+        FROM prediction_logs
+        WHERE user_id = ? AND model_type = ? AND created_at >= ? AND created_at < ?
+              AND (created_at, id) < (?, ?)
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+        """,
+        (1, "heart_disease", "2025-01-01", "2025-02-01", "2025-01-15T00:00:00+00:00", 100, 21),
+        "USING INDEX idx_prediction_logs_user_model_created (user_id=? AND model_type=?",
+    ),
+    (
+        "UserSettingsService.clear_prediction_history",
+        "DELETE FROM prediction_logs WHERE user_id = ?",
+        (1,),
+        "INDEX idx_prediction_logs_user_",     # either per-user index will do
+    ),
+]
+
+# Plan steps that mean the query degrades with table size
+BAD_STEPS = ("SCAN prediction_logs", "USE TEMP B-TREE")
+
+
+def main() -> None: # EXPLAIN QUERY PLAN for the hot prediction_logs queries on a migrated database
+    parser = argparse.ArgumentParser(description = "Check that the hot queries use the migration-created indexes.")
+    parser.add_argument("--db-path", type = Path, default = None,
+                        help = "Database to check (default: a fresh temporary one, migrated from scratch).")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    if args.db_path is None:
+        tmp_dir = tempfile.mkdtemp(prefix = "mdds-query-plans-")
+        db_path = os.path.join(tmp_dir, "plans.db")
+    else:
+        db_path = str(args.db_path)
+
+    failures = 0
+    try:
+        db = DatabaseManager(db_path)
+        db.init_db()
+        print(f"[INFO] Schema version: {db.get_schema_version()}")
+        for name, query, params, expected in HOT_QUERIES:
+            plan = [row["detail"] for row in db.fetch_all(f"EXPLAIN QUERY PLAN {query}", params)]
+            bad = [step for step in plan if step.startswith(BAD_STEPS)]
+            ok = any(expected in step for step in plan) and not bad
+            failures += not ok
+            print(f"[{'OK' if ok else 'ERROR'}] {name}")
+            for step in plan:
+                print(f"        {step}")
+            if not ok:
+                print(f"        expected: {expected}")
+        db.close_all()
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors = True)
+
+    if failures:
+        print(f"[ERROR] {failures} hot quer{'y' if failures == 1 else 'ies'} not using the expected index")
+        sys.exit(1)
+    print("[INFO] All hot queries use their indexes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import argparse
+import multiprocessing as mp
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Allow "python benchmarks/stress_db_writes.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.managers.database_manager import DatabaseManager  # noqa: E402
+
+INSERT_LOG = (
+    "INSERT INTO prediction_logs (user_id, model_type, input_summary, prediction_result, "
+    "probability, created_at, model_version) VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {"write": [], "read": [], "purge": []}
+        self.locked: int = 0
+        self.other_errors: int = 0
+
+    def record(self, kind: str, seconds: float) -> None:
+        with self._lock:
+            self.latencies[kind].append(seconds)
+
+    def error(self, e: Exception) -> None:
+        with self._lock:
+            if "locked" in str(e) or "busy" in str(e):
+                self.locked += 1
+            else:
+                self.other_errors += 1
+
+
+def _timed(recorder: Recorder, kind: str, fn) -> None:
+    t0 = time.perf_counter()
+    try:
+        fn()
+    except sqlite3.OperationalError as e:
+        recorder.error(e)
+        return
+    recorder.record(kind, time.perf_counter() - t0)
+
+
+def _writer(db: DatabaseManager, recorder: Recorder, user_id: int, rate: float, deadline: float) -> None:
+    # One "request thread" logging predictions at a fixed pace
+    interval = 1.0 / rate
+    next_at = time.time()
+    while next_at < deadline:
+        _timed(recorder, "write", lambda: db.execute_and_get_id(
+            INSERT_LOG, (user_id, "heart_disease", "stress", "Low", 0.12, "2025-01-01T00:00:00+00:00", "v1"),
+        ))
+        next_at += interval
+        time.sleep(max(0.0, next_at - time.time()))
+
+
+def _reader(db: DatabaseManager, recorder: Recorder, user_id: int, deadline: float) -> None:
+    # History page + per-model counts, like the dashboard
+    while time.time() < deadline:
+        _timed(recorder, "read", lambda: (
+            db.fetch_all("SELECT * FROM prediction_logs WHERE user_id = ? ORDER BY id DESC LIMIT 50", (user_id,)),
+            db.fetch_all("SELECT model_type, COUNT(*) FROM prediction_logs GROUP BY model_type"),
+        ))
+        time.sleep(0.005)
+
+
+def _purger(db: DatabaseManager, recorder: Recorder, user_id: int, every: float, deadline: float) -> None:
+    # Periodic bulk write (retention-style delete) that holds the write lock for longer
+    while time.time() + every < deadline:
+        time.sleep(every)
+        _timed(recorder, "purge", lambda: db.execute(
+            "DELETE FROM prediction_logs WHERE id IN "
+            "(SELECT id FROM prediction_logs WHERE user_id = ? ORDER BY id LIMIT 2000)",
+            (user_id,),
+        ))
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+def _writer_process(db_path: str, user_id: int, threads: int, rate: float, seconds: float,
+                    barrier: Any, results: Any) -> None:
+    # One "gunicorn worker": its own DatabaseManager (and, in WAL mode, its own writer thread)
+    db = DatabaseManager(db_path)
+    recorder = Recorder()
+    barrier.wait()
+    deadline = time.time() + seconds
+    workers = [threading.Thread(target = _writer, args = (db, recorder, user_id, rate / threads, deadline))
+               for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    writer = db.get_pool_stats()["writer"]
+    db.close_all()
+    results.put((recorder.latencies["write"], recorder.locked, recorder.other_errors, writer))
+
+
+def _run(db_path: str, wal: bool, args: argparse.Namespace) -> None:
+    os.environ["DB_WAL_MODE"] = "1" if wal else "0"
+    db = DatabaseManager(db_path)
+    db.init_db()
+    user_id = db.execute_and_get_id(
+        "INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+        ("stress", "stress@example.com", "x", "2025-01-01"),
+    )
+    # Pre-fill so reads and purges have real work to do
+    db.execute_many(INSERT_LOG, [
+        (user_id, "heart_disease", "seed", "Low", 0.1, "2025-01-01T00:00:00+00:00", "v1")
+        for _ in range(args.seed_rows)
+    ])
+
+    # Writers live in separate processes, like gunicorn workers sharing one file, so they contend
+    # for the lock across processes too
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(args.processes + 1)
+    results = ctx.Queue()
+    per_process = max(1, args.writers // args.processes)
+    processes = [
+        ctx.Process(target = _writer_process, args = (db_path, user_id, per_process, args.write_rate / args.processes,
+                                                        args.seconds, barrier, results))
+        for _ in range(args.processes)
+    ]
+    for p in processes:
+        p.start()
+
+    recorder = Recorder()
+    barrier.wait()
+    deadline = time.time() + args.seconds
+    threads = (
+        [threading.Thread(target = _reader, args = (db, recorder, user_id, deadline)) for _ in range(args.readers)]
+        + [threading.Thread(target = _purger, args = (db, recorder, user_id, args.purge_every, deadline))]
+    )
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    writes: List[float] = []
+    writer_stats: List[Dict[str, Any]] = []
+    for _ in processes:
+        latencies, locked, other_errors, writer = results.get()
+        writes.extend(latencies)
+        recorder.locked += locked
+        recorder.other_errors += other_errors
+        writer_stats.append(writer)
+    for t in threads:
+        t.join()
+    for p in processes:
+        p.join()
+    elapsed = time.perf_counter() - t0
+    db.close_all()
+
+    reads = recorder.latencies["read"]
+    label = "WAL + serialized writer" if wal else "default (rollback journal)"
+    print(f"[INFO] {label}")
+    print(f"       writes: {len(writes) / elapsed:,.0f}/s achieved (target {args.write_rate:,.0f}/s), "
+          f"p50 {_percentile(writes, 0.5):.1f} ms, p99 {_percentile(writes, 0.99):.1f} ms")
+    print(f"       reads:  {len(reads) / elapsed:,.0f}/s, "
+          f"p50 {_percentile(reads, 0.5):.1f} ms, p99 {_percentile(reads, 0.99):.1f} ms")
+    print(f"       'database is locked' errors: {recorder.locked}   other errors: {recorder.other_errors}")
+    if wal:
+        transactions = sum(w["transactions"] for w in writer_stats)
+        jobs = sum(w["jobs"] for w in writer_stats)
+        print(f"       writers: {transactions} transactions, "
+              f"{jobs / transactions if transactions else 0:.2f} writes/transaction, "
+              f"max queue {max(w['max_queue_depth'] for w in writer_stats)}, "
+              f"{sum(w['lock_retries'] for w in writer_stats)} lock retries")
+
+
+def main() -> None: # Mixed read/write load on prediction_logs, default journal vs WAL + one writer
+    parser = argparse.ArgumentParser(description = "Stress concurrent SQLite writes through DatabaseManager.")
+    parser.add_argument("--seconds", type = float, default = 10.0)
+    parser.add_argument("--write-rate", type = float, default = 2000.0, help = "Target inserts/second (all writers).")
+    parser.add_argument("--writers", type = int, default = 16, help = "Writer threads, spread over --processes.")
+    parser.add_argument("--processes", type = int, default = 4, help = "Writer processes (own connections each).")
+    parser.add_argument("--readers", type = int, default = 4)
+    parser.add_argument("--purge-every", type = float, default = 1.0, help = "Seconds between bulk deletes.")
+    parser.add_argument("--seed-rows", type = int, default = 50_000)
+    parser.add_argument("--busy-timeout-ms", type = int, default = 5000, help = "Default: the app's DB_BUSY_TIMEOUT_MS.")
+    args = parser.parse_args()
+    os.environ["DB_BUSY_TIMEOUT_MS"] = str(args.busy_timeout_ms)
+
+    tmp_dir = tempfile.mkdtemp(prefix = "mdds-db-stress-")
+    try:
+        _run(os.path.join(tmp_dir, "default.db"), False, args)
+        _run(os.path.join(tmp_dir, "wal.db"), True, args)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors = True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Gunicorn settings for production: gunicorn -c gunicorn.conf.py wsgi:app
+#
+# The master imports the app and loads + warms the models BEFORE forking the
+# workers, so their weights are shared copy-on-write instead of duplicated per
+# worker. Workers can be reloaded gracefully with: kill -HUP <master pid>
+# (new workers are forked from the already-loaded master, old ones finish
+# their in-flight requests first).
+#
+# Env vars:
+#   GUNICORN_BIND          (default: 0.0.0.0:8000)
+#   WEB_CONCURRENCY        worker processes (default: one per CPU, inference is CPU-bound)
+#   GUNICORN_THREADS       threads per worker (default: 4, covers DB / chatbot I/O waits)
+#   GUNICORN_PRELOAD       load models in the master before fork (default: 1)
+#   GUNICORN_TIMEOUT       seconds before a stuck worker is killed (default: 120)
+#   GUNICORN_MAX_REQUESTS  recycle a worker after this many requests (default: 0 = never)
+import gc
+import multiprocessing
+import os
+from dotenv import load_dotenv
+
+load_dotenv()   # so the GUNICORN_* / WEB_CONCURRENCY settings below can live in .env too
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(cpu_count)))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+preload_app = _env_flag("GUNICORN_PRELOAD", True)
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))   # first Keras predict in a worker can be slow
+graceful_timeout = 30
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10    # so workers do not all restart at once
+
+# Split the cores between workers instead of every worker's TensorFlow / BLAS
+# pool spawning one thread per core. Read when TF initializes in the worker.
+_threads_per_worker = str(max(1, cpu_count // max(1, workers)))
+for _name in ("TF_NUM_INTRAOP_THREADS", "OMP_NUM_THREADS"):
+    os.environ.setdefault(_name, _threads_per_worker)
+
+
+def when_ready(server) -> None:    # master, after the app is imported and before the first fork
+    if not server.cfg.preload_app:
+        return
+    from app.core.managers.database_manager import db_manager
+    from app.core.managers.model_manager import model_manager
+
+    model_manager.preload_before_fork()
+    db_manager.close_all()      # workers open their own SQLite connections
+    # Move everything loaded so far out of the GC's reach: collections in the
+    # workers would otherwise touch (and so copy) every shared object's header
+    gc.freeze()
+
+
+def post_fork(server, worker) -> None:  # worker, right after fork
+    from app.core.managers.model_manager import model_manager
+
+    model_manager.after_fork()
+
+
+def worker_exit(server, worker) -> None:
+    from app.core.managers.database_manager import db_manager
+    from app.core.managers.model_manager import model_manager
+    from app.core.managers.prediction_log_writer import prediction_log_writer
+
+    model_manager.shutdown()
+    prediction_log_writer.shutdown()    # flush queued prediction logs before the pool closes
+    db_manager.close_all()
@@ -0,0 +1,120 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+# Allow "python model_training/brain_tumor/compare_brain_backends.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.models.brain.brain_tumor_model import BrainTumorModel  # noqa: E402
+from app.models.brain.inference_backends import BACKEND_NAMES  # noqa: E402
+
+
+def _rss_mb() -> float | None:  # Resident memory of this process (Linux only)
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return None
+
+
+def main() -> None: # Accuracy / latency comparison of Keras vs quantized TFLite backends on brain_mri/Testing
+    test_dir = PROJECT_ROOT / "app" / "data" / "brain_mri" / "Testing"
+    model_dir = PROJECT_ROOT / "app" / "data" / "saved_models"
+
+    parser = argparse.ArgumentParser(description = "Compare brain CNN inference backends.")
+    parser.add_argument("--model-path", type = Path, default = model_dir / "brain_tumor_cnn_multiclass.h5")
+    parser.add_argument("--test-dir", type = Path, default = test_dir)
+    parser.add_argument("--limit", type = int, default = 0, help = "Max images per class (0 = all).")
+    parser.add_argument("--backends", nargs = "+", default = list(BACKEND_NAMES), choices = BACKEND_NAMES)
+    parser.add_argument("--report", type = Path, default = model_dir / "brain_backend_report.json")
+    args = parser.parse_args()
+
+    if not args.test_dir.exists():
+        raise FileNotFoundError(f"Testing directory not found at {args.test_dir}")
+
+    # Preprocess once with the serving code path, reuse the same tensors for every backend
+    reference = BrainTumorModel(model_path = args.model_path)
+    images: list[np.ndarray] = []
+    labels: list[int] = []
+    for class_index, class_name in enumerate(reference.class_names):
+        class_dir = args.test_dir / class_name
+        files = sorted(p for p in class_dir.iterdir() if p.suffix.lower() in (".jpg", ".jpeg", ".png", ".bmp"))
+        if args.limit:
+            files = files[: args.limit]
+        for path in files:
+            images.append(reference._preprocess_image(path))
+            labels.append(class_index)
+    y_true = np.array(labels)
+    print(f"[INFO] Loaded {len(images)} test images from {args.test_dir}")
+
+    results: dict[str, dict] = {}
+    keras_preds: np.ndarray | None = None
+
+    for backend in args.backends:
+        model = BrainTumorModel(model_path = args.model_path, backend = backend)
+        try:
+            rss_before = _rss_mb()
+            t0 = time.perf_counter()
+            model._ensure_model_loaded()
+            load_s = time.perf_counter() - t0
+            rss_after = _rss_mb()
+        except FileNotFoundError as e:
+            print(f"[WARNING] Skipping {backend}: {e}")
+            continue
+
+        model.predict_batch(images[0])  # warm-up (first call allocates / traces)
+
+        latencies_ms: list[float] = []
+        preds: list[int] = []
+        for x in images:
+            t0 = time.perf_counter()
+            probs = model.predict_batch(x)[0]
+            latencies_ms.append((time.perf_counter() - t0) * 1000.0)
+            preds.append(int(np.argmax(probs)))
+        y_pred = np.array(preds)
+
+        if backend == "keras":
+            keras_preds = y_pred
+
+        lat = np.array(latencies_ms)
+        results[backend] = {
+            "artifact": str(model.artifact_path),
+            "artifact_kb": round(model.artifact_path.stat().st_size / 1024.0, 1),
+            "load_seconds": round(load_s, 3),
+            "rss_increase_mb": (
+                round(rss_after - rss_before, 1) if rss_before is not None and rss_after is not None else None
+            ),
+            "accuracy": round(float(np.mean(y_pred == y_true)), 4),
+            "agreement_with_keras": (
+                round(float(np.mean(y_pred == keras_preds)), 4) if keras_preds is not None else None
+            ),
+            "latency_ms_mean": round(float(lat.mean()), 3),
+            "latency_ms_p50": round(float(np.percentile(lat, 50)), 3),
+            "latency_ms_p95": round(float(np.percentile(lat, 95)), 3),
+        }
+
+    print()
+    print(f"{'backend':<16}{'size KB':>10}{'acc':>8}{'agree':>8}{'p50 ms':>9}{'p95 ms':>9}{'RSS +MB':>9}")
+    for backend, r in results.items():
+        agree = "-" if r["agreement_with_keras"] is None else f"{r['agreement_with_keras']:.4f}"
+        rss = "-" if r["rss_increase_mb"] is None else f"{r['rss_increase_mb']:.1f}"
+        print(
+            f"{backend:<16}{r['artifact_kb']:>10.1f}{r['accuracy']:>8.4f}{agree:>8}"
+            f"{r['latency_ms_p50']:>9.3f}{r['latency_ms_p95']:>9.3f}{rss:>9}"
+        )
+
+    args.report.parent.mkdir(parents = True, exist_ok = True)
+    with open(args.report, "w", encoding = "utf-8") as f:
+        json.dump({"images": len(images), "backends": results}, f, indent = 2)
+    print(f"\n[INFO] Report written to: {args.report}")
+
+if __name__ == "__main__":
+    main()
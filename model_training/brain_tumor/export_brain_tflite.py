@@ -0,0 +1,83 @@
+import argparse
+from pathlib import Path
+import tensorflow as tf
+from tensorflow import keras
+
+def main() -> None: # Export float16 + int8 post-training-quantized TFLite versions of the brain CNN
+    # Resolve project paths
+    current_file = Path(__file__).resolve()
+    project_root = current_file.parents[2]
+
+    train_dir = project_root / "app" / "data" / "brain_mri" / "Training"
+    model_dir = project_root / "app" / "data" / "saved_models"
+
+    parser = argparse.ArgumentParser(description = "Export quantized TFLite artifacts for the brain tumor CNN.")
+    parser.add_argument("--model-path", type = Path, default = model_dir / "brain_tumor_cnn_multiclass.h5")
+    parser.add_argument("--train-dir", type = Path, default = train_dir)
+    parser.add_argument("--calibration-samples", type = int, default = 300,
+                        help = "Number of training images used to calibrate int8 ranges.")
+    args = parser.parse_args()
+
+    model_path: Path = args.model_path
+    # Must match app/models/brain/inference_backends.py -> tflite_artifact_path()
+    float16_path = model_path.with_name(f"{model_path.stem}_float16.tflite")
+    int8_path = model_path.with_name(f"{model_path.stem}_int8.tflite")
+
+    print(f"[INFO] Keras model: {model_path}")
+    print(f"[INFO] Calibration dir: {args.train_dir}")
+
+    if not model_path.exists():
+        raise FileNotFoundError(
+            f"Brain tumor model not found at {model_path}\n"
+            "Train it first with model_training/brain_tumor/train_brain_model.py"
+        )
+
+    if not args.train_dir.exists():
+        raise FileNotFoundError(f"Training directory not found at {args.train_dir}")
+
+    IMG_SIZE = (128, 128)
+    SEED = 42
+
+    model = keras.models.load_model(model_path)
+
+    # float16: weights stored as fp16, compute stays float -> ~half the size, same accuracy
+    print("[INFO] Converting float16 model...")
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+    float16_path.write_bytes(converter.convert())
+    print(f"[INFO] float16 model saved to: {float16_path} ({float16_path.stat().st_size / 1024:.1f} KB)")
+
+    # int8: weights AND activations quantized, ranges calibrated on real MRI scans
+    print(f"[INFO] Building calibration set ({args.calibration_samples} images)...")
+    calibration_ds = keras.utils.image_dataset_from_directory(
+        args.train_dir,
+        labels = None,
+        image_size = IMG_SIZE,
+        batch_size = 1,
+        color_mode = "rgb",
+        shuffle = True,
+        seed = SEED,
+        interpolation = "nearest",  # same resize as the serving path (load_img / PIL nearest)
+    ).take(args.calibration_samples)
+
+    def representative_dataset():
+        for images in calibration_ds:
+            # Pixel values stay in [0, 255]: the model has its own Rescaling layer
+            yield [tf.cast(images, tf.float32)]
+
+    print("[INFO] Converting int8 model...")
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    # Keep float input/output so the serving preprocessing does not change
+    int8_path.write_bytes(converter.convert())
+    print(f"[INFO] int8 model saved to: {int8_path} ({int8_path.stat().st_size / 1024:.1f} KB)")
+
+    print(f"[INFO] Keras model size: {model_path.stat().st_size / 1024:.1f} KB")
+    print("[INFO] Select a backend at runtime with BRAIN_BACKEND=tflite_float16 or BRAIN_BACKEND=tflite_int8")
+    print("[INFO] Done.")
+
+if __name__ == "__main__":
+    main()
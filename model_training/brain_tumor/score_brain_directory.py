@@ -0,0 +1,219 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO
+import numpy as np
+
+# Allow "python model_training/brain_tumor/score_brain_directory.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.models.brain.brain_tumor_model import BrainTumorModel  # noqa: E402
+from app.models.brain.inference_backends import BACKEND_NAMES  # noqa: E402
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def _find_images(input_dir: Path) -> List[Path]:
+    # Sorted so a resumed run walks the files in the same order
+    return sorted(p for p in input_dir.rglob("*") if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES)
+
+
+def _chunks(items: List[Path], size: int) -> Iterator[List[Path]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _decode(model: BrainTumorModel, path: Path) -> Optional[np.ndarray]:
+    # Same preprocessing as BrainTumorModel.predict(); None marks an unreadable file
+    try:
+        return model._preprocess_image(path)
+    except Exception as e:
+        print(f"[WARNING] Could not decode {path}: {e}")
+        return None
+
+
+class _ResultWriter:
+    """
+    Streams one row per image to CSV or JSONL.
+
+    The checkpoint file records how many bytes of the output are complete
+    (flushed after a whole batch). On resume the output is truncated back to
+    that offset, so a crash mid-batch never leaves half-written rows behind.
+    """
+
+    def __init__(self, output_path: Path, fmt: str, class_names: List[str], resume: bool) -> None:
+        self.output_path = output_path
+        self.checkpoint_path = output_path.with_name(output_path.name + ".checkpoint.json")
+        self.fmt = fmt
+        self.fieldnames = (
+            ["path", "predicted_class", "predicted_index", "probability"]
+            + [f"prob_{name}" for name in class_names]
+            + ["error"]
+        )
+        self.done: Set[str] = set()
+
+        committed = self._read_checkpoint() if resume else None
+        if committed is not None and output_path.exists():
+            with open(output_path, "r+b") as f:
+                f.truncate(committed)
+            self.done = self._read_done_paths()
+            self._file: TextIO = open(output_path, "a", encoding = "utf-8", newline = "")
+        else:
+            output_path.parent.mkdir(parents = True, exist_ok = True)
+            self._file = open(output_path, "w", encoding = "utf-8", newline = "")
+            if fmt == "csv":
+                csv.writer(self._file).writerow(self.fieldnames)
+            self.commit()
+
+        self._csv = csv.DictWriter(self._file, fieldnames = self.fieldnames) if fmt == "csv" else None
+
+    def _read_checkpoint(self) -> Optional[int]:
+        try:
+            with open(self.checkpoint_path, "r", encoding = "utf-8") as f:
+                return int(json.load(f)["output_bytes"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _read_done_paths(self) -> Set[str]:
+        with open(self.output_path, "r", encoding = "utf-8", newline = "") as f:
+            if self.fmt == "csv":
+                return {row["path"] for row in csv.DictReader(f)}
+            return {json.loads(line)["path"] for line in f if line.strip()}
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self._csv is not None:
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps(row) + "\n")
+        self.done.add(row["path"])
+
+    def commit(self) -> None:
+        # Flush the output first, then move the checkpoint forward (atomic replace)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding = "utf-8") as f:
+            json.dump({"output_bytes": self._file.tell(), "rows": len(self.done)}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def close(self) -> None:
+        self.commit()
+        self._file.close()
+
+
+def _row(path: str, result: Optional[Dict[str, Any]], class_names: List[str], error: str = "") -> Dict[str, Any]:
+    row: Dict[str, Any] = {"path": path, "predicted_class": "", "predicted_index": "", "probability": ""}
+    for name in class_names:
+        row[f"prob_{name}"] = ""
+    if result is not None:
+        row["predicted_class"] = result["predicted_class"]
+        row["predicted_index"] = result["predicted_index"]
+        row["probability"] = round(result["probability"], 6)
+        for name, p in result["probabilities"].items():
+            row[f"prob_{name}"] = round(p, 6)
+    row["error"] = error
+    return row
+
+
+def main() -> None: # Score every MRI image under a directory tree with batched inference
+    default_model = PROJECT_ROOT / "app" / "data" / "saved_models" / "brain_tumor_cnn_multiclass.h5"
+
+    parser = argparse.ArgumentParser(description = "Batch-score brain MRI images to CSV / JSONL.")
+    parser.add_argument("input_dir", type = Path, help = "Directory to walk recursively for images.")
+    parser.add_argument("--output", type = Path, required = True, help = "Output file (.csv or .jsonl).")
+    parser.add_argument("--format", choices = ("csv", "jsonl"), default = None,
+                        help = "Output format (default: from the output file suffix).")
+    parser.add_argument("--model-path", type = Path, default = default_model)
+    parser.add_argument("--backend", default = "keras", choices = BACKEND_NAMES)
+    parser.add_argument("--batch-size", type = int, default = 32)
+    parser.add_argument("--decode-workers", type = int, default = min(8, os.cpu_count() or 1),
+                        help = "Threads decoding / resizing images while the model runs.")
+    parser.add_argument("--checkpoint-every", type = int, default = 10,
+                        help = "Commit a resumable checkpoint every N batches.")
+    parser.add_argument("--no-resume", action = "store_true", help = "Start over even if a checkpoint exists.")
+    args = parser.parse_args()
+
+    if not args.input_dir.exists():
+        raise FileNotFoundError(f"Input directory not found at {args.input_dir}")
+    fmt = args.format or ("jsonl" if args.output.suffix.lower() in (".jsonl", ".json") else "csv")
+
+    t_start = time.perf_counter()
+    model = BrainTumorModel(model_path = args.model_path, backend = args.backend)
+    model.load_model()
+    load_s = time.perf_counter() - t_start
+    print(f"[INFO] Loaded {args.backend} model in {load_s:.2f}s")
+
+    writer = _ResultWriter(args.output, fmt, model.class_names, resume = not args.no_resume)
+    all_images = _find_images(args.input_dir)
+    todo = [p for p in all_images if str(p.relative_to(args.input_dir)) not in writer.done]
+    print(f"[INFO] Found {len(all_images)} images under {args.input_dir}")
+    if writer.done:
+        print(f"[INFO] Resuming: {len(all_images) - len(todo)} already scored, {len(todo)} remaining")
+
+    decode_s = 0.0
+    infer_s = 0.0
+    scored = 0
+    failed = 0
+    t_loop = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers = args.decode_workers, thread_name_prefix = "brain-decode") as pool:
+        batches = list(_chunks(todo, args.batch_size))
+
+        def submit(batch: List[Path]) -> List[Future]:
+            return [pool.submit(_decode, model, p) for p in batch]
+
+        # Decode batch i+1 on the thread pool while batch i is on the model
+        pending = submit(batches[0]) if batches else []
+        for i, batch in enumerate(batches):
+            t0 = time.perf_counter()
+            tensors = [f.result() for f in pending]
+            decode_s += time.perf_counter() - t0
+            pending = submit(batches[i + 1]) if i + 1 < len(batches) else []
+
+            ok = [j for j, x in enumerate(tensors) if x is not None]
+            preds: np.ndarray = np.empty((0, len(model.class_names)))
+            if ok:
+                t0 = time.perf_counter()
+                preds = model.predict_batch(np.concatenate([tensors[j] for j in ok], axis = 0))
+                infer_s += time.perf_counter() - t0
+
+            pred_rows = dict(zip(ok, preds))
+            for j, path in enumerate(batch):
+                rel_path = str(path.relative_to(args.input_dir))
+                if j in pred_rows:
+                    writer.write(_row(rel_path, model._build_result(pred_rows[j]), model.class_names))
+                    scored += 1
+                else:
+                    writer.write(_row(rel_path, None, model.class_names, error = "decode_failed"))
+                    failed += 1
+
+            if (i + 1) % args.checkpoint_every == 0:
+                writer.commit()
+                elapsed = time.perf_counter() - t_loop
+                done = scored + failed
+                print(f"[INFO] {done}/{len(todo)} images ({done / elapsed:.1f} img/s)")
+
+    writer.close()
+    loop_s = time.perf_counter() - t_loop
+    total_s = time.perf_counter() - t_start
+
+    print()
+    print(f"[INFO] Scored: {scored}  Failed: {failed}  Output: {args.output} ({fmt})")
+    print(f"[INFO] Model load:        {load_s:.2f}s")
+    print(f"[INFO] Decode wait:       {decode_s:.2f}s (time the model sat waiting for images)")
+    print(f"[INFO] Inference:         {infer_s:.2f}s")
+    print(f"[INFO] Scoring loop:      {loop_s:.2f}s")
+    print(f"[INFO] End-to-end:        {total_s:.2f}s")
+    if loop_s > 0 and todo:
+        print(f"[INFO] Throughput:        {len(todo) / loop_s:.1f} images/s "
+              f"(inference only: {scored / infer_s if infer_s else 0.0:.1f} images/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import sys
+import warnings
+from pathlib import Path
+import joblib
+import numpy as np
+import pandas as pd
+
+# Allow "python model_training/heart_disease/export_heart_arrays.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.models.heart.forest_arrays import ForestArrays, arrays_dir_for, export_forest_arrays  # noqa: E402
+
+
+def main() -> None: # Export an existing heart_model.pkl as mmap-able .npy arrays and check they match sklearn
+    model_dir = PROJECT_ROOT / "app" / "data" / "saved_models"
+    data_path = PROJECT_ROOT / "app" / "data" / "datasets" / "Heart Disease UCI.csv"
+
+    parser = argparse.ArgumentParser(description = "Export the heart RandomForest as flat numpy arrays.")
+    parser.add_argument("--model-path", type = Path, default = model_dir / "heart_model.pkl")
+    parser.add_argument("--data-path", type = Path, default = data_path,
+                        help = "CSV used to verify the export predicts exactly like sklearn.")
+    args = parser.parse_args()
+
+    if not args.model_path.exists():
+        raise FileNotFoundError(
+            f"Heart model not found at {args.model_path}\n"
+            "Train it first with model_training/heart_disease/train_heart_model.py"
+        )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")     # sklearn version-mismatch warnings on old pickles
+        bundle = joblib.load(args.model_path)
+    forest = bundle["model"]
+    feature_names = bundle["feature_names"]
+
+    arrays_dir = export_forest_arrays(forest, feature_names, arrays_dir_for(args.model_path), source_path = args.model_path)
+    size_kb = sum(p.stat().st_size for p in arrays_dir.iterdir()) / 1024
+    print(f"[INFO] Forest arrays saved to: {arrays_dir} ({size_kb:.1f} KB, {forest.n_estimators} trees)")
+
+    # Parity check on real rows
+    if args.data_path.exists():
+        df = pd.read_csv(args.data_path)[feature_names]
+        expected = forest.predict_proba(df)
+        actual = ForestArrays.load(arrays_dir).predict_proba(df.to_numpy(dtype = float))
+        X = df
+        max_diff = float(np.max(np.abs(expected - actual)))
+        print(f"[INFO] Max |proba diff| vs sklearn on {len(X)} rows: {max_diff:.2e}")
+        if max_diff > 1e-12:
+            raise RuntimeError("Exported forest does not match the sklearn model.")
+    else:
+        print(f"[WARNING] {args.data_path} not found, skipped the parity check")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse
+import multiprocessing as mp
+import sys
+import time
+import warnings
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Allow "python model_training/heart_disease/score_heart_csv.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.metrics.memory import peak_rss_bytes  # noqa: E402
+from app.models.heart.heart_disease_model import ENGINES, HeartDiseaseModel  # noqa: E402
+
+# Per-process state for chunk workers (set by _init_worker)
+_model: Optional[HeartDiseaseModel] = None
+_columns: Dict[str, str] = {}
+
+
+def _init_worker(model_path: str, engine: str, columns: Dict[str, str]) -> None:
+    global _model, _columns
+    warnings.simplefilter("ignore")     # sklearn feature-name warnings on plain arrays
+    _model = HeartDiseaseModel(model_path = model_path, engine = engine)
+    _model.load_model()
+    _columns = columns
+
+
+def _score_chunk(chunk: pd.DataFrame, header: bool) -> Tuple[str, int, int]:
+    # Coerce -> ONE predict_many call for the chunk -> CSV text (written by the parent, in order)
+    assert _model is not None
+    X = np.column_stack([
+        pd.to_numeric(chunk[_columns[name]], errors = "coerce").to_numpy(dtype = float)
+        for name in _model.feature_names
+    ])
+    valid = ~np.isnan(X).any(axis = 1)
+
+    labels, proba = _model.predict_many(X[valid])
+    risk_label = np.full(len(chunk), "", dtype = object)
+    risk_label[valid] = labels
+    probability = np.full(len(chunk), np.nan)
+    probability[valid] = proba
+
+    chunk = chunk.assign(
+        risk_label = risk_label,
+        probability = np.round(probability, 6),
+        error = np.where(valid, "", "invalid_features"),
+    )
+    return chunk.to_csv(index = False, header = header), int(valid.sum()), int((~valid).sum())
+
+
+def _map_columns(csv_columns: List[str], feature_names: List[str], renames: Dict[str, str]) -> Dict[str, str]:
+    # feature name -> CSV column: explicit --map first, then a case-insensitive name match
+    by_lower = {c.strip().lower(): c for c in csv_columns}
+    columns: Dict[str, str] = {}
+    for name in feature_names:
+        source = next((src for src, dst in renames.items() if dst == name), None)
+        if source is None:
+            source = by_lower.get(name.lower())
+        if source is None or source not in csv_columns:
+            raise KeyError(
+                f"No column for feature '{name}' in the CSV. "
+                f"Available columns: {csv_columns}. Use --map CSV_COLUMN={name}."
+            )
+        columns[name] = source
+    return columns
+
+
+def _peak_rss_mb() -> Tuple[Optional[float], Optional[float]]:
+    # children = the chunk workers (largest one); None where the platform has no getrusage (Windows)
+    own, children = peak_rss_bytes(), peak_rss_bytes(children = True)
+    return (own / 2**20 if own is not None else None,
+            children / 2**20 if children is not None else None)
+
+
+def main() -> None: # Score a (large) patient CSV chunk by chunk with flat memory use
+    default_model = PROJECT_ROOT / "app" / "data" / "saved_models" / "heart_model.pkl"
+
+    parser = argparse.ArgumentParser(description = "Stream-score a heart patient CSV in chunks.")
+    parser.add_argument("input_csv", type = Path)
+    parser.add_argument("--output", type = Path, required = True, help = "Output CSV (input columns + predictions).")
+    parser.add_argument("--model-path", type = Path, default = default_model)
+    parser.add_argument("--engine", default = "sklearn", choices = ENGINES,
+                        help = "sklearn (default) is fastest for large chunks; arrays wins on single rows.")
+    parser.add_argument("--chunk-size", type = int, default = 50_000, help = "Rows read / scored at a time.")
+    parser.add_argument("--workers", type = int, default = 1,
+                        help = "Chunk worker processes (1 = score in this process).")
+    parser.add_argument("--map", action = "append", default = [], metavar = "CSV_COLUMN=FEATURE",
+                        help = "Use CSV_COLUMN for a model feature (repeatable).")
+    parser.add_argument("--report-every", type = int, default = 10, help = "Print progress every N chunks.")
+    args = parser.parse_args()
+
+    if not args.input_csv.exists():
+        raise FileNotFoundError(f"Input CSV not found at {args.input_csv}")
+    renames = dict(item.split("=", 1) for item in args.map)
+
+    probe = HeartDiseaseModel(model_path = args.model_path, engine = args.engine)
+    probe.load_model()
+    csv_columns = list(pd.read_csv(args.input_csv, nrows = 0).columns)
+    columns = _map_columns(csv_columns, probe.feature_names, renames)
+    print(f"[INFO] Model: {args.model_path} ({probe.loaded_format})")
+    print(f"[INFO] Feature columns: {columns}")
+
+    # Everything as text: input cells are written back verbatim, and the workers coerce
+    # the feature columns, so a bad cell fails one row, not the chunk
+    reader = pd.read_csv(args.input_csv, chunksize = args.chunk_size, dtype = str, keep_default_na = False)
+
+    pool: Optional[ProcessPoolExecutor] = None
+    if args.workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers = args.workers,
+            mp_context = mp.get_context("spawn"),
+            initializer = _init_worker,
+            initargs = (str(args.model_path), args.engine, columns),
+        )
+    else:
+        _init_worker(str(args.model_path), args.engine, columns)
+
+    args.output.parent.mkdir(parents = True, exist_ok = True)
+    scored = 0
+    invalid = 0
+    chunks_done = 0
+    t_start = time.perf_counter()
+
+    # At most 2 chunks per worker in flight: memory stays flat however big the file is
+    pending: Deque[Future] = deque()
+    max_pending = 2 * max(1, args.workers)
+
+    with open(args.output, "w", encoding = "utf-8", newline = "") as out:
+        def write(result: Tuple[str, int, int]) -> None:
+            nonlocal scored, invalid, chunks_done
+            text, n_ok, n_bad = result
+            out.write(text)
+            scored += n_ok
+            invalid += n_bad
+            chunks_done += 1
+            if chunks_done % args.report_every == 0:
+                elapsed = time.perf_counter() - t_start
+                rows = scored + invalid
+                print(f"[INFO] {rows} rows ({rows / elapsed:,.0f} rows/s)")
+
+        try:
+            for i, chunk in enumerate(reader):
+                if pool is None:
+                    write(_score_chunk(chunk, header = i == 0))
+                    continue
+                pending.append(pool.submit(_score_chunk, chunk, i == 0))
+                while len(pending) >= max_pending:
+                    write(pending.popleft().result())   # in submission order
+            while pending:
+                write(pending.popleft().result())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures = True)
+
+    elapsed = time.perf_counter() - t_start
+    rows = scored + invalid
+    own_mb, worker_mb = _peak_rss_mb()
+
+    print()
+    print(f"[INFO] Rows: {rows}  Scored: {scored}  Invalid: {invalid}  Output: {args.output}")
+    print(f"[INFO] Elapsed:    {elapsed:.2f}s")
+    print(f"[INFO] Throughput: {rows / elapsed if elapsed else 0.0:,.0f} rows/s "
+          f"({args.workers} worker(s), {args.chunk_size} rows/chunk)")
+    if own_mb is not None:
+        print(f"[INFO] Peak RSS:   {own_mb:.0f} MB (this process)"
+              + (f", {worker_mb:.0f} MB (largest worker)" if pool is not None and worker_mb is not None else ""))
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,14 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
+import sys
+
+# Allow "python model_training/heart_disease/train_heart_model.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.models.heart.forest_arrays import arrays_dir_for, export_forest_arrays  # noqa: E402
 
 def main() -> None: # Train RandomForest model ->  then save it as a pickle file with the feature names
     # Resolve project paths
@@ -85,6 +93,10 @@ def main() -> None: # Train RandomForest model ->  then save it as a pickle file
     joblib.dump(model_bundle, model_path)
     print(f"[INFO] Model saved to: {model_path}")
 
+    # Same forest as flat uncompressed .npy arrays: workers mmap them and share the pages
+    arrays_dir = export_forest_arrays(rf, feature_names, arrays_dir_for(model_path), source_path = model_path)
+    print(f"[INFO] Forest arrays saved to: {arrays_dir}")
+
 if __name__ == "__main__":
     main()
     
@@ -0,0 +1,66 @@
+import argparse
+import shutil
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Allow "python model_training/publish_model_version.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.managers.model_manager import model_manager  # noqa: E402
+
+
+def main() -> None: # Copy a trained artifact into the model registry and (optionally) activate it
+    registry = model_manager.registry
+
+    parser = argparse.ArgumentParser(description = "Publish / activate a model version in the registry.")
+    parser.add_argument("model", choices = ("heart", "brain"))
+    parser.add_argument("--artifact", type = Path, default = None,
+                        help = "Trained model file to publish (heart_model.pkl / brain_tumor_cnn_multiclass.h5).")
+    parser.add_argument("--version", default = None,
+                        help = "Version name (default: UTC timestamp). With no --artifact, activates an existing version.")
+    parser.add_argument("--activate", action = "store_true", help = "Serve this version (running apps hot-swap to it).")
+    parser.add_argument("--list", action = "store_true", help = "List registered versions and exit.")
+    args = parser.parse_args()
+
+    if args.list:
+        active = registry.active_version(args.model)
+        for version in registry.list_versions(args.model):
+            print(f"{'*' if version == active else ' '} {version}")
+        print(f"[INFO] Active: {active}")
+        return
+
+    version = args.version or datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+
+    if args.artifact is not None:
+        if not args.artifact.exists():
+            raise FileNotFoundError(f"Artifact not found at {args.artifact}")
+        spec = registry._specs[args.model]
+        version_dir = registry.root / args.model / version
+        if version_dir.exists():
+            raise FileExistsError(f"Version '{version}' already exists at {version_dir} (versions are immutable)")
+
+        # Build the version in a temp dir and rename it, so the watcher never sees half a copy
+        tmp_dir = version_dir.with_name(f".{version}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors = True)
+        tmp_dir.mkdir(parents = True)
+        shutil.copy2(args.artifact, tmp_dir / spec.artifact_name)
+        # Brain: quantized TFLite exports live next to the .h5 and go along with it
+        for sibling in args.artifact.parent.glob(f"{args.artifact.stem}_*.tflite"):
+            suffix = sibling.name[len(args.artifact.stem):]
+            shutil.copy2(sibling, tmp_dir / f"{Path(spec.artifact_name).stem}{suffix}")
+        # Heart: the mmap-able .npy export goes along with the pickle
+        arrays_dir = args.artifact.with_name(f"{args.artifact.stem}_arrays")
+        if arrays_dir.is_dir():
+            shutil.copytree(arrays_dir, tmp_dir / f"{Path(spec.artifact_name).stem}_arrays")
+        tmp_dir.rename(version_dir)
+        print(f"[INFO] Published {args.model} version {version} to: {version_dir}")
+
+    if args.activate:
+        registry.set_active(args.model, version)
+        print(f"[INFO] Activated {args.model} version {version} (running apps swap on their next registry poll)")
+
+if __name__ == "__main__":
+    main()
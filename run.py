@@ -1,10 +1,12 @@
 # App entry point
 from dotenv import load_dotenv
-from app import create_app
 
-# Load environment variables from .env file
+# Load environment variables from .env file. Before importing the app: its module-level
+# singletons (db_manager, model_manager, prediction_log_writer, ...) read them at import time.
 load_dotenv()
 
+from app import create_app  # noqa: E402
+
 # Create the Flask application using the factory function
 app = create_app()
 if __name__ == "__main__":
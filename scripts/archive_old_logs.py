@@ -0,0 +1,73 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Allow "python scripts/archive_old_logs.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.managers.database_manager import db_manager  # noqa: E402
+from app.core.managers.log_retention import RETENTION_TABLES, log_retention  # noqa: E402
+
+
+def main() -> None: # Archive old prediction / chat logs to monthly .jsonl.gz files, delete them, compact the file
+    parser = argparse.ArgumentParser(description = "Apply the log retention policy (archive, delete, incremental vacuum).")
+    parser.add_argument("--db-path", type = Path, default = Path(db_manager.db_path))
+    parser.add_argument("--older-than-days", type = int, default = log_retention.retention_days,
+                        help = "Archive rows older than this many days (env LOG_RETENTION_DAYS).")
+    parser.add_argument("--archive-dir", type = Path, default = log_retention.archive_dir)
+    parser.add_argument("--tables", nargs = "+", choices = RETENTION_TABLES, default = list(RETENTION_TABLES))
+    parser.add_argument("--batch-size", type = int, default = log_retention.batch_size,
+                        help = "Rows deleted per write transaction.")
+    parser.add_argument("--pause-ms", type = float, default = log_retention.pause * 1000,
+                        help = "Pause between batches, lets other writers in.")
+    parser.add_argument("--dry-run", action = "store_true", help = "Only count what would be archived.")
+    parser.add_argument("--no-vacuum", action = "store_true", help = "Keep the freed pages inside the file.")
+    parser.add_argument("--enable-incremental-vacuum", action = "store_true",
+                        help = "One-off: switch an older file to auto_vacuum=INCREMENTAL (full VACUUM, "
+                               "locks the database while it runs).")
+    args = parser.parse_args()
+
+    if not args.db_path.exists():
+        raise FileNotFoundError(f"Database not found at {args.db_path}")
+    db_manager.db_path = str(args.db_path)
+    db_manager.init_db()
+    log_retention.archive_dir = args.archive_dir
+    log_retention.batch_size = max(1, args.batch_size)
+    log_retention.pause = max(0.0, args.pause_ms) / 1000.0
+
+    if args.dry_run:
+        cutoff = log_retention.cutoff(args.older_than_days)
+        print(f"[INFO] Dry run: rows with created_at < {cutoff}")
+        for table in args.tables:
+            per_month = log_retention.count_expired(table, cutoff)
+            months = ", ".join(f"{month}: {count}" for month, count in sorted(per_month.items())) or "none"
+            print(f"[INFO] {table}: {sum(per_month.values())} rows ({months})")
+        return
+
+    if args.enable_incremental_vacuum:
+        size_before = log_retention.file_bytes()
+        log_retention.enable_incremental_vacuum()
+        print(f"[INFO] auto_vacuum=INCREMENTAL enabled ({size_before} -> {log_retention.file_bytes()} bytes)")
+
+    report = log_retention.run(args.tables, days = args.older_than_days, vacuum = not args.no_vacuum)
+
+    print(f"[INFO] Cutoff: created_at < {report['cutoff']}")
+    for table, stats in report["tables"].items():
+        print(f"[INFO] {table}: archived and deleted {stats['rows']} rows in {stats['batches']} batches "
+              f"({stats['archive_bytes']} archive bytes, {len(stats['files'])} files)")
+    vacuum = report["vacuum"]
+    if vacuum is not None:
+        if vacuum["auto_vacuum"] != "INCREMENTAL":
+            print(f"[WARNING] auto_vacuum={vacuum['auto_vacuum']}: {vacuum['free_pages_before']} free pages stay "
+                  f"in the file (reused by new rows). Run once with --enable-incremental-vacuum to release them.")
+        else:
+            print(f"[INFO] Incremental vacuum: free pages {vacuum['free_pages_before']} -> "
+                  f"{vacuum['free_pages_after']} in {vacuum['steps']} steps")
+    print(f"[INFO] Database {report['file_bytes_before']} -> {report['file_bytes_after']} bytes "
+          f"({report['bytes_reclaimed']} reclaimed) in {report['seconds']:.2f}s")
+    db_manager.close_all()
+
+if __name__ == "__main__":
+    main()
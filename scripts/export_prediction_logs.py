@@ -0,0 +1,234 @@
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+# Allow "python scripts/export_prediction_logs.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.managers.database_manager import db_manager  # noqa: E402
+from app.core.metrics.memory import peak_rss_bytes  # noqa: E402
+
+# Typed vector column exported for each model: heart inputs, brain class probabilities
+VECTOR_COLUMNS = {"heart_disease": "features", "brain_tumor_multiclass": "probabilities"}
+SCALAR_COLUMNS = ("id", "user_id", "created_at", "model_version", "prediction_result", "probability")
+
+
+class NpzColumns:
+    """
+    Streams chunks into one uncompressed .npy per column (np.lib.format.open_memmap,
+    sized up front from a COUNT), then zips them into an .npz: np.load(path)
+    gives the usual dict of arrays. Memory stays at one chunk.
+    """
+
+    def __init__(self, output: Path, n_rows: int, widths: Dict[str, int], vector_names: List[str],
+                 vector_key: str, compress: bool) -> None:
+        self.output = output
+        self.compress = compress
+        self.n_rows = n_rows
+        self.vector_names = vector_names
+        self.vector_key = vector_key
+        self._tmp_dir = Path(tempfile.mkdtemp(prefix = "mdds-export-", dir = output.parent))
+        dtypes = {
+            "id": np.int64, "user_id": np.int64, "probability": np.float64,
+            "created_at": f"<U{max(1, widths['created_at'])}",
+            "model_version": f"<U{max(1, widths['model_version'])}",
+            "prediction_result": f"<U{max(1, widths['prediction_result'])}",
+        }
+        self._arrays = {
+            name: np.lib.format.open_memmap(self._tmp_dir / f"{name}.npy", mode = "w+", dtype = dtype,
+                                            shape = (n_rows,))
+            for name, dtype in dtypes.items()
+        }
+        self._arrays[vector_key] = np.lib.format.open_memmap(
+            self._tmp_dir / f"{vector_key}.npy", mode = "w+", dtype = np.float64,
+            shape = (n_rows, len(vector_names)),
+        )
+        self.written = 0
+
+    def write(self, columns: Dict[str, Sequence[Any]], vectors: np.ndarray) -> None:
+        n = len(vectors)
+        n = min(n, self.n_rows - self.written)   # rows inserted since the COUNT are out of scope
+        end = self.written + n
+        for name, values in columns.items():
+            self._arrays[name][self.written:end] = values[:n]
+        self._arrays[self.vector_key][self.written:end] = vectors[:n]
+        self.written = end
+
+    def close(self) -> None:
+        for array in self._arrays.values():
+            array.flush()
+        self._arrays.clear()     # drop the maps before zipping / truncating
+
+        names = list(SCALAR_COLUMNS) + [self.vector_key]
+        if self.written < self.n_rows:
+            # Rows deleted during the export: cut the unused tail off every column
+            for name in names:
+                full = np.load(self._tmp_dir / f"{name}.npy", mmap_mode = "r")
+                np.save(self._tmp_dir / f"{name}.cut.npy", full[:self.written])
+                del full
+                (self._tmp_dir / f"{name}.cut.npy").replace(self._tmp_dir / f"{name}.npy")
+        np.save(self._tmp_dir / f"{self.vector_key}_names.npy", np.array(self.vector_names, dtype = str))
+        names.append(f"{self.vector_key}_names")
+
+        method = zipfile.ZIP_DEFLATED if self.compress else zipfile.ZIP_STORED
+        with zipfile.ZipFile(self.output, "w", compression = method, allowZip64 = True) as zf:
+            for name in names:
+                zf.write(self._tmp_dir / f"{name}.npy", arcname = f"{name}.npy")
+        shutil.rmtree(self._tmp_dir, ignore_errors = True)
+
+    def abort(self) -> None:
+        self._arrays.clear()
+        shutil.rmtree(self._tmp_dir, ignore_errors = True)
+
+
+class ParquetColumns:
+    # One row group per chunk; the vector becomes one float column per name (<vector_key>_<name>)
+
+    def __init__(self, output: Path, vector_names: List[str], vector_key: str, compress: bool) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.vector_names = vector_names
+        self.vector_key = vector_key
+        self.schema = pa.schema(
+            [("id", pa.int64()), ("user_id", pa.int64()), ("created_at", pa.string()),
+             ("model_version", pa.string()), ("prediction_result", pa.string()), ("probability", pa.float64())]
+            + [(f"{vector_key}_{name}", pa.float64()) for name in vector_names]
+        )
+        self._writer = pq.ParquetWriter(output, self.schema, compression = "zstd" if compress else "none")
+        self.written = 0
+
+    def write(self, columns: Dict[str, Sequence[Any]], vectors: np.ndarray) -> None:
+        data = dict(columns)
+        for i, name in enumerate(self.vector_names):
+            data[f"{self.vector_key}_{name}"] = vectors[:, i]
+        self._writer.write_table(self._pa.table(data, schema = self.schema))
+        self.written += len(vectors)
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def abort(self) -> None:
+        self._writer.close()
+
+
+def _vectors(raw: List[Optional[str]], names: List[str]) -> np.ndarray:
+    # JSON objects -> (rows, len(names)) float matrix; NaN where a row has no vector / value
+    out = np.full((len(raw), len(names)), np.nan)
+    for i, text in enumerate(raw):
+        if text:
+            values = json.loads(text)
+            out[i] = [values.get(name, np.nan) for name in names]
+    return out
+
+
+def main() -> None: # Stream prediction_logs of one model into a columnar file (.npz or .parquet)
+    parser = argparse.ArgumentParser(description = "Export prediction_logs in chunks to NumPy .npz or Parquet.")
+    parser.add_argument("model_type", choices = sorted(VECTOR_COLUMNS))
+    parser.add_argument("--output", type = Path, required = True, help = "Output file (.npz or .parquet).")
+    parser.add_argument("--format", choices = ("npz", "parquet"), default = None,
+                        help = "Default: from the output suffix.")
+    parser.add_argument("--db-path", type = Path, default = Path(db_manager.db_path))
+    parser.add_argument("--since", default = None, help = "Only rows with created_at >= this ISO date/datetime.")
+    parser.add_argument("--until", default = None, help = "Only rows with created_at < this ISO date/datetime.")
+    parser.add_argument("--chunk-size", type = int, default = 50_000)
+    parser.add_argument("--compress", action = "store_true", help = "Deflate (.npz) / zstd (.parquet).")
+    args = parser.parse_args()
+
+    fmt = args.format or ("parquet" if args.output.suffix.lower() == ".parquet" else "npz")
+    if not args.db_path.exists():
+        raise FileNotFoundError(f"Database not found at {args.db_path}")
+    db_manager.db_path = str(args.db_path)
+    db_manager.init_db()
+    vector_key = VECTOR_COLUMNS[args.model_type]
+
+    # Fixed scope: rows up to the current max id (later inserts are not half-exported)
+    conditions = ["model_type = ?", "id <= ?"]
+    params: List[Any] = [args.model_type]
+    max_id = db_manager.fetch_one("SELECT COALESCE(MAX(id), 0) FROM prediction_logs")[0]
+    params.append(max_id)
+    if args.since:
+        conditions.append("created_at >= ?")
+        params.append(args.since)
+    if args.until:
+        conditions.append("created_at < ?")
+        params.append(args.until)
+    where = " AND ".join(conditions)
+
+    stats = db_manager.fetch_one(
+        f"""
+        SELECT COUNT(*), MAX(LENGTH(created_at)), MAX(LENGTH(model_version)), MAX(LENGTH(prediction_result))
+        FROM prediction_logs WHERE {where}
+        """,
+        params,
+    )
+    n_rows = stats[0]
+    widths = {"created_at": stats[1] or 1, "model_version": stats[2] or 1, "prediction_result": stats[3] or 1}
+    first = db_manager.fetch_one(
+        f"SELECT {vector_key} FROM prediction_logs WHERE {where} AND {vector_key} IS NOT NULL ORDER BY id LIMIT 1",
+        params,
+    )
+    vector_names = list(json.loads(first[0])) if first is not None else []
+    print(f"[INFO] {n_rows} {args.model_type} rows, {vector_key}: {vector_names}")
+
+    args.output.parent.mkdir(parents = True, exist_ok = True)
+    if fmt == "parquet":
+        try:
+            writer: Any = ParquetColumns(args.output, vector_names, vector_key, args.compress)
+        except ImportError:
+            print("[ERROR] Parquet export needs pyarrow (pip install pyarrow). Use --format npz instead.")
+            sys.exit(1)
+    else:
+        writer = NpzColumns(args.output, n_rows, widths, vector_names, vector_key, args.compress)
+
+    # Keyset over id: each chunk is one short read, never the whole table in memory
+    t0 = time.perf_counter()
+    last_id = 0
+    try:
+        while True:
+            rows = db_manager.fetch_all(
+                f"""
+                SELECT id, user_id, created_at, model_version, prediction_result, probability, {vector_key}
+                FROM prediction_logs
+                WHERE {where} AND id > ?
+                ORDER BY id
+                LIMIT ?
+                """,
+                (*params, last_id, args.chunk_size),
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            columns = {
+                "id": np.array([r[0] for r in rows], dtype = np.int64),
+                "user_id": np.array([r[1] for r in rows], dtype = np.int64),
+                "created_at": [r[2] for r in rows],
+                "model_version": [r[3] or "" for r in rows],
+                "prediction_result": [r[4] for r in rows],
+                "probability": np.array([np.nan if r[5] is None else r[5] for r in rows], dtype = np.float64),
+            }
+            writer.write(columns, _vectors([r[6] for r in rows], vector_names))
+            del rows
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+
+    elapsed = time.perf_counter() - t0
+    peak = peak_rss_bytes()     # None where the platform cannot tell (Windows)
+    rss = f", peak RSS {peak / 1e6:.0f} MB" if peak is not None else ""
+    print(f"[INFO] Exported {writer.written} rows to {args.output} ({fmt}, "
+          f"{args.output.stat().st_size / 1e6:.1f} MB) in {elapsed:.2f}s{rss}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Allow "python scripts/rebuild_prediction_summary.py" from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.managers.database_manager import db_manager  # noqa: E402
+from app.core.managers.prediction_summary import find_summary_mismatches, rebuild_prediction_summary  # noqa: E402
+
+
+def main() -> None: # Verify (and by default repair) user_prediction_summary against prediction_logs
+    parser = argparse.ArgumentParser(description = "Check / rebuild the per-user prediction summary table.")
+    parser.add_argument("--db-path", type = Path, default = Path(db_manager.db_path))
+    parser.add_argument("--check", action = "store_true",
+                        help = "Only compare with prediction_logs; exit 1 if they differ.")
+    parser.add_argument("--show", type = int, default = 10, help = "Mismatching rows to print.")
+    args = parser.parse_args()
+
+    if not args.db_path.exists():
+        raise FileNotFoundError(f"Database not found at {args.db_path}")
+    db_manager.db_path = str(args.db_path)
+    db_manager.init_db()
+
+    # One transaction: no prediction can be logged between the comparison and the rebuild
+    t0 = time.perf_counter()
+    def check_and_rebuild(conn):
+        mismatches = find_summary_mismatches(conn)
+        written = None if args.check or not mismatches else rebuild_prediction_summary(conn)
+        return mismatches, written
+
+    mismatches, written = db_manager.run_in_transaction(check_and_rebuild)
+    elapsed = time.perf_counter() - t0
+
+    for entry in mismatches[:args.show]:
+        user_id, model_type = entry["key"]
+        print(f"[WARNING] user {user_id} / {model_type}: stored={entry['stored']} expected={entry['expected']}")
+    if len(mismatches) > args.show:
+        print(f"[WARNING] ... and {len(mismatches) - args.show} more")
+
+    if not mismatches:
+        print(f"[INFO] user_prediction_summary is consistent with prediction_logs ({elapsed:.2f}s)")
+    elif args.check:
+        print(f"[ERROR] {len(mismatches)} summary rows differ from prediction_logs (run without --check to rebuild)")
+        sys.exit(1)
+    else:
+        print(f"[INFO] Rebuilt user_prediction_summary: {written} rows ({len(mismatches)} were wrong, {elapsed:.2f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import pytest
+from app.core.managers.database_manager import DatabaseManager
+from benchmarks.check_query_plans import BAD_STEPS, HOT_QUERIES
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    # Fresh file: the schema comes from the migrations alone
+    manager = DatabaseManager(str(tmp_path_factory.mktemp("plans") / "plans.db"))
+    manager.init_db()
+    yield manager
+    manager.close_all()
+
+
+def test_migrations_create_the_prediction_log_index(db):
+    names = {row["name"] for row in db.fetch_all(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'prediction_logs'"
+    )}
+    assert "idx_prediction_logs_user_model_created" in names
+
+
+@pytest.mark.parametrize("name, query, params, expected", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+def test_hot_query_uses_its_index(db, name, query, params, expected):
+    plan = [row["detail"] for row in db.fetch_all(f"EXPLAIN QUERY PLAN {query}", params)]
+    assert any(expected in step for step in plan), f"{name}: expected '{expected}' in {plan}"
+    assert not [step for step in plan if step.startswith(BAD_STEPS)], f"{name}: scan or sort in {plan}"
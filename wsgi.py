@@ -0,0 +1,13 @@
+# Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+from dotenv import load_dotenv
+
+# Load environment variables from .env file. Before importing the app: its module-level
+# singletons (db_manager, model_manager, prediction_log_writer, ...) read them at import time.
+load_dotenv()
+
+from app import create_app  # noqa: E402
+
+# Models are NOT preloaded here: with preload_app the gunicorn master loads the
+# fork-safe ones before forking (see gunicorn.conf.py), and each worker handles
+# the rest after fork (PRELOAD_MODELS) or on first use.
+app = create_app(preload_models = False)